@@ -1,27 +1,82 @@
-import inspect
-import sys
+import importlib
+from importlib.metadata import entry_points
 
 from .base_backend import BaseBackend
-from .lime_backend import LimeBackend
-from .shap_backend import ShapBackend
+from .cache import ContributionsCache
 
+# Entry points group allowing third-party packages to register their backends, for example
+# in pyproject.toml : [project.entry-points."shapash.backends"] my_backend = "my_package:MyBackend"
+ENTRY_POINTS_GROUP = "shapash.backends"
 
-def get_backend_cls_from_name(name):
+# Backends are referenced by "module:class" and only imported when they are used,
+# so that their dependencies (shap, lime, ...) are not loaded with shapash.
+_BACKENDS = {
+    "shap": "shapash.backend.shap_backend:ShapBackend",
+    "lime": "shapash.backend.lime_backend:LimeBackend",
+    "native": "shapash.backend.native_backend:NativeBackend",
+}
+
+_LAZY_CLASSES = {path.split(":")[1]: path for path in _BACKENDS.values()}
+
+_entry_points_loaded = False
+
+
+def register_backend(name, backend):
+    """
+    Register a backend under the given name.
+
+    Parameters
+    ----------
+    name : str
+        Name of the backend, as used in SmartExplainer(backend=name).
+    backend : BaseBackend subclass or str
+        Backend class, or its "module:class" path to import it when it is used.
+    """
+    if not isinstance(backend, str) and not (isinstance(backend, type) and issubclass(backend, BaseBackend)):
+        raise ValueError("backend must be a subclass of BaseBackend or a 'module:class' string")
+    _BACKENDS[name.lower()] = backend
+
+
+def _load_entry_points():
     """
-    Scan current module to find the right backend with given name.
+    Register the backends declared in the entry points of installed packages.
+    Backends already registered are not overridden.
     """
-    list_cls = [
-        cls
-        for _, cls in inspect.getmembers(sys.modules[__name__])
-        if (
-            inspect.isclass(cls)
-            and issubclass(cls, BaseBackend)
-            and cls.name.lower() == name.lower()
-            and cls.name.lower() != "base"
-        )
-    ]
-
-    if len(list_cls) == 1:
-        return list_cls[0]
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    all_entry_points = entry_points()
+    # entry_points() returns a dict before python 3.10
+    if hasattr(all_entry_points, "select"):
+        group_entry_points = all_entry_points.select(group=ENTRY_POINTS_GROUP)
     else:
+        group_entry_points = all_entry_points.get(ENTRY_POINTS_GROUP, [])
+    for entry_point in group_entry_points:
+        _BACKENDS.setdefault(entry_point.name.lower(), entry_point.value)
+
+
+def _import_backend(path):
+    """Import a backend class from its "module:class" path."""
+    module_name, _, cls_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), cls_name)
+
+
+def get_backend_cls_from_name(name):
+    """
+    Find the backend class registered with given name.
+    """
+    key = name.lower()
+    if key not in _BACKENDS:
+        _load_entry_points()
+    if key == "base" or key not in _BACKENDS:
         raise ValueError(f"Backend class not found with name : {name}")
+    if isinstance(_BACKENDS[key], str):
+        _BACKENDS[key] = _import_backend(_BACKENDS[key])
+    return _BACKENDS[key]
+
+
+def __getattr__(name):
+    if name in _LAZY_CLASSES:
+        return _import_backend(_LAZY_CLASSES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
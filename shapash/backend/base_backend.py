@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional, Union
+from typing import Any, Iterable, Iterator, List, Optional, Union
 
 import numpy as np
 import pandas as pd
 
+from shapash.backend.cache import ContributionsCache
 from shapash.utils.check import check_contribution_object, check_model
 from shapash.utils.transform import adapt_contributions, get_preprocessing_mapping
 from shapash.utils.utils import choose_state
@@ -28,7 +29,11 @@ class BaseBackend(ABC):
     support_groups = True
     supported_cases = ["classification", "regression"]
 
-    def __init__(self, model: Any, preprocessing: Optional[Any] = None):
+    # Attributes that do not change the contributions computed by the backend and
+    # are not part of the cache key.
+    _cache_ignored_params = ["model", "preprocessing", "explain_data", "state", "cache", "n_jobs", "batch_size"]
+
+    def __init__(self, model: Any, preprocessing: Optional[Any] = None, cache: Optional[Any] = None):
         """Create a backend instance using a given implementation.
 
         Parameters
@@ -37,9 +42,15 @@ class BaseBackend(ABC):
             Model used.
         preprocessing: category_encoders, ColumnTransformer, list or dict
             The processing apply to the original data.
+        cache : str or ContributionsCache, optional
+            Directory (or cache instance) used to store the computed contributions on disk.
+            Only the rows that are not already cached are computed by the backend.
         """
         self.model = model
         self.preprocessing = preprocessing
+        if cache is not None and not isinstance(cache, ContributionsCache):
+            cache = ContributionsCache(cache)
+        self.cache = cache
         self.explain_data: Any = None
         self.state = None
         self._case, self._classes = check_model(model)
@@ -67,8 +78,43 @@ class BaseBackend(ABC):
             f"must implement the `_run_explainer` method"
         )
 
+    def get_explain_data(self, x: pd.DataFrame) -> dict:
+        """
+        Computes local contributions with the `run_explainer` method, using the cache if
+        the backend has one.
+
+        Parameters
+        ----------
+        x : pd.DataFrame
+            The observations dataframe used by the model
+
+        Returns
+        -------
+        explain_data : dict
+            dict containing local contributions
+        """
+        if self.cache is None:
+            return self.run_explainer(x)
+        return self.cache.run_explainer(self, x)
+
+    def get_cache_params(self) -> dict:
+        """
+        Parameters of the backend that change the computed contributions.
+        They are used with the model to build the key of the cache.
+
+        Returns
+        -------
+        dict
+            Parameters of the backend
+        """
+        return {
+            key: value
+            for key, value in vars(self).items()
+            if key not in self._cache_ignored_params and not key.startswith("_")
+        }
+
     def get_local_contributions(
-        self, x: pd.DataFrame, explain_data: Any, subset: Optional[List[int]] = None
+        self, x: pd.DataFrame, explain_data: Any, subset: Optional[List[int]] = None, dtype: Optional[Any] = None
     ) -> Union[pd.DataFrame, List[pd.DataFrame]]:
         """Get local contributions using the explainer data computed in the `run_explainer`
         method.
@@ -86,6 +132,8 @@ class BaseBackend(ABC):
             The data computed in the `run_explainer` method.
         subset : list
             list of indices on which to get local contributions.
+        dtype : str or numpy.dtype, optional
+            Float dtype of the returned contributions (e.g. 'float32').
 
         Returns
         -------
@@ -103,9 +151,46 @@ class BaseBackend(ABC):
         local_contributions = explain_data["contributions"]
         if subset is not None:
             local_contributions = local_contributions.loc[subset]
-        local_contributions = self.format_and_aggregate_local_contributions(x, local_contributions)
+        local_contributions = self.format_and_aggregate_local_contributions(x, local_contributions, dtype)
         return local_contributions
 
+    def iter_local_contributions(
+        self, x_iter: Union[pd.DataFrame, Iterable[pd.DataFrame]], chunk_size: Optional[int] = None
+    ) -> Iterator[Union[pd.DataFrame, List[pd.DataFrame]]]:
+        """Computes local contributions chunk by chunk.
+
+        Each chunk is explained with the `get_explain_data` method, then aggregated and
+        transformed like in the `get_local_contributions` method. Only one chunk is held in
+        memory at a time, which allows to explain datasets that do not fit in memory.
+
+        Parameters
+        ----------
+        x_iter : pd.DataFrame or iterable of pd.DataFrame
+            The dataframe of observations used by the model, or an iterable of chunks of it
+            (for example returned by `pd.read_csv(..., chunksize=...)`).
+        chunk_size : int, optional
+            Maximum number of rows explained at once. Chunks of x_iter that are larger are split.
+
+        Yields
+        ------
+        local_contributions : pd.DataFrame or list of pd.DataFrame
+            The local contributions of each chunk.
+
+        Example
+        --------
+        >>> for contributions in backend.iter_local_contributions(pd.read_csv(path, chunksize=10000)):
+        ...     contributions.to_parquet(...)
+        """
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        if isinstance(x_iter, pd.DataFrame):
+            x_iter = [x_iter]
+        for x_chunk in x_iter:
+            step = chunk_size if chunk_size is not None else max(len(x_chunk), 1)
+            for start in range(0, len(x_chunk), step):
+                x = x_chunk.iloc[start : start + step]
+                yield self.get_local_contributions(x, self.get_explain_data(x))
+
     def get_global_features_importance(
         self, contributions: pd.DataFrame, explain_data: Optional[dict] = None, subset: Optional[List[int]] = None
     ) -> Union[pd.Series, List[pd.Series]]:
@@ -138,6 +223,7 @@ class BaseBackend(ABC):
         self,
         x: pd.DataFrame,
         contributions: Union[pd.DataFrame, np.array, List[pd.DataFrame], List[np.array]],
+        dtype: Optional[Any] = None,
     ) -> Union[pd.DataFrame, List[pd.DataFrame]]:
         """
         This function allows to format and aggregate contributions in the right format
@@ -151,6 +237,9 @@ class BaseBackend(ABC):
             The dataframe of observations used by the model.
         contributions : pd.DataFrame or np.array or list of pd.DataFrame or list of np.array
             Local contributions, or list of local contributions.
+        dtype : str or numpy.dtype, optional
+            Float dtype of the returned contributions (e.g. 'float32'). Aggregations are
+            computed before the conversion.
 
         Returns
         -------
@@ -168,6 +257,11 @@ class BaseBackend(ABC):
         )
         if _needs_preprocessing(contributions_cols, x, self.preprocessing):
             contributions = self._apply_preprocessing(contributions)
+        if dtype is not None:
+            if isinstance(contributions, list):
+                contributions = [contrib.astype(dtype, copy=False) for contrib in contributions]
+            else:
+                contributions = contributions.astype(dtype, copy=False)
         return contributions
 
     def _apply_preprocessing(
@@ -0,0 +1,264 @@
+"""
+Contributions cache module
+"""
+import os
+import pickle
+import uuid
+
+import numpy as np
+import pandas as pd
+from joblib import hash as joblib_hash
+
+
+class ContributionsCache:
+    """
+    On-disk cache of the local contributions computed by a backend.
+
+    Contributions are stored by row : each row of the explained dataset is identified by a hash
+    of its values, and the cache is keyed on a fingerprint of the model, of the backend parameters
+    and of the columns of the dataset. When a dataset is explained, only the rows missing from
+    the cache are computed by the backend.
+
+    Each call that computes new rows writes an entry made of two numpy files (row hashes and
+    contributions) that are memory-mapped when read. When the total size of the directory exceeds
+    max_size, the least recently used entries are removed.
+
+    Only the `contributions` key of the explain data is cached.
+
+    Parameters
+    ----------
+    directory : str
+        Directory where the contributions are stored. It is created if needed.
+    max_size : int (default: 2**30)
+        Maximum size of the directory in bytes.
+
+    Example
+    --------
+    >>> xpl = SmartExplainer(model, cache="/tmp/shapash_cache")
+    >>> xpl.compile(x=x_test)
+    """
+
+    def __init__(self, directory, max_size=2**30):
+        if not isinstance(directory, (str, os.PathLike)):
+            raise ValueError("directory parameter must be a string")
+        self.directory = str(directory)
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def run_explainer(self, backend, x):
+        """
+        Computes local contributions of x with the backend, only for the rows missing from the cache.
+
+        Parameters
+        ----------
+        backend : shapash.backend.BaseBackend
+            Backend used to compute the contributions.
+        x : pd.DataFrame
+            The observations dataframe used by the model
+
+        Returns
+        -------
+        explain_data : dict
+            dict containing local contributions
+        """
+        key_dir = os.path.join(self.directory, self.get_key(backend, x))
+        os.makedirs(key_dir, exist_ok=True)
+        row_hashes = pd.util.hash_pandas_object(x, index=False).values
+
+        entries, cached_hashes, cached_positions = _read_index(key_dir)
+        indexer = pd.Index(cached_hashes).get_indexer(row_hashes) if len(cached_hashes) else -np.ones(len(x), int)
+        missing = np.flatnonzero(indexer == -1)
+
+        used_entries = set()
+        contributions = None
+        if len(missing) > 0:
+            explain_data = backend.run_explainer(x.iloc[missing])
+            kind, new_contributions, meta = _to_array(explain_data["contributions"])
+            entry = _write_entry(key_dir, row_hashes[missing], new_contributions, (kind, meta))
+            used_entries.add(entry)
+            contributions = np.empty((len(x),) + new_contributions.shape[1:], dtype=new_contributions.dtype)
+            contributions[missing] = new_contributions
+
+        found = np.flatnonzero(indexer != -1)
+        if len(found) > 0:
+            entry_ids = entries[indexer[found]]
+            positions = cached_positions[indexer[found]]
+            for entry in np.unique(entry_ids):
+                in_entry = entry_ids == entry
+                cached = np.load(os.path.join(key_dir, f"{entry}.contrib.npy"), mmap_mode="r")
+                if contributions is None:
+                    contributions = np.empty((len(x),) + cached.shape[1:], dtype=cached.dtype)
+                contributions[found[in_entry]] = cached[positions[in_entry]]
+                used_entries.add(entry)
+            if len(missing) == 0:
+                kind, meta = _read_meta(key_dir, entry_ids[0])
+
+        for entry in used_entries:
+            _touch(key_dir, entry)
+        self.evict()
+
+        return dict(contributions=_from_array(kind, contributions, meta, x.index))
+
+    def get_key(self, backend, x):
+        """
+        Fingerprint of the model, of the backend parameters and of the columns of x.
+
+        Parameters
+        ----------
+        backend : shapash.backend.BaseBackend
+            Backend used to compute the contributions.
+        x : pd.DataFrame
+            The observations dataframe used by the model
+
+        Returns
+        -------
+        str
+            Key of the cache
+        """
+        return joblib_hash(
+            [
+                type(backend).__module__,
+                type(backend).__name__,
+                joblib_hash(backend.model),
+                backend.get_cache_params(),
+                [str(col) for col in x.columns],
+                [str(dtype) for dtype in x.dtypes],
+            ]
+        )
+
+    def size(self):
+        """
+        Returns the total size of the files stored in the cache directory (in bytes).
+        """
+        return sum(size for _, _, size in _list_files(self.directory))
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the size of the directory is below max_size.
+        """
+        files = _list_files(self.directory)
+        total_size = sum(size for _, _, size in files)
+        if total_size <= self.max_size:
+            return
+        # An entry is made of several files sharing the same prefix
+        entries = dict()
+        for path, mtime, size in files:
+            if not path.endswith(".npy"):
+                continue
+            prefix = path.rsplit(".", 2)[0]
+            last_used, entry_size = entries.get(prefix, (mtime, 0))
+            entries[prefix] = (max(last_used, mtime), entry_size + size)
+        for prefix, (_, entry_size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if total_size <= self.max_size:
+                break
+            for suffix in [".contrib.npy", ".rows.npy", ".meta.pkl"]:
+                if os.path.exists(prefix + suffix):
+                    os.remove(prefix + suffix)
+            total_size -= entry_size
+
+    def clear(self):
+        """
+        Removes all the entries of the cache.
+        """
+        for path, _, _ in _list_files(self.directory):
+            os.remove(path)
+
+
+def _list_files(directory):
+    """List (path, modification time, size) of all the files of a directory"""
+    files = []
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            stat = os.stat(path)
+            files.append((path, stat.st_mtime, stat.st_size))
+    return files
+
+
+def _read_index(key_dir):
+    """
+    Read the row hashes of all the entries of a key directory.
+
+    Returns
+    -------
+    entries : np.ndarray
+        Entry name of each cached row.
+    hashes : np.ndarray
+        Hash of each cached row.
+    positions : np.ndarray
+        Position of each cached row in its entry.
+    """
+    entries, hashes, positions = [], [], []
+    for filename in sorted(os.listdir(key_dir)):
+        if filename.endswith(".rows.npy"):
+            entry = filename[: -len(".rows.npy")]
+            rows = np.load(os.path.join(key_dir, filename))
+            entries.append(np.full(len(rows), entry, dtype=object))
+            hashes.append(rows)
+            positions.append(np.arange(len(rows)))
+    if not hashes:
+        return np.array([], dtype=object), np.array([], dtype=np.uint64), np.array([], dtype=int)
+    hashes = np.concatenate(hashes)
+    # Keep a single occurrence of each row
+    _, first = np.unique(hashes, return_index=True)
+    return np.concatenate(entries)[first], hashes[first], np.concatenate(positions)[first]
+
+
+def _write_entry(key_dir, row_hashes, contributions, meta):
+    """Write a new entry and returns its name"""
+    entry = uuid.uuid4().hex
+    with open(os.path.join(key_dir, f"{entry}.meta.pkl"), "wb") as file:
+        pickle.dump(meta, file)
+    np.save(os.path.join(key_dir, f"{entry}.contrib.npy"), contributions)
+    # Row hashes are written last : an entry is only visible once it is complete
+    np.save(os.path.join(key_dir, f"{entry}.rows.npy"), row_hashes)
+    return entry
+
+
+def _read_meta(key_dir, entry):
+    """Read the type of contributions stored in an entry"""
+    with open(os.path.join(key_dir, f"{entry}.meta.pkl"), "rb") as file:
+        return pickle.load(file)
+
+
+def _touch(key_dir, entry):
+    """Update the last use time of an entry"""
+    for suffix in [".contrib.npy", ".rows.npy", ".meta.pkl"]:
+        path = os.path.join(key_dir, entry + suffix)
+        if os.path.exists(path):
+            os.utime(path)
+
+
+def _to_array(contributions):
+    """
+    Convert contributions returned by a backend into a single array whose first axis is the rows.
+
+    Returns
+    -------
+    kind : str
+        Type of the contributions : 'array', 'array_list', 'frame' or 'frame_list'.
+    array : np.ndarray
+        Contributions
+    meta : object
+        Columns of the contributions if they are dataframes, None otherwise.
+    """
+    if isinstance(contributions, pd.DataFrame):
+        return "frame", contributions.values, list(contributions.columns)
+    elif isinstance(contributions, list) and all(isinstance(c, pd.DataFrame) for c in contributions):
+        return "frame_list", np.stack([c.values for c in contributions], axis=1), list(contributions[0].columns)
+    elif isinstance(contributions, list):
+        return "array_list", np.stack([np.asarray(c) for c in contributions], axis=1), None
+    else:
+        return "array", np.asarray(contributions), None
+
+
+def _from_array(kind, array, meta, index):
+    """Inverse of _to_array"""
+    if kind == "frame":
+        return pd.DataFrame(array, columns=meta, index=index)
+    elif kind == "frame_list":
+        return [pd.DataFrame(array[:, i], columns=meta, index=index) for i in range(array.shape[1])]
+    elif kind == "array_list":
+        return [array[:, i] for i in range(array.shape[1])]
+    else:
+        return array
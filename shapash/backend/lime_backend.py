@@ -5,27 +5,54 @@ try:
 except ImportError:
     is_lime_available = False
 
+import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
 
 from shapash.backend.base_backend import BaseBackend
 
 
 class LimeBackend(BaseBackend):
-    """The Lime Backend"""
+    """The Lime Backend
+
+    Parameters
+    ----------
+    model : any
+        Model used.
+    preprocessing : category_encoders, ColumnTransformer, list or dict, optional
+        The processing apply to the original data.
+    data : pd.DataFrame, optional
+        Training data used by lime to compute features statistics. Default is the explained dataset.
+    n_jobs : int (default: 1)
+        Number of processes used to explain the rows. -1 means using all processors.
+    random_state : int (default: 0)
+        Seed of the lime sampling. Each row is explained with its own seed derived from this one
+        and from the row values, so that the contributions of a row do not depend on n_jobs nor
+        on the other rows explained with it.
+    cache : str or ContributionsCache, optional
+        Directory (or cache instance) used to store the computed contributions on disk.
+        As lime statistics are computed on the explained dataset when data is None,
+        data should be given when using a cache.
+    """
 
     column_aggregation = "sum"
     name = "lime"
     support_groups = False
 
-    def __init__(self, model, preprocessing=None, data=None, **kwargs):
-        super().__init__(model, preprocessing)
+    def __init__(self, model, preprocessing=None, data=None, n_jobs=1, random_state=0, cache=None, **kwargs):
+        super().__init__(model, preprocessing, cache)
         self.explainer = None
         self.data = data
+        self.n_jobs = n_jobs
+        self.random_state = random_state
 
     def run_explainer(self, x: pd.DataFrame):
         """
         Computes local contributions using Lime explainer
 
+        Rows are distributed over `n_jobs` processes. For multiclass models, each row is
+        explained once and the contributions of every class are read from this explanation.
+
         Parameters
         ----------
         x : pd.DataFrame
@@ -37,46 +64,106 @@ class LimeBackend(BaseBackend):
             dict containing local contributions
         """
         data = self.data if self.data is not None else x
-        explainer = lime_tabular.LimeTabularExplainer(data.values, feature_names=x.columns, mode=self._case)
-
-        lime_contrib = []
-        for i in x.index:
-            if self._case == "classification":
-                num_classes = len(self._classes)
-
-                if num_classes <= 2:
-                    exp = explainer.explain_instance(x.loc[i], self.model.predict_proba, num_features=x.shape[1])
-                    lime_contrib.append({_transform_name(var_name[0], x): var_name[1] for var_name in exp.as_list()})
-
-                elif num_classes > 2:
-                    contribution = []
-                    for j in range(num_classes):
-                        list_contrib = []
-                        df_contrib = pd.DataFrame()
-                        for i in x.index:
-                            exp = explainer.explain_instance(
-                                x.loc[i], self.model.predict_proba, top_labels=num_classes, num_features=x.shape[1]
-                            )
-                            list_contrib.append(
-                                {_transform_name(var_name[0], x): var_name[1] for var_name in exp.as_list(j)}
-                            )
-                            df_contrib = pd.DataFrame(list_contrib)
-                            df_contrib = df_contrib[list(x.columns)]
-                        contribution.append(df_contrib.values)
-                    return contribution
-
-            else:
-                exp = explainer.explain_instance(x.loc[i], self.model.predict, num_features=x.shape[1])
-                lime_contrib.append({_transform_name(var_name[0], x): var_name[1] for var_name in exp.as_list()})
-
-        contributions = pd.DataFrame(lime_contrib, index=x.index)
-        contributions = contributions[list(x.columns)]
+        seeds = _row_seeds(x, self.random_state)
+        n_chunks = max(min(effective_n_jobs(self.n_jobs), len(x)), 1)
+        list_contrib = Parallel(n_jobs=self.n_jobs)(
+            delayed(_explain_rows)(self.model, self._case, self._classes, data, x.iloc[pos], seeds[pos])
+            for pos in np.array_split(np.arange(len(x)), n_chunks)
+        )
+        lime_contrib = [contrib for chunk_contrib in list_contrib for contrib in chunk_contrib]
+
+        if self._case == "classification" and len(self._classes) > 2:
+            contributions = [
+                pd.DataFrame([row_contrib[j] for row_contrib in lime_contrib], index=x.index)[list(x.columns)]
+                for j in range(len(self._classes))
+            ]
+        else:
+            contributions = pd.DataFrame(lime_contrib, index=x.index)
+            contributions = contributions[list(x.columns)]
 
         explain_data = dict(contributions=contributions)
 
         return explain_data
 
 
+def _explain_rows(model, case, classes, data, x, seeds):
+    """
+    Explain each row of x with lime. Defined at module level so that it can be sent
+    to worker processes.
+
+    Parameters
+    ----------
+    model : any
+        Model used.
+    case : str
+        'classification' or 'regression'
+    classes : list or None
+        Classes of the model.
+    data : pd.DataFrame
+        Training data used to build the lime explainer.
+    x : pd.DataFrame
+        Rows to explain.
+    seeds : np.ndarray
+        Random seed used to explain each row.
+
+    Returns
+    -------
+    list
+        For each row, a dict of contributions by feature, or a list of such dicts
+        (one for each class) for multiclass models.
+    """
+    explainer = lime_tabular.LimeTabularExplainer(data.values, feature_names=x.columns, mode=case)
+    num_features = x.shape[1]
+
+    lime_contrib = []
+    for i, seed in zip(x.index, seeds):
+        _set_explainer_seed(explainer, seed)
+        if case == "classification":
+            num_classes = len(classes)
+
+            if num_classes <= 2:
+                exp = explainer.explain_instance(x.loc[i], model.predict_proba, num_features=num_features)
+                lime_contrib.append({_transform_name(var_name[0], x): var_name[1] for var_name in exp.as_list()})
+
+            else:
+                exp = explainer.explain_instance(
+                    x.loc[i], model.predict_proba, top_labels=num_classes, num_features=num_features
+                )
+                lime_contrib.append(
+                    [
+                        {_transform_name(var_name[0], x): var_name[1] for var_name in exp.as_list(j)}
+                        for j in range(num_classes)
+                    ]
+                )
+
+        else:
+            exp = explainer.explain_instance(x.loc[i], model.predict, num_features=num_features)
+            lime_contrib.append({_transform_name(var_name[0], x): var_name[1] for var_name in exp.as_list()})
+
+    return lime_contrib
+
+
+def _row_seeds(x, random_state):
+    """
+    Random seed of each row of x, computed from the row values and random_state : a row gets
+    the same seed whatever its position in x and the batch it is explained in.
+    """
+    hashes = pd.util.hash_pandas_object(x, index=False).to_numpy(dtype=np.uint64)
+    # Overflows wrap around : the seed is the mix of the hash and random_state modulo 2**64, then 2**32
+    with np.errstate(over="ignore"):
+        mixed = hashes ^ (np.uint64(random_state) * np.uint64(0x9E3779B97F4A7C15))
+    return (mixed % np.uint64(2**32)).astype(np.int64)
+
+
+def _set_explainer_seed(explainer, seed):
+    """Reset all the random states used by a lime tabular explainer"""
+    random_state = np.random.RandomState(seed)
+    explainer.random_state = random_state
+    explainer.base.random_state = random_state
+    if explainer.discretizer is not None:
+        explainer.discretizer.random_state = random_state
+
+
 def _transform_name(var_name, x_df):
     """Function for transform name of LIME contribution shape to a comprehensive name"""
     for colname in list(x_df.columns):
@@ -0,0 +1,75 @@
+import pandas as pd
+
+from shapash.backend.base_backend import BaseBackend
+from shapash.utils.model_synoptic import catboost_model, lightgbm_model, xgboost_model
+
+
+class NativeBackend(BaseBackend):
+    """The Native Backend
+
+    Computes contributions with the built-in (multithreaded) shap values implementation
+    of LightGBM, XGBoost and CatBoost models. It does not need the shap library.
+
+    Parameters
+    ----------
+    model : any
+        Model used.
+    preprocessing : category_encoders, ColumnTransformer, list or dict, optional
+        The processing apply to the original data.
+    cache : str or ContributionsCache, optional
+        Directory (or cache instance) used to store the computed contributions on disk.
+    """
+
+    # Boosting libraries compute Tree SHAP values, that are summed when grouping features
+    column_aggregation = "sum"
+    name = "native"
+
+    def __init__(self, model, preprocessing=None, cache=None, **kwargs):
+        super().__init__(model, preprocessing, cache)
+        if str(type(model)) not in lightgbm_model + xgboost_model + catboost_model:
+            raise ValueError(
+                f"Model {type(model)} is not supported by the native backend. "
+                "Only LightGBM, XGBoost and CatBoost models are supported."
+            )
+
+    def run_explainer(self, x: pd.DataFrame) -> dict:
+        """
+        Computes local contributions using the contributions prediction of the model library.
+
+        Parameters
+        ----------
+        x : pd.DataFrame
+            The observations dataframe used by the model
+
+        Returns
+        -------
+        explain_data : dict
+            dict containing local contributions
+        """
+        model_type = str(type(self.model))
+        if model_type in lightgbm_model:
+            contributions = self.model.predict(x, pred_contrib=True)
+        elif model_type in xgboost_model:
+            import xgboost
+
+            booster = self.model if model_type == "<class 'xgboost.core.Booster'>" else self.model.get_booster()
+            contributions = booster.predict(xgboost.DMatrix(x), pred_contribs=True)
+        else:
+            import catboost
+
+            pool = catboost.Pool(x, cat_features=self.model.get_cat_feature_indices())
+            contributions = self.model.get_feature_importance(pool, type="ShapValues")
+
+        n_features = x.shape[1]
+        # Multiclass contributions of LightGBM are concatenated class by class
+        if contributions.ndim == 2 and contributions.shape[1] > n_features + 1:
+            contributions = contributions.reshape(x.shape[0], -1, n_features + 1)
+
+        # The last column contains the expected value of the model
+        if contributions.ndim == 3:
+            contributions = [contributions[:, i, :-1] for i in range(contributions.shape[1])]
+        else:
+            contributions = contributions[:, :-1]
+
+        explain_data = dict(contributions=contributions)
+        return explain_data
@@ -1,23 +1,68 @@
 import numpy as np
 import pandas as pd
 import shap
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.utils import resample
 
 from shapash.backend.base_backend import BaseBackend
 
 
 class ShapBackend(BaseBackend):
-    """The Shap Backend"""
+    """The Shap Backend
+
+    Parameters
+    ----------
+    model : any
+        Model used.
+    preprocessing : category_encoders, ColumnTransformer, list or dict, optional
+        The processing apply to the original data.
+    masker : pd.DataFrame or shap masker, optional
+        Masker (background data) passed to the shap explainer.
+    explainer_args : dict, optional
+        Parameters used to build the shap explainer.
+    explainer_compute_args : dict, optional
+        Parameters passed to the shap explainer when computing contributions.
+    n_jobs : int (default: 1)
+        Number of processes used to compute contributions. -1 means using all processors.
+    batch_size : int, optional
+        Maximum number of rows explained at once. If None and n_jobs != 1, rows are split
+        evenly between jobs.
+    background : str or pd.DataFrame (default: 'sample')
+        Background data used by model agnostic explainers (kernel, permutation, ...) when the
+        masker is a dataset. Possible values are 'sample' (sample stratified on the model
+        predictions), 'kmeans' (k-means summary), None (the whole masker) or a user-supplied
+        DataFrame. The chosen strategy is stored in the `background_strategy` attribute.
+    background_size : int (default: 100)
+        Maximum number of rows of the background data for 'sample' and 'kmeans' strategies.
+    cache : str or ContributionsCache, optional
+        Directory (or cache instance) used to store the computed contributions on disk.
+    """
 
     # When grouping features contributions together, Shap uses the sum of the contributions
     # of the features that belong to the group
     column_aggregation = "sum"
     name = "shap"
 
-    def __init__(self, model, preprocessing=None, masker=None, explainer_args=None, explainer_compute_args=None):
-        super().__init__(model, preprocessing)
+    def __init__(
+        self,
+        model,
+        preprocessing=None,
+        masker=None,
+        explainer_args=None,
+        explainer_compute_args=None,
+        n_jobs=1,
+        batch_size=None,
+        background="sample",
+        background_size=100,
+        cache=None,
+    ):
+        super().__init__(model, preprocessing, cache)
         self.masker = masker
         self.explainer_args = explainer_args if explainer_args else {}
         self.explainer_compute_args = explainer_compute_args if explainer_compute_args else {}
+        self.n_jobs = n_jobs
+        self.batch_size = batch_size
+        self.background_strategy = None
 
         if self.explainer_args:
             if "explainer" in self.explainer_args.keys():
@@ -33,18 +78,40 @@ class ShapBackend(BaseBackend):
             elif shap.explainers.Additive.supports_model_with_masker(model, self.masker):
                 self.explainer = shap.Explainer(model=model, masker=self.masker)
             # otherwise use a model agnostic method
-            elif hasattr(model, "predict_proba"):
-                self.explainer = shap.Explainer(model=model.predict_proba, masker=self.masker)
-            elif hasattr(model, "predict"):
-                self.explainer = shap.Explainer(model=model.predict, masker=self.masker)
+            elif hasattr(model, "predict_proba") or hasattr(model, "predict"):
+                self.masker, self.background_strategy = _summarize_background(
+                    model, self._case, self.masker, background, background_size
+                )
+                model_output = model.predict_proba if hasattr(model, "predict_proba") else model.predict
+                self.explainer = shap.Explainer(model=model_output, masker=self.masker)
             # if we get here then we don't know how to handle what was given to us
             else:
                 raise ValueError("The model is not recognized by Shapash! Model: " + str(model))
 
+    def get_cache_params(self) -> dict:
+        """
+        Parameters of the backend that change the computed contributions.
+        The explainer is identified by its class and its masker (the masker given to the
+        backend is not used by every explainer, e.g. tree explainers).
+
+        Returns
+        -------
+        dict
+            Parameters of the backend
+        """
+        params = super().get_cache_params()
+        params["explainer"] = type(self.explainer).__name__
+        params["masker"] = getattr(self.explainer, "masker", None)
+        return params
+
     def run_explainer(self, x: pd.DataFrame) -> dict:
         """
         Computes and returns local contributions using Shap explainer
 
+        If `batch_size` or `n_jobs` is set, x is split into chunks of rows that are explained
+        separately (in parallel processes if n_jobs != 1) and then concatenated back in the
+        original order.
+
         Parameters
         ----------
         x : pd.DataFrame
@@ -56,35 +123,223 @@ class ShapBackend(BaseBackend):
             local contributions
         """
         print("INFO: Shap explainer type -", self.explainer)
-        contributions = self.explainer(x, **self.explainer_compute_args)
-        explain_data = dict(contributions=contributions.values)
+        chunks = _split_rows(x, n_jobs=self.n_jobs, batch_size=self.batch_size)
+        if len(chunks) == 1:
+            contributions = _compute_contributions(self.explainer, x, self.explainer_compute_args)
+        else:
+            list_contributions = Parallel(n_jobs=self.n_jobs)(
+                delayed(_compute_contributions)(self.explainer, x_chunk, self.explainer_compute_args)
+                for x_chunk in chunks
+            )
+            contributions = np.concatenate(list_contributions, axis=0)
+        explain_data = dict(contributions=contributions)
         return explain_data
 
 
-def get_shap_interaction_values(x_df, explainer):
+def _compute_contributions(explainer, x, explainer_compute_args):
+    """
+    Compute the shap values of x with the given explainer.
+    Defined at module level so that it can be sent to worker processes.
+    """
+    return explainer(x, **explainer_compute_args).values
+
+
+def _summarize_background(model, case, masker, background="sample", background_size=100, random_state=0):
+    """
+    Summarize the background data used by model agnostic explainers, whose computation
+    time grows linearly with the number of background rows.
+
+    Parameters
+    ----------
+    model : any
+        Model used.
+    case : str
+        'classification' or 'regression'
+    masker : pd.DataFrame, np.ndarray or shap masker
+        Masker given to the backend. Only datasets are summarized.
+    background : str or pd.DataFrame (default: 'sample')
+        'sample', 'kmeans', None or a user-supplied DataFrame.
+    background_size : int (default: 100)
+        Maximum number of rows of the summarized background.
+    random_state : int (default: 0)
+        Seed used for sampling and clustering.
+
+    Returns
+    -------
+    masker : pd.DataFrame, np.ndarray or shap masker
+        Background data to use.
+    strategy : str or None
+        Name of the strategy applied : 'user', 'full', 'sample', 'kmeans' or None
+        if the masker is not a dataset.
+    """
+    if isinstance(background, pd.DataFrame):
+        return background, "user"
+    if not isinstance(masker, (pd.DataFrame, np.ndarray)):
+        return masker, None
+    if background is None or len(masker) <= background_size:
+        return masker, "full"
+    if background == "sample":
+        try:
+            strata = np.asarray(model.predict(masker)).ravel()
+            if case == "regression":
+                # Continuous predictions are stratified on their deciles
+                strata = pd.qcut(strata, q=10, labels=False, duplicates="drop")
+            sample = resample(
+                masker, n_samples=background_size, replace=False, stratify=strata, random_state=random_state
+            )
+        except ValueError:
+            # Strata too small to be represented in the sample
+            sample = resample(masker, n_samples=background_size, replace=False, random_state=random_state)
+        return sample, "sample"
+    elif background == "kmeans":
+        # shap.kmeans rounds centers to existing values of each feature so that they stay realistic
+        centers = shap.kmeans(masker, background_size).data
+        if isinstance(masker, pd.DataFrame):
+            centers = pd.DataFrame(centers, columns=masker.columns).astype(masker.dtypes.to_dict())
+        return centers, "kmeans"
+    else:
+        raise ValueError(f"Unknown background strategy : {background}")
+
+
+def _split_rows(x, n_jobs=1, batch_size=None):
+    """
+    Split a dataframe into consecutive chunks of rows.
+
+    Parameters
+    ----------
+    x : pd.DataFrame
+        Dataframe to split.
+    n_jobs : int
+        Number of jobs used to compute the chunks. If batch_size is None, x is split
+        into as many chunks as jobs.
+    batch_size : int, optional
+        Maximum number of rows of each chunk.
+
+    Returns
+    -------
+    list of pd.DataFrame
+        Chunks of x, in the original order of rows.
+    """
+    if batch_size is None:
+        batch_size = max(int(np.ceil(len(x) / effective_n_jobs(n_jobs))), 1)
+    elif batch_size < 1:
+        raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
+    if len(x) <= batch_size:
+        return [x]
+    return [x.iloc[i : i + batch_size] for i in range(0, len(x), batch_size)]
+
+
+def get_shap_interaction_values(x_df, explainer, n_jobs=1, batch_size=None, out=None):
     """
     Compute the shap interaction values for a given dataframe.
     Also checks if the explainer is a TreeExplainer.
 
+    If `batch_size` is set, the values are computed batch by batch (in parallel processes
+    if n_jobs != 1) and written into `out`, that can be a memory-mapped array.
+
     Parameters
     ----------
     x_df : pd.DataFrame
         DataFrame for which will be computed the interaction values using the explainer.
     explainer : shap.TreeExplainer
         explainer object used to compute the interaction values.
+    n_jobs : int (default: 1)
+        Number of processes used to compute the batches. -1 means using all processors.
+    batch_size : int, optional
+        Maximum number of rows computed at once.
+    out : np.ndarray, optional
+        Array of shape (# samples x # features x # features) in which the values are written,
+        for example a np.memmap.
 
     Returns
     -------
     shap_interaction_values : np.ndarray
         Shap interaction values for each sample as an array of shape (# samples x # features x # features).
     """
+    _check_tree_explainer(explainer)
+    if batch_size is None and n_jobs == 1 and out is None:
+        return _compute_interaction_values(explainer, x_df)
+
+    if out is None:
+        out = np.empty((len(x_df), x_df.shape[1], x_df.shape[1]))
+    for start, interaction_values in _iter_interaction_values(x_df, explainer, n_jobs, batch_size):
+        out[start : start + len(interaction_values)] = interaction_values
+    return out
+
+
+def get_shap_interactions_summary(x_df, explainer, top_k=5, n_jobs=1, batch_size=None):
+    """
+    Compute shap interaction values batch by batch and only keep, without storing
+    the (# samples x # features x # features) tensor :
+    - the sum of absolute interaction values of each pair of features,
+    - the top_k pairs of features with the largest absolute interaction values of each row.
+
+    Parameters
+    ----------
+    x_df : pd.DataFrame
+        DataFrame for which will be computed the interaction values using the explainer.
+    explainer : shap.TreeExplainer
+        explainer object used to compute the interaction values.
+    top_k : int (default: 5)
+        Number of pairs of features kept for each row.
+    n_jobs : int (default: 1)
+        Number of processes used to compute the batches. -1 means using all processors.
+    batch_size : int, optional
+        Maximum number of rows computed at once.
+
+    Returns
+    -------
+    dict
+        'abs_sum' : np.ndarray of shape (# features x # features), sum over rows of absolute
+        interaction values.
+        'top_pairs' : np.ndarray of shape (# samples x top_k x 2), indices (i, j) with i > j
+        of the pairs of features with the largest absolute interaction values of each row,
+        in descending order.
+        'top_values' : np.ndarray of shape (# samples x top_k), interaction values of these pairs.
+    """
+    _check_tree_explainer(explainer)
+    n_features = x_df.shape[1]
+    rows, cols = np.tril_indices(n_features, k=-1)
+    top_k = min(top_k, len(rows))
+    abs_sum = np.zeros((n_features, n_features))
+    top_pairs = np.empty((len(x_df), top_k, 2), dtype=np.min_scalar_type(max(n_features - 1, 0)))
+    top_values = np.empty((len(x_df), top_k))
+    for start, interaction_values in _iter_interaction_values(x_df, explainer, n_jobs, batch_size):
+        abs_sum += np.abs(interaction_values).sum(0)
+        pairs_values = interaction_values[:, rows, cols]
+        top = _top_k_indices(np.abs(pairs_values), top_k)
+        end = start + len(interaction_values)
+        top_pairs[start:end, :, 0] = rows[top]
+        top_pairs[start:end, :, 1] = cols[top]
+        top_values[start:end] = np.take_along_axis(pairs_values, top, axis=1)
+    return dict(abs_sum=abs_sum, top_pairs=top_pairs, top_values=top_values)
+
+
+def _top_k_indices(values, top_k):
+    """Indices of the top_k largest values of each row, in descending order."""
+    if 0 < top_k < values.shape[1]:
+        top = np.argpartition(-values, top_k - 1, axis=1)[:, :top_k]
+    else:
+        top = np.tile(np.arange(values.shape[1]), (len(values), 1))[:, :top_k]
+    order = np.argsort(-np.take_along_axis(values, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _check_tree_explainer(explainer):
+    """Interaction values can only be computed with a TreeExplainer."""
     if not isinstance(explainer, shap.TreeExplainer):
         raise ValueError(
             f"Explainer type ({type(explainer)}) is not a TreeExplainer. "
             f"Shap interaction values can only be computed for TreeExplainer types"
         )
 
-    shap_interaction_values = explainer.shap_interaction_values(x_df)
+
+def _compute_interaction_values(explainer, x):
+    """
+    Compute the shap interaction values of x with the given explainer.
+    Defined at module level so that it can be sent to worker processes.
+    """
+    shap_interaction_values = explainer.shap_interaction_values(x)
 
     # For models with vector outputs the previous function returns one array for each output.
     # We sum the contributions here.
@@ -92,3 +347,24 @@ def get_shap_interaction_values(x_df, explainer):
         shap_interaction_values = np.sum(shap_interaction_values, axis=0)
 
     return shap_interaction_values
+
+
+def _iter_interaction_values(x, explainer, n_jobs=1, batch_size=None):
+    """
+    Yield (position of the first row, interaction values) of each batch of rows of x.
+    Only n_jobs batches are held in memory at the same time.
+    """
+    chunks = _split_rows(x, n_jobs=n_jobs, batch_size=batch_size)
+    n_parallel = max(effective_n_jobs(n_jobs), 1)
+    start = 0
+    for i in range(0, len(chunks), n_parallel):
+        group = chunks[i : i + n_parallel]
+        if len(group) == 1:
+            list_values = [_compute_interaction_values(explainer, group[0])]
+        else:
+            list_values = Parallel(n_jobs=n_jobs)(
+                delayed(_compute_interaction_values)(explainer, x_chunk) for x_chunk in group
+            )
+        for interaction_values in list_values:
+            yield start, interaction_values
+            start += len(interaction_values)
@@ -2,6 +2,8 @@
 Contributions
 """
 
+from collections.abc import Mapping
+
 import numpy as np
 import pandas as pd
 
@@ -61,7 +63,7 @@ def inverse_transform_contributions(contributions, preprocessing=None, agg_colum
         return x_contrib_invers
 
 
-def rank_contributions(s_df, x_df):
+def rank_contributions(s_df, x_df, dtype=None):
     """
     Function to sort contributions and input features
     by decreasing contribution absolute values
@@ -72,6 +74,9 @@ def rank_contributions(s_df, x_df):
         Local contributions dataframe.
     x_df: pandas.DataFrame
         Input features.
+    dtype: str or numpy.dtype, optional
+        Float dtype of the sorted contributions. If given, the features names are also
+        stored with the smallest integer dtype that fits the number of features.
 
     Returns
     -------
@@ -83,17 +88,259 @@ def rank_contributions(s_df, x_df):
         Input features names sorted for each observation
         by decreasing contributions absolute values.
     """
-    argsort = np.argsort(-np.abs(s_df.values), axis=1)
-    sorted_contrib = np.take_along_axis(s_df.values, argsort, axis=1)
-    sorted_features = np.take_along_axis(x_df.values, argsort, axis=1)
+    var_dict = compute_sorted_indices(s_df, dtype)
+    s_ord = gather_sorted_values(s_df, var_dict, "contribution_")
+    if dtype is not None:
+        s_ord = s_ord.astype(dtype, copy=False)
+    x_ord = gather_sorted_values(x_df, var_dict, "feature_")
+    return [s_ord, x_ord, var_dict]
+
+
+def compute_sorted_indices(s_df, dtype=None):
+    """
+    Computes for each observation the indices of the features sorted
+    by decreasing contribution absolute values.
 
-    contrib_col = ["contribution_" + str(i) for i in range(s_df.shape[1])]
+    Parameters
+    ----------
+    s_df: pandas.DataFrame
+        Local contributions dataframe.
+    dtype: str or numpy.dtype, optional
+        If given, the indices are stored with the smallest integer dtype
+        that fits the number of features.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Input features names sorted for each observation
+        by decreasing contributions absolute values.
+    """
     col = ["feature_" + str(i) for i in range(s_df.shape[1])]
+    return pd.DataFrame(data=sorted_indices(s_df.values, dtype), columns=col, index=s_df.index)
+
+
+def sorted_indices(values, dtype=None):
+    """
+    Computes the indices that sort an array by decreasing absolute values along its last axis.
+
+    Parameters
+    ----------
+    values: numpy.ndarray
+        Local contributions, (n, f) or stacked (classes, n, f) array.
+    dtype: str or numpy.dtype, optional
+        If given, the indices are stored with the smallest integer dtype
+        that fits the number of features.
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted features indices, same shape as values.
+    """
+    argsort = np.argsort(-np.abs(values), axis=-1)
+    if dtype is not None:
+        argsort = argsort.astype(np.min_scalar_type(max(values.shape[-1] - 1, 0)))
+    return argsort
+
+
+def gather_sorted_values(df, var_dict, prefix):
+    """
+    Gathers the values of df in the order given by var_dict, row by row.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        Contributions or input features.
+    var_dict: pandas.DataFrame
+        Sorted features indices, with the same index as df.
+    prefix: str
+        Prefix of the columns names of the returned dataframe.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Values of df sorted for each observation.
+    """
+    values = np.take_along_axis(df.values, var_dict.values, axis=1)
+    columns = [prefix + str(i) for i in range(df.shape[1])]
+    return pd.DataFrame(data=values, columns=columns, index=df.index)
+
+
+class StackedFrames(list):
+    """
+    List of pandas.DataFrames, one per class, whose values are views of a single
+    (classes, n, f) array. Multi-class computations run on this array directly
+    instead of stacking the dataframes again on each call.
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        Stacked values, of shape (classes, n, f).
+    indexes : list
+        Index of each dataframe.
+    columns : list
+        Columns of each dataframe.
+    """
+
+    def __init__(self, array, indexes, columns):
+        super().__init__(
+            pd.DataFrame(values, index=index, columns=cols, copy=False)
+            for values, index, cols in zip(array, indexes, columns)
+        )
+        self.array = array
+        self._frames = tuple(self)
+
+    def __reduce__(self):
+        return StackedFrames, (self.array, [frame.index for frame in self], [frame.columns for frame in self])
+
+
+def stacked_array(frames):
+    """
+    Returns the (classes, n, f) array backing frames, None if frames is not an
+    unmodified StackedFrames.
+    """
+    if not isinstance(frames, StackedFrames) or len(frames) != len(frames._frames):
+        return None
+    if not all(frame is original for frame, original in zip(frames, frames._frames)):
+        return None
+    return frames.array
+
+
+class SortedContributions(Mapping):
+    """
+    Sorted contributions of a SmartExplainer, computed by rank_contributions.
+
+    Only the sorted features indices (var_dict) are stored : the sorted contributions
+    (contrib_sorted) and the sorted input features (x_sorted) are gathered from the
+    contributions and the prediction set when they are accessed, and the select method
+    only gathers the requested rows. This avoids to keep two copies of the prediction set
+    in memory, one of them with object dtype for mixed-type data.
+
+    Parameters
+    ----------
+    contributions : pandas.DataFrame or list of pandas.DataFrame
+        Local contributions (list for multiclass).
+    x_init : pandas.DataFrame
+        Prediction set.
+    var_dict : pandas.DataFrame or list of pandas.DataFrame
+        Sorted features indices, computed with compute_sorted_indices.
+    dtype : str or numpy.dtype, optional
+        Float dtype of the sorted contributions.
+
+    Example
+    --------
+    >>> data = SortedContributions(contributions, x_init, compute_sorted_indices(contributions))
+    >>> data["contrib_sorted"]
+    >>> data.select("x_sorted", [0, 1])
+    """
+
+    _prefixes = {"contrib_sorted": "contribution_", "x_sorted": "feature_"}
+
+    def __init__(self, contributions, x_init, var_dict, dtype=None):
+        self.contributions = contributions
+        self.x_init = x_init
+        self.var_dict = var_dict
+        self.dtype = dtype
+
+    def __getitem__(self, key):
+        return self.select(key)
+
+    def __iter__(self):
+        return iter(["contrib_sorted", "x_sorted", "var_dict"])
+
+    def __len__(self):
+        return 3
+
+    def select(self, key, index=None):
+        """
+        Returns the rows of contrib_sorted, x_sorted or var_dict with the given index.
+
+        Parameters
+        ----------
+        key : str
+            'contrib_sorted', 'x_sorted' or 'var_dict'.
+        index : list, optional
+            Index of the rows to return. All rows are returned by default.
+
+        Returns
+        -------
+        pandas.DataFrame or list of pandas.DataFrame
+            Sorted values (list for multiclass).
+        """
+        if key == "var_dict":
+            if index is None:
+                return self.var_dict
+            return _apply(lambda var_dict: _select_rows(var_dict, index), self.var_dict)
+        if key not in self._prefixes:
+            raise KeyError(key)
+        if key == "contrib_sorted":
+            stacked = self._select_stacked(index)
+            if stacked is not None:
+                return stacked
+        x_init = _select_rows(self.x_init, index)
+
+        def gather(contributions, var_dict):
+            var_dict = _select_rows(var_dict, index)
+            if key == "x_sorted":
+                return gather_sorted_values(x_init, var_dict, self._prefixes[key])
+            sorted_contrib = gather_sorted_values(_select_rows(contributions, index), var_dict, self._prefixes[key])
+            return sorted_contrib if self.dtype is None else sorted_contrib.astype(self.dtype, copy=False)
+
+        if isinstance(self.var_dict, list):
+            return [gather(contrib, var_dict) for contrib, var_dict in zip(self.contributions, self.var_dict)]
+        return gather(self.contributions, self.var_dict)
+
+    def _select_stacked(self, index):
+        """
+        Gathers contrib_sorted of all classes with a single operation on the stacked arrays
+        of contributions and var_dict. Returns None if they are not stacked.
+        """
+        contributions, var_dict = stacked_array(self.contributions), stacked_array(self.var_dict)
+        if contributions is None or var_dict is None or contributions.shape != var_dict.shape:
+            return None
+        row_index = self.contributions[0].index
+        if index is not None:
+            if np.ndim(index) != 1 or not row_index.is_unique:
+                return None
+            positions = row_index.get_indexer(index)
+            if (positions == -1).any():
+                return None
+            contributions, var_dict, row_index = contributions[:, positions], var_dict[:, positions], row_index[positions]
+        values = np.take_along_axis(contributions, var_dict, axis=2)
+        if self.dtype is not None:
+            values = values.astype(self.dtype, copy=False)
+        columns = [self._prefixes["contrib_sorted"] + str(i) for i in range(values.shape[2])]
+        return StackedFrames(values, [row_index] * len(values), [columns] * len(values))
+
+
+def get_sorted_rows(data, key, index):
+    """
+    Returns the rows of data[key] with the given index. When data is a SortedContributions,
+    the values are only gathered for these rows.
+
+    Parameters
+    ----------
+    data : dict or SortedContributions
+        Sorted contributions of a SmartExplainer.
+    key : str
+        'contrib_sorted', 'x_sorted' or 'var_dict'.
+    index : list
+        Index of the rows to return.
+
+    Returns
+    -------
+    pandas.DataFrame or list of pandas.DataFrame
+    """
+    if isinstance(data, SortedContributions):
+        return data.select(key, index)
+    return _apply(lambda df: df.loc[index], data[key])
+
+
+def _select_rows(df, index):
+    return df if index is None else df.loc[index]
+
 
-    s_dict = pd.DataFrame(data=argsort, columns=col, index=x_df.index)
-    s_ord = pd.DataFrame(data=sorted_contrib, columns=contrib_col, index=x_df.index)
-    x_ord = pd.DataFrame(data=sorted_features, columns=col, index=x_df.index)
-    return [s_ord, x_ord, s_dict]
+def _apply(func, value):
+    return [func(elem) for elem in value] if isinstance(value, list) else func(value)
 
 
 def assign_contributions(ranked):
@@ -1,6 +1,7 @@
 """
 Multi Decorator module
 """
+from shapash.decomposition.contributions import SortedContributions
 from shapash.explainer.smart_state import SmartState
 
 
@@ -142,6 +143,29 @@ class MultiDecorator:
         keys = list(dicts[0].keys())
         return {key: [d[key] for d in dicts] for key in keys}
 
+    def sort_contributions(self, contributions, x_init, dtype=None):
+        """
+        Override sort_contributions from SmartState. Returns a single mapping whose values
+        are lists, like assign_contributions.
+
+        Parameters
+        ----------
+        contributions : list
+            Local contributions to sort for each class.
+        x_init : pandas.DataFrame
+            Prediction set.
+        dtype : str or numpy.dtype, optional
+            Float dtype of the sorted contributions.
+
+        Returns
+        -------
+        SortedContributions
+            Mapping with contrib_sorted, x_sorted and var_dict keys.
+        """
+        sorted_contributions = self.delegate("sort_contributions", contributions, x_init, dtype=dtype)
+        var_dicts = [sorted_contrib["var_dict"] for sorted_contrib in sorted_contributions]
+        return SortedContributions(contributions, x_init, var_dicts, dtype)
+
     def check_contributions(self, contributions, x_init, features_names=True):
         """
         Override check_contributions from SmartState.
@@ -179,6 +203,37 @@ class MultiDecorator:
         transposed_masks = list(map(list, zip(*masks)))
         return self.delegate("combine_masks", transposed_masks)
 
+    def compute_mask(self, s_contribs, var_dicts, features_list=None, threshold=None, positive=None, max_contrib=None):
+        """
+        Override compute_mask. Compute in a single pass the mask of the filter method for each class.
+
+        Parameters
+        ----------
+        s_contribs : list
+            List of local contributions matrices sorted by decreasing absolute values.
+        var_dicts : list
+            List of dataframes with features indexes ordered by contribution (same order).
+        features_list : list, optional (default: None)
+            List of index, feature to hide.
+        threshold : float, optional (default: None)
+            Absolute threshold below which any contribution is hidden.
+        positive : bool, optional (default: None)
+            If True, hide negative values. False, hide positive values.
+            If None, hide nothing.
+        max_contrib : int, optional (default: None)
+            Maximum number of contributions to show.
+
+        Returns
+        -------
+        list
+            List of masks (pandas.DataFrames).
+        """
+        # var_dicts are only used to hide features
+        if features_list is None:
+            var_dicts = [None] * len(s_contribs)
+        arg_tup = list(zip(s_contribs, var_dicts))
+        return self.delegate("compute_mask", arg_tup, features_list, threshold, positive, max_contrib)
+
     def compute_masked_contributions(self, s_contrib, masks):
         """
         Override compute_masked_contributions. Apply a list of masks to a list of
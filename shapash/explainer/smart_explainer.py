@@ -3,6 +3,7 @@ Smart explainer module
 """
 import copy
 import logging
+import os
 import shutil
 import tempfile
 
@@ -11,9 +12,15 @@ import pandas as pd
 
 import shapash.explainer.smart_predictor
 from shapash.backend import BaseBackend, get_backend_cls_from_name
-from shapash.backend.shap_backend import get_shap_interaction_values
+from shapash.decomposition.contributions import SortedContributions, get_sorted_rows
+from shapash.manipulation.mask import pack_mask, unpack_mask
 from shapash.manipulation.select_lines import keep_right_contributions
-from shapash.manipulation.summarize import create_grouped_features_values
+from shapash.manipulation.summarize import (
+    create_grouped_features_values,
+    format_summary_dtypes,
+    normalize_features_import,
+    summary_columns,
+)
 from shapash.report import check_report_requirements
 from shapash.style.style_utils import colors_loading, select_palette
 from shapash.utils.check import (
@@ -24,12 +31,23 @@ from shapash.utils.check import (
     check_postprocessing,
     check_y,
 )
-from shapash.utils.explanation_metrics import find_neighbors, get_distance, get_min_nb_features, shap_neighbors
-from shapash.utils.io import load_pickle, save_pickle
+from shapash.utils.explanation_metrics import (
+    compute_neighbors_parameters,
+    find_neighbors,
+    get_distance,
+    get_min_nb_features,
+    shap_neighbors,
+)
+from shapash.utils.io import ChunkWriter, ColumnarReader, load_pickle, save_columnar, save_pickle
 from shapash.utils.model import predict, predict_error, predict_proba
+from shapash.utils.profiling import StageProfiler
 from shapash.utils.threading import CustomThread
 from shapash.utils.transform import apply_postprocessing, handle_categorical_missing, inverse_transform
-from shapash.utils.utils import get_host_name
+from shapash.utils.utils import (
+    cast_float_columns,
+    compute_sorted_variables_interactions_list_indices,
+    get_host_name,
+)
 from shapash.webapp.smart_app import SmartApp
 
 from .smart_plotter import SmartPlotter
@@ -51,7 +69,7 @@ class SmartExplainer:
         predict and predict_proba values
     backend : str or shapash.backend object (default: 'shap')
         Select which computation method to use in order to compute contributions
-        and feature importance. Possible values are 'shap' or 'lime'. Default is 'shap'.
+        and feature importance. Possible values are 'shap', 'lime' or 'native'. Default is 'shap'.
         It is also possible to pass a backend class inherited from shpash.backend.BaseBackend.
     preprocessing : category_encoders, ColumnTransformer, list, dict, optional (default: None)
         --> Differents types of preprocessing are available:
@@ -101,6 +119,10 @@ class SmartExplainer:
     colors_dic : dict
         dictionnary contaning every palettes of colors. You can use this parameter to change
         any color of the graphs.
+    dtype : str or numpy.dtype, optional (default: None)
+        Float dtype (e.g. 'float32') used to store contributions, sorted data and the float
+        columns of x_init and x_encoded after compile. var_dict is then stored with the smallest
+        integer dtype that fits the number of features. Default keeps float64.
     **backend_kwargs : dict
         Keyword parameters to be passed to the backend.
 
@@ -111,7 +133,8 @@ class SmartExplainer:
         (classification - The length of the lists is equivalent to the number of labels).
         All pd.DataFrame have she same shape (n_samples, n_features).
         For the regression case, data that should be regarded as a single array
-        of size (n_samples, n_features, 3).
+        of size (n_samples, n_features, 3). Only data['var_dict'] is stored : data['contrib_sorted']
+        and data['x_sorted'] are gathered from contributions and x_init when they are accessed.
         data['contrib_sorted']: pandas.DataFrame (regression) or list of pandas.DataFrame (classification)
             Contains local contributions of the prediction set, with common line index.
             Columns are 'contrib_1', 'contrib_2', ... and contains the top contributions
@@ -155,6 +178,9 @@ class SmartExplainer:
         Dictionary that references the numbers of feature values ​​in the x_init
     features_imp: pandas.Series (regression) or list (classification)
         Features importance values
+    compile_profile: pandas.DataFrame
+        Wall time (seconds), peak RSS delta (MB, None if not available on the platform) and number
+        of rows and columns processed by each stage of the last compile.
     local_neighbors: dict
         Dictionary of values to be displayed on the local_neighbors plot.
         The key is "norm_shap (normalized contributions values of instance and neighbors)
@@ -176,6 +202,18 @@ class SmartExplainer:
     >>> xpl.plot.features_importance()
     """
 
+    # Attributes that a lazy compile computes on first use
+    _LAZY_ATTRIBUTES = ["data", "features_desc", "x_init_groups", "columns_dict_groups", "data_groups"]
+    _lazy_attributes = frozenset()
+    # Masks of the filter method, cached for each set of parameters
+    _mask_cache = None
+    _mask_cache_size = 8
+    # Std.dev vector and radius of the neighbors search of x_encoded, computed by compute_features_stability
+    _neighbors_parameters = None
+    # True when y_pred / proba_values were computed with the model by the explainer, not given by the user
+    _y_pred_from_model = False
+    _proba_values_from_model = False
+
     def __init__(
         self,
         model,
@@ -188,6 +226,7 @@ class SmartExplainer:
         title_story: str = None,
         palette_name=None,
         colors_dict=None,
+        dtype=None,
         **backend_kwargs,
     ):
         if features_dict is not None and not isinstance(features_dict, dict):
@@ -202,8 +241,11 @@ class SmartExplainer:
                 label_dict must be a dict
                 """
             )
+        if dtype is not None and np.dtype(dtype).kind != "f":
+            raise ValueError(f"dtype must be a float dtype, got {dtype}")
         self.model = model
         self.preprocessing = preprocessing
+        self.dtype = dtype
         self.backend_name = None
         if isinstance(backend, str):
             self.backend_name = backend
@@ -238,6 +280,7 @@ class SmartExplainer:
         self.contributions = None
         self.explain_data = None
         self.features_imp = None
+        self._features_abs_sums = None
 
     def compile(
         self,
@@ -248,6 +291,8 @@ class SmartExplainer:
         y_target=None,
         additional_data=None,
         additional_features_dict=None,
+        profile_hook=None,
+        lazy=False,
     ):
         """
         The compile method is the first step to understand model and
@@ -289,61 +334,107 @@ class SmartExplainer:
             in Shapash SmartApp.
         additional_features_dict : dict
             Dictionary mapping technical feature names to domain names for additional data.
+        profile_hook : callable, optional
+            Function called with a dict (stage, wall_time, peak_rss_delta, n_rows, n_cols) at the
+            end of each stage of compile, for example to push the numbers to a metrics system.
+            The same numbers are stored in the compile_profile attribute.
+        lazy : bool (default: False)
+            If True, data, features_desc and the groups attributes (x_init_groups, columns_dict_groups,
+            data_groups) are only computed the first time they are used (by a plot, to_pandas, the webapp...).
+            Useful when only contributions and features importance are needed.
 
         Example
         --------
         >>> xpl.compile(x=x_test)
+        >>> xpl.compile_profile
         """
+        profiler = StageProfiler(hook=profile_hook)
         if isinstance(self.backend_name, str):
-            backend_cls = get_backend_cls_from_name(self.backend_name)
-            self.backend = backend_cls(
-                model=self.model, preprocessing=self.preprocessing, masker=x, **self.backend_kwargs
-            )
-        self.x_encoded = handle_categorical_missing(x)
-        x_init = inverse_transform(self.x_encoded, self.preprocessing)
-        self.x_init = handle_categorical_missing(x_init)
+            with profiler.stage("backend", x):
+                backend_cls = get_backend_cls_from_name(self.backend_name)
+                self.backend = backend_cls(
+                    model=self.model, preprocessing=self.preprocessing, masker=x, **self.backend_kwargs
+                )
+        with profiler.stage("handle_categorical_missing", x):
+            self.x_encoded = handle_categorical_missing(x)
+        with profiler.stage("inverse_transform", x):
+            x_init = inverse_transform(self.x_encoded, self.preprocessing)
+            self.x_init = handle_categorical_missing(x_init)
         self.y_pred = check_y(self.x_init, y_pred, y_name="y_pred")
+        self._y_pred_from_model = False
         if (self.y_pred is None) and (hasattr(self.model, "predict")):
-            self.predict()
+            with profiler.stage("predict", x):
+                self.predict()
 
         self.proba_values = check_y(self.x_init, proba_values, y_name="proba_values")
+        self._proba_values_from_model = False
         if (self._case == "classification") and (self.proba_values is None) and (hasattr(self.model, "predict_proba")):
-            self.predict_proba()
+            with profiler.stage("predict_proba", x):
+                self.predict_proba()
 
         self.y_target = check_y(self.x_init, y_target, y_name="y_target")
         self.prediction_error = predict_error(self.y_target, self.y_pred, self._case)
 
-        self._get_contributions_from_backend_or_user(x, contributions)
-        self.check_contributions()
+        with profiler.stage("contributions", x):
+            self._get_contributions_from_backend_or_user(x, contributions)
+            self.check_contributions()
+        self._features_abs_sums = None
+        self._mask_cache = None
+        self._neighbors_parameters = None
+        if self.dtype is not None:
+            self.x_encoded = cast_float_columns(self.x_encoded, self.dtype)
 
         self.columns_dict = {i: col for i, col in enumerate(self.x_init.columns)}
         self.check_features_dict()
         self.inv_features_dict = {v: k for k, v in self.features_dict.items()}
-        self._apply_all_postprocessing_modifications()
-
-        self.data = self.state.assign_contributions(self.state.rank_contributions(self.contributions, self.x_init))
-        self.features_desc = dict(self.x_init.nunique())
+        with profiler.stage("postprocessing", self.x_init):
+            self._apply_all_postprocessing_modifications()
+            if self.dtype is not None:
+                self.x_init = cast_float_columns(self.x_init, self.dtype)
+                if self.postprocessing_modifications:
+                    self.x_contrib_plot = cast_float_columns(self.x_contrib_plot, self.dtype)
+
+        # Attributes computed on first use in lazy mode
+        lazy_attributes = ["data", "features_desc"]
+        if self.features_groups is not None:
+            lazy_attributes += ["x_init_groups", "columns_dict_groups", "data_groups"]
+        for name in self._LAZY_ATTRIBUTES:
+            self.__dict__.pop(name, None)
+            self._discard_unloaded_attribute(name)
+        self._lazy_attributes = set(lazy_attributes) if lazy else set()
+        if not lazy:
+            with profiler.stage("rank_contributions", self.x_init):
+                self._compute_lazy_attribute("data")
+            with profiler.stage("features_desc", self.x_init):
+                self._compute_lazy_attribute("features_desc")
         if self.features_groups is not None:
-            self._compile_features_groups(self.features_groups)
+            with profiler.stage("features_groups", self.x_init):
+                self._compile_features_groups(self.features_groups)
         self.additional_features_dict = (
             dict()
             if additional_features_dict is None
             else self._compile_additional_features_dict(additional_features_dict)
         )
-        self.additional_data = self._compile_additional_data(additional_data)
+        with profiler.stage("additional_data", additional_data):
+            self.additional_data = self._compile_additional_data(additional_data)
+        self.compile_profile = profiler.to_frame()
 
     def _get_contributions_from_backend_or_user(self, x, contributions):
         # Computing contributions using backend
         if contributions is None:
-            self.explain_data = self.backend.run_explainer(x=x)
-            self.contributions = self.backend.get_local_contributions(x=x, explain_data=self.explain_data)
+            self.explain_data = self.backend.get_explain_data(x=x)
+            self.contributions = self.backend.get_local_contributions(
+                x=x, explain_data=self.explain_data, dtype=self.dtype
+            )
         else:
             self.explain_data = contributions
             self.contributions = self.backend.format_and_aggregate_local_contributions(
                 x=x,
                 contributions=contributions,
+                dtype=self.dtype,
             )
         self.state = self.backend.state
+        self.contributions = self.state.prepare_contributions(self.contributions)
 
     def _apply_all_postprocessing_modifications(self):
         postprocessing = self.modify_postprocessing(self.postprocessing)
@@ -365,20 +456,66 @@ class SmartExplainer:
         self.features_imp_groups = None
         # Update features dict with groups names
         self._update_features_dict_with_groups(features_groups=features_groups)
-        # Compute t-sne projections for groups of features
-        self.x_init_groups = create_grouped_features_values(
-            x_init=self.x_init,
-            x_encoded=self.x_encoded,
-            preprocessing=self.preprocessing,
-            features_groups=self.features_groups,
-            features_dict=self.features_dict,
-            how="dict_of_values",
-        )
-        # Compute data attribute for groups of features
-        self.data_groups = self.state.assign_contributions(
-            self.state.rank_contributions(self.contributions_groups, self.x_init_groups)
-        )
-        self.columns_dict_groups = {i: col for i, col in enumerate(self.x_init_groups.columns)}
+        if "x_init_groups" not in self._lazy_attributes:
+            self._compute_lazy_attribute("x_init_groups")
+            self._compute_lazy_attribute("data_groups")
+
+    def __getattr__(self, name):
+        # Only called when the attribute is not found : attributes of a lazy compile are computed here,
+        # attributes of a partially loaded save are read here
+        if name in self.__dict__.get("_unloaded_attributes", ()):
+            self.__dict__[name] = self._columnar_reader.read(name)
+            self._discard_unloaded_attribute(name)
+            return self.__dict__[name]
+        if name in self.__dict__.get("_lazy_attributes", ()):
+            self._compute_lazy_attribute(name)
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _discard_unloaded_attribute(self, name):
+        """
+        Mark an attribute of a partially loaded save as read. Once all the attributes are read,
+        the reader is dropped so that the explainer no longer depends on the save directory.
+        """
+        unloaded = self.__dict__.get("_unloaded_attributes")
+        if unloaded is None:
+            return
+        unloaded.discard(name)
+        if not unloaded:
+            self.__dict__.pop("_unloaded_attributes")
+            self.__dict__.pop("_columnar_reader", None)
+
+    def _compute_lazy_attribute(self, name):
+        """
+        Compute an attribute that compile does not compute in lazy mode.
+        """
+        # Explainers saved before lazy compile existed only have the frozenset class attribute
+        lazy_attributes = self.__dict__.get("_lazy_attributes", set())
+        if name == "data":
+            self.data = self.state.sort_contributions(self.contributions, self.x_init, dtype=self.dtype)
+        elif name == "features_desc":
+            self.features_desc = dict(self.x_init.nunique())
+            for group_name in (self.features_groups or {}).keys():
+                self.features_desc[group_name] = 1000
+        elif name in ["x_init_groups", "columns_dict_groups"]:
+            # Compute t-sne projections for groups of features
+            self.x_init_groups = create_grouped_features_values(
+                x_init=self.x_init,
+                x_encoded=self.x_encoded,
+                preprocessing=self.preprocessing,
+                features_groups=self.features_groups,
+                features_dict=self.features_dict,
+                how="dict_of_values",
+            )
+            self.columns_dict_groups = {i: col for i, col in enumerate(self.x_init_groups.columns)}
+            lazy_attributes.discard("x_init_groups")
+            lazy_attributes.discard("columns_dict_groups")
+        elif name == "data_groups":
+            # Compute data attribute for groups of features
+            self.data_groups = self.state.sort_contributions(
+                self.contributions_groups, self.x_init_groups, dtype=self.dtype
+            )
+        lazy_attributes.discard(name)
 
     def _compile_additional_features_dict(self, additional_features_dict):
         """
@@ -467,10 +604,12 @@ class SmartExplainer:
         """
         if y_pred is not None:
             self.y_pred = check_y(self.x_init, y_pred, y_name="y_pred")
+            self._y_pred_from_model = False
             if hasattr(self, "y_target"):
                 self.prediction_error = predict_error(self.y_target, self.y_pred, self._case)
         if proba_values is not None:
             self.proba_values = check_y(self.x_init, proba_values, y_name="proba_values")
+            self._proba_values_from_model = False
         if y_target is not None:
             self.y_target = check_y(self.x_init, y_target, y_name="y_target")
             if hasattr(self, "y_pred"):
@@ -502,7 +641,177 @@ class SmartExplainer:
         if additional_data is not None:
             self.additional_data = self._compile_additional_data(additional_data)
 
-    def get_interaction_values(self, n_samples_max=None, selection=None):
+    def append(self, x, contributions=None, y_pred=None, proba_values=None, y_target=None, additional_data=None):
+        """
+        The append method explains new rows and adds them to a compiled SmartExplainer,
+        without compiling again the rows already explained.
+        Inverse transformation, predictions, contributions and ranking are only computed
+        for the new rows. Features importance is updated incrementally and the filter
+        previously applied is applied again.
+        Parameters
+        ----------
+        x : pandas.DataFrame
+            New rows of the prediction set. The index must not overlap the index of x_init.
+        contributions : pandas.DataFrame, np.ndarray or list, optional (default: None)
+            Contributions of the new rows, computed with the backend if None.
+        y_pred : pandas.Series or pandas.DataFrame, optional (default: None)
+            Prediction values of the new rows. Computed with the model if None and
+            the explainer has prediction values.
+        proba_values : pandas.Series or pandas.DataFrame, optional (default: None)
+            Probability values of the new rows. Computed with the model if None and
+            the explainer has probability values.
+        y_target : pandas.Series or pandas.DataFrame, optional (default: None)
+            Target values of the new rows. Required if the explainer has target values.
+        additional_data : pandas.DataFrame, optional (default: None)
+            Additional data of the new rows. Required if the explainer has additional data.
+
+        Example
+        --------
+        >>> xpl.compile(x=x_history)
+        >>> xpl.append(x=x_today)
+        """
+        if self.contributions is None:
+            raise ValueError("append method must be called after compile")
+        if x.index.isin(self.x_init.index).any() or x.index.has_duplicates:
+            raise ValueError("Index of x must be unique and must not overlap the index of the compiled dataset")
+        for name, old, new in [
+            ("y_target", self.y_target, y_target),
+            ("additional_data", self.additional_data, additional_data),
+        ]:
+            if (old is None) != (new is None):
+                raise ValueError(f"{name} must be given to append if and only if it was given to compile")
+
+        x_encoded = handle_categorical_missing(x)
+        x_init = handle_categorical_missing(inverse_transform(x_encoded, self.preprocessing))
+
+        y_pred = check_y(x_init, y_pred, y_name="y_pred")
+        if y_pred is not None:
+            self._y_pred_from_model = False
+        elif self.y_pred is not None:
+            y_pred = predict(self.model, x_encoded)
+            y_pred.columns = self.y_pred.columns
+        proba_values = check_y(x_init, proba_values, y_name="proba_values")
+        if proba_values is not None:
+            self._proba_values_from_model = False
+        elif self.proba_values is not None:
+            proba_values = predict_proba(self.model, x_encoded, self._classes)
+            proba_values.columns = self.proba_values.columns
+        y_target = check_y(x_init, y_target, y_name="y_target")
+
+        if contributions is None:
+            explain_data = self.backend.get_explain_data(x=x)
+            contributions = self.backend.get_local_contributions(x=x, explain_data=explain_data, dtype=self.dtype)
+        else:
+            explain_data = contributions
+            contributions = self.backend.format_and_aggregate_local_contributions(
+                x=x, contributions=contributions, dtype=self.dtype
+            )
+        if not self.state.check_contributions(contributions, x_init):
+            raise ValueError("Prediction set and contributions should have exactly the same number of lines")
+
+        if self.postprocessing_modifications:
+            x_contrib_plot = x_init.copy()
+        if self.postprocessing:
+            x_init = apply_postprocessing(x_init, self.postprocessing)
+        if self.dtype is not None:
+            x_encoded = cast_float_columns(x_encoded, self.dtype)
+            x_init = cast_float_columns(x_init, self.dtype)
+            if self.postprocessing_modifications:
+                x_contrib_plot = cast_float_columns(x_contrib_plot, self.dtype)
+        if "data" not in self._lazy_attributes:
+            var_dict = self.state.sort_contributions(contributions, x_init, dtype=self.dtype)["var_dict"]
+            var_dict = self.state.prepare_contributions(_concat_rows(self.data["var_dict"], var_dict))
+
+        if self.features_imp is not None:
+            self.features_imp = self._append_features_import("contributions", contributions)
+        self.explain_data = _concat_rows(self.explain_data, explain_data)
+        self.contributions = self.state.prepare_contributions(_concat_rows(self.contributions, contributions))
+        self.x_encoded = _concat_rows(self.x_encoded, x_encoded)
+        self.x_init = _concat_rows(self.x_init, x_init)
+        if self.postprocessing_modifications:
+            self.x_contrib_plot = _concat_rows(self.x_contrib_plot, x_contrib_plot)
+        self.y_pred = _concat_rows(self.y_pred, y_pred)
+        self.proba_values = _concat_rows(self.proba_values, proba_values)
+        self.y_target = _concat_rows(self.y_target, y_target)
+        self.prediction_error = predict_error(self.y_target, self.y_pred, self._case)
+        if "data" not in self._lazy_attributes:
+            # Sorted values are gathered from the concatenated contributions and prediction set
+            self.data = SortedContributions(self.contributions, self.x_init, var_dict, self.dtype)
+        # Counting the unique values needs all the rows : it is computed again on first use
+        self.__dict__.pop("features_desc", None)
+        self._discard_unloaded_attribute("features_desc")
+        self._lazy_attributes = set(self._lazy_attributes) | {"features_desc"}
+
+        if self.features_groups is not None:
+            contributions_groups = self.state.compute_grouped_contributions(contributions, self.features_groups)
+            if "x_init_groups" not in self._lazy_attributes:
+                x_init_groups = create_grouped_features_values(
+                    x_init=x_init,
+                    x_encoded=x_encoded,
+                    preprocessing=self.preprocessing,
+                    features_groups=self.features_groups,
+                    features_dict=self.features_dict,
+                    how="dict_of_values",
+                )
+                self.x_init_groups = _concat_rows(self.x_init_groups, x_init_groups)
+                if "data_groups" not in self._lazy_attributes:
+                    var_dict_groups = self.state.sort_contributions(
+                        contributions_groups, x_init_groups, dtype=self.dtype
+                    )["var_dict"]
+                    var_dict_groups = self.state.prepare_contributions(
+                        _concat_rows(self.data_groups["var_dict"], var_dict_groups)
+                    )
+            if self.features_imp_groups is not None:
+                self.features_imp_groups = self._append_features_import("contributions_groups", contributions_groups)
+            self.contributions_groups = self.state.prepare_contributions(
+                _concat_rows(self.contributions_groups, contributions_groups)
+            )
+            if "data_groups" not in self._lazy_attributes:
+                self.data_groups = SortedContributions(
+                    self.contributions_groups, self.x_init_groups, var_dict_groups, self.dtype
+                )
+
+        if additional_data is not None:
+            check_additional_data(x_init, additional_data)
+            self.additional_data = _concat_rows(self.additional_data, additional_data.add_prefix("_"))
+
+        if hasattr(self, "mask_params"):
+            # filter method does not keep display_groups : it is deduced from the shape of the mask
+            mask = self.mask[0] if isinstance(self.mask, list) else self.mask
+            contributions_groups = getattr(self, "contributions_groups", None)
+            if isinstance(contributions_groups, list):
+                contributions_groups = contributions_groups[0]
+            display_groups = self.features_groups is not None and mask.shape[1] == contributions_groups.shape[1]
+            self._mask_cache = None
+            self.filter(**self.mask_params, display_groups=display_groups)
+
+    def _append_features_import(self, contributions_attr, contributions):
+        """
+        Update features importance with the contributions of new rows, keeping the sum of
+        absolute contributions of each feature instead of computing it again on all the rows.
+        """
+        if type(self.backend).get_global_features_importance is not BaseBackend.get_global_features_importance:
+            # Backend has its own features importance : it is computed again on all the rows
+            return self.backend.get_global_features_importance(
+                contributions=_concat_rows(getattr(self, contributions_attr), contributions),
+                explain_data=None,
+            )
+        if self._features_abs_sums is None:
+            self._features_abs_sums = dict()
+        if contributions_attr not in self._features_abs_sums:
+            self._features_abs_sums[contributions_attr] = _abs_sum(getattr(self, contributions_attr))
+        abs_sum = self._features_abs_sums[contributions_attr]
+        new_abs_sum = _abs_sum(contributions)
+        if isinstance(abs_sum, list):
+            abs_sum = [old_sum + new_sum for old_sum, new_sum in zip(abs_sum, new_abs_sum)]
+            features_imp = [normalize_features_import(label_sum) for label_sum in abs_sum]
+        else:
+            abs_sum = abs_sum + new_abs_sum
+            features_imp = normalize_features_import(abs_sum)
+        self._features_abs_sums[contributions_attr] = abs_sum
+        return features_imp
+
+    def get_interaction_values(self, n_samples_max=None, selection=None, n_jobs=1, batch_size=None, memmap_path=None):
         """
         Compute shap interaction values for each row of x_encoded.
         This function is only available for explainer of type TreeExplainer (used for tree based models).
@@ -513,24 +822,75 @@ class SmartExplainer:
             Limit the number of points for which we compute the interactions.
         selection : list, optional
             Contains list of index, subset of the input DataFrame that we want to plot
+        n_jobs : int (default: 1)
+            Number of processes used to compute the interactions. -1 means using all processors.
+        batch_size : int, optional
+            Maximum number of rows computed at once.
+        memmap_path : str, optional
+            Path of a .npy file in which the interaction values are written batch by batch
+            and memory-mapped instead of being held in memory.
         Returns
         -------
         np.ndarray
             Shap interaction values for each sample as an array of shape (# samples x # features x # features).
         """
-        x = copy.deepcopy(self.x_encoded)
-
-        if selection:
-            x = x.loc[selection]
+        x = self.x_encoded.loc[selection] if selection else self.x_encoded
+        x = x[:n_samples_max]
 
         if hasattr(self, "x_interaction"):
-            if self.x_interaction.equals(x[:n_samples_max]):
+            if self.x_interaction.equals(x):
                 return self.interaction_values
 
-        self.x_interaction = x[:n_samples_max]
-        self.interaction_values = get_shap_interaction_values(self.x_interaction, self.backend.explainer)
+        from shapash.backend.shap_backend import get_shap_interaction_values
+
+        out = None
+        if memmap_path is not None:
+            out = np.lib.format.open_memmap(memmap_path, mode="w+", shape=(len(x), x.shape[1], x.shape[1]))
+        self.x_interaction = x
+        self.interaction_values = get_shap_interaction_values(
+            self.x_interaction, self.backend.explainer, n_jobs=n_jobs, batch_size=batch_size, out=out
+        )
         return self.interaction_values
 
+    def compute_interactions_summary(self, selection=None, top_k=5, n_jobs=1, batch_size=1000):
+        """
+        Compute shap interaction values batch by batch and only keep the importance of each pair
+        of features and the top_k pairs of each row, so that the whole dataset can be used
+        whatever its size.
+        This function is only available for explainer of type TreeExplainer (used for tree based models).
+        Parameters
+        ----------
+        selection : list, optional
+            Contains list of index, subset of the input DataFrame. Default is all the rows.
+        top_k : int (default: 5)
+            Number of pairs of features kept for each row.
+        n_jobs : int (default: 1)
+            Number of processes used to compute the interactions. -1 means using all processors.
+        batch_size : int (default: 1000)
+            Maximum number of rows computed at once.
+        Returns
+        -------
+        dict
+            'sorted_indices' : pairs of features indices in descending order of importance (sum of absolute
+            interaction values), as returned by compute_sorted_variables_interactions_list_indices.
+            'top_pairs' : np.ndarray of shape (# samples x top_k x 2), most important pairs of each row.
+            'top_values' : np.ndarray of shape (# samples x top_k), interaction values of these pairs.
+            'index' : index of the rows.
+        """
+        from shapash.backend.shap_backend import get_shap_interactions_summary
+
+        x = self.x_encoded.loc[selection] if selection else self.x_encoded
+        summary = get_shap_interactions_summary(
+            x, self.backend.explainer, top_k=top_k, n_jobs=n_jobs, batch_size=batch_size
+        )
+        self.interactions_summary = dict(
+            sorted_indices=compute_sorted_variables_interactions_list_indices(summary["abs_sum"]),
+            top_pairs=summary["top_pairs"],
+            top_values=summary["top_values"],
+            index=x.index,
+        )
+        return self.interactions_summary
+
     def check_postprocessing_modif_strings(self, postprocessing=None):
         """
         Check if any modification of postprocessing will convert numeric values into strings values.
@@ -620,7 +980,8 @@ class SmartExplainer:
         Add groups into features dict and inv_features_dict if not present.
         """
         for group_name in features_groups.keys():
-            self.features_desc[group_name] = 1000
+            if "features_desc" not in self._lazy_attributes:
+                self.features_desc[group_name] = 1000
             if group_name not in self.features_dict.keys():
                 self.features_dict[group_name] = group_name
                 self.inv_features_dict[group_name] = group_name
@@ -753,22 +1114,13 @@ class SmartExplainer:
             data = self.data_groups
         else:
             data = self.data
-        mask = [self.state.init_mask(data["contrib_sorted"], True)]
-        if features_to_hide:
-            mask.append(
-                self.state.hide_contributions(
-                    data["var_dict"],
-                    features_list=self.check_features_name(features_to_hide, use_groups=display_groups),
-                )
-            )
-        if threshold:
-            mask.append(self.state.cap_contributions(data["contrib_sorted"], threshold=threshold))
-        if positive is not None:
-            mask.append(self.state.sign_contributions(data["contrib_sorted"], positive=positive))
-        self.mask = self.state.combine_masks(mask)
-        if max_contrib:
-            self.mask = self.state.cutoff_contributions(self.mask, max_contrib=max_contrib)
-        self.masked_contributions = self.state.compute_masked_contributions(data["contrib_sorted"], self.mask)
+        features_list = (
+            self.check_features_name(features_to_hide, use_groups=display_groups) if features_to_hide else None
+        )
+        # A threshold or max_contrib equal to 0 does not filter anything
+        self.mask, self.masked_contributions = self._compute_mask(
+            data, display_groups, features_list, threshold or None, positive, max_contrib or None
+        )
         self.mask_params = {
             "features_to_hide": features_to_hide,
             "threshold": threshold,
@@ -776,26 +1128,91 @@ class SmartExplainer:
             "max_contrib": max_contrib,
         }
 
-    def save(self, path):
+    def _compute_mask(self, data, display_groups, features_list, threshold, positive, max_contrib):
+        """
+        Computes the mask and the masked contributions of the filter method. When data are
+        SortedContributions, they are cached (bit-packed) for each set of filter parameters :
+        filtering again with the same parameters does not gather the sorted contributions.
+        """
+        key = (
+            display_groups,
+            None if features_list is None else tuple(features_list),
+            threshold,
+            positive,
+            max_contrib,
+        )
+        use_cache = isinstance(data, SortedContributions)
+        if self._mask_cache is None:
+            self._mask_cache = {}
+        cached = self._mask_cache.get(key) if use_cache else None
+        if cached is not None and cached[0] is data:
+            _, packed, n_columns, masked_contributions = cached
+            if isinstance(packed, list):
+                mask = [
+                    unpack_mask(class_packed, n_columns, class_masked.index)
+                    for class_packed, class_masked in zip(packed, masked_contributions)
+                ]
+            else:
+                mask = unpack_mask(packed, n_columns, masked_contributions.index)
+            return mask, masked_contributions
+
+        contrib_sorted, var_dict = data["contrib_sorted"], data["var_dict"]
+        mask = self.state.compute_mask(contrib_sorted, var_dict, features_list, threshold, positive, max_contrib)
+        masked_contributions = self.state.compute_masked_contributions(contrib_sorted, mask)
+        if use_cache:
+            if len(self._mask_cache) >= self._mask_cache_size:
+                self._mask_cache.pop(next(iter(self._mask_cache)))
+            if isinstance(mask, list):
+                packed, n_columns = [pack_mask(class_mask) for class_mask in mask], mask[0].shape[1]
+            else:
+                packed, n_columns = pack_mask(mask), mask.shape[1]
+            self._mask_cache[key] = (data, packed, n_columns, masked_contributions)
+        return mask, masked_contributions
+
+    def save(self, path, format="pickle"):
         """
         Save method allows user to save SmartExplainer object on disk
         using a pickle file.
         Save method can be useful: you don't have to recompile to display
         results later
+        With format='columnar', the SmartExplainer is saved in a directory : numeric
+        matrices (contributions, encoded data...) in .npy files, other dataframes in parquet
+        files (if pyarrow is installed), metadata and dicts in a JSON file and the model
+        in its own pickle file. Such a save can be loaded with memory-mapped matrices.
         Parameters
         ----------
         path : str
-            File path to store the pickle file
+            File path to store the pickle file, or directory of the columnar save
+        format : str, optional (default: 'pickle')
+            'pickle' or 'columnar'
         Example
         --------
         >>> xpl.save('path_to_pkl/xpl.pkl')
+        >>> xpl.save('path_to_dir/xpl', format='columnar')
         """
         if hasattr(self, "smartapp"):
             self.smartapp = None
-        save_pickle(self, path)
+        # Attributes not read yet from a partially loaded save
+        for name in list(self.__dict__.get("_unloaded_attributes", ())):
+            getattr(self, name)
+        if format == "pickle":
+            save_pickle(self, path)
+        elif format == "columnar":
+            excluded = ["smartapp", "plot", "_mask_cache", "_neighbors_parameters"]
+            excluded += ["_columnar_reader", "_unloaded_attributes"]
+            attributes = {key: value for key, value in self.__dict__.items() if key not in excluded}
+            attributes["plot"] = {key: value for key, value in self.plot.__dict__.items() if key != "explainer"}
+            save_columnar(
+                attributes,
+                path,
+                separate={"model": self.model},
+                object_classes=(SortedContributions,),
+            )
+        else:
+            raise ValueError(f"Unknown format : {format}. Available formats are 'pickle' and 'columnar'")
 
     @classmethod
-    def load(cls, path):
+    def load(cls, path, mmap=False, include=None):
         """
         Load method allows Shapash user to use pickled SmartExplainer.
         To use this method you must first declare your SmartExplainer object
@@ -803,15 +1220,49 @@ class SmartExplainer:
         Parameters
         ----------
         path : str
-            File path of the pickle file.
+            File path of the pickle file, or directory of a columnar save.
+        mmap : bool, optional (default: False)
+            Only for a columnar save : if True, the numeric matrices are memory-mapped
+            (read-only) instead of being read, so that loading is almost instant and
+            several processes loading the same save share the memory pages.
+        include : list, optional
+            Only for a columnar save : names of the matrices (contributions, x_init...)
+            read by load. The other ones are read from the save directory on first use.
+            By default, all the attributes are read.
         Example
         --------
         >>> xpl = SmartExplainer.load('path_to_pkl/xpl.pkl')
+        >>> xpl = SmartExplainer.load('path_to_dir/xpl', mmap=True)
+        >>> xpl = SmartExplainer.load('path_to_dir/xpl', include=['features_imp', 'contributions', 'x_init'])
         """
+        if os.path.isdir(path):
+            reader = ColumnarReader(path, mmap=mmap)
+            if include is None:
+                include = reader.names
+            unknown = set(include) - set(reader.names) - set(cls._LAZY_ATTRIBUTES)
+            if unknown:
+                raise ValueError(f"Attributes {sorted(unknown)} are not in the saved SmartExplainer")
+            # Metadata and small objects are always loaded, the other attributes on first use
+            loaded = [name for name in reader.names if name in include or reader.is_in_memory(name)]
+            smart_explainer = cls(model=reader.read("model"))
+            smart_explainer.__dict__.update({name: reader.read(name) for name in loaded if name != "plot"})
+            smart_explainer.plot.__dict__.update(reader.read("plot"))
+            unloaded = set(reader.names) - set(loaded) - {"plot"}
+            if unloaded:
+                # Attributes set by __init__ must not hide the saved ones
+                for name in unloaded:
+                    smart_explainer.__dict__.pop(name, None)
+                smart_explainer._columnar_reader = reader
+                smart_explainer._unloaded_attributes = unloaded
+            return smart_explainer
+        if include is not None:
+            raise ValueError("include parameter is only available for a columnar save")
         xpl = load_pickle(path)
         if isinstance(xpl, SmartExplainer):
             smart_explainer = cls(model=xpl.model)
             smart_explainer.__dict__.update(xpl.__dict__)
+            # The plotter must use the returned explainer, whose lazy attributes are computed on first use
+            smart_explainer.plot.explainer = smart_explainer
             return smart_explainer
         else:
             raise ValueError("File is not a SmartExplainer object")
@@ -821,12 +1272,14 @@ class SmartExplainer:
         The predict_proba compute the proba values for each x_encoded row
         """
         self.proba_values = predict_proba(self.model, self.x_encoded, self._classes)
+        self._proba_values_from_model = True
 
     def predict(self):
         """
         The predict method computes the model output for each x_encoded row and stores it in y_pred attribute
         """
         self.y_pred = predict(self.model, self.x_encoded)
+        self._y_pred_from_model = True
         if hasattr(self, "y_target"):
             self.prediction_error = predict_error(self.y_target, self.y_pred, self._case)
 
@@ -891,13 +1344,9 @@ class SmartExplainer:
             and (
                 # if the already computed mask does not have the right shape (this can happen when
                 # we use groups of features once and then use method without groups)
-                (
-                    isinstance(data["contrib_sorted"], pd.DataFrame)
-                    and len(data["contrib_sorted"].columns) == len(self.mask.columns)
-                )
+                (isinstance(data["var_dict"], pd.DataFrame) and len(data["var_dict"].columns) == len(self.mask.columns))
                 or (
-                    isinstance(data["contrib_sorted"], list)
-                    and len(data["contrib_sorted"][0].columns) == len(self.mask[0].columns)
+                    isinstance(data["var_dict"], list) and len(data["var_dict"][0].columns) == len(self.mask[0].columns)
                 )
             )
         ):
@@ -915,7 +1364,7 @@ class SmartExplainer:
         else:
             columns_dict = self.columns_dict
         # Summarize information
-        data["summary"] = self.state.summarize(
+        summary = self.state.summarize(
             data["contrib_sorted"], data["var_dict"], data["x_sorted"], self.mask, columns_dict, self.features_dict
         )
         # Matching with y_pred
@@ -926,11 +1375,121 @@ class SmartExplainer:
             proba_values = None
 
         y_pred, summary = keep_right_contributions(
-            self.y_pred, data["summary"], self._case, self._classes, self.label_dict, proba_values
+            self.y_pred, summary, self._case, self._classes, self.label_dict, proba_values
         )
 
         return pd.concat([y_pred, summary], axis=1)
 
+    def export_summary(
+        self,
+        path,
+        format="parquet",
+        chunk_size=10000,
+        features_to_hide=None,
+        threshold=None,
+        positive=None,
+        max_contrib=None,
+        proba=False,
+        use_groups=None,
+    ):
+        """
+        The export_summary method writes the summary of local explainability returned by the to_pandas
+        method in a parquet or csv file, chunk by chunk : the summary of the whole dataset is never
+        built in memory. Parquet files contain one row group per chunk.
+        If the user does not specify any filter parameter, the parameters of the last execution of
+        the filter method are used. Contrary to to_pandas, this method does not change the mask
+        of the SmartExplainer.
+
+        Parameters
+        ----------
+        path : str
+            File path where the summary will be stored.
+        format : str, optional (default: 'parquet')
+            'parquet' (requires pyarrow) or 'csv'.
+        chunk_size : int, optional (default: 10000)
+            Number of rows summarized and written at once.
+        features_to_hide : list, optional (default: None)
+            List of strings, containing features to hide.
+        threshold : float, optional (default: None)
+            Absolute threshold below which any contribution is hidden.
+        positive: bool, optional (default: None)
+            If True, hide negative values. Hide positive values otherwise. If None, hide nothing.
+        max_contrib : int, optional (default: None)
+            Number of contributions to show in the file
+        proba : bool, optional (default: False)
+            adding proba in the file
+        use_groups : bool (optional)
+            Whether or not to use groups of features contributions (only available if features_groups
+            parameter was not empty when calling compile method).
+
+        Example
+        --------
+        >>> xpl.export_summary('summary.parquet', max_contrib=3, proba=True)
+        >>> pd.read_parquet('summary.parquet')
+        """
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        if self.y_pred is None:
+            raise ValueError("You have to specify y_pred argument. Please use add() or compile() method")
+        use_groups = True if (use_groups is not False and self.features_groups is not None) else False
+        if use_groups:
+            data, x_init = self.data_groups, self.x_init_groups
+        else:
+            data, x_init = self.data, self.x_init
+        if all(var is None for var in [features_to_hide, threshold, positive, max_contrib]) and hasattr(
+            self, "mask_params"
+        ):
+            features_to_hide, threshold, positive, max_contrib = (
+                self.mask_params[key] for key in ["features_to_hide", "threshold", "positive", "max_contrib"]
+            )
+        features_list = self.check_features_name(features_to_hide, use_groups=use_groups) if features_to_hide else None
+        threshold, max_contrib = threshold or None, max_contrib or None
+        columns_dict = {i: col for i, col in enumerate(x_init.columns)}
+        if proba and self.proba_values is None:
+            self.predict_proba()
+        numeric_values = all(dtype.kind in "biuf" for dtype in x_init.dtypes)
+
+        def iter_chunks():
+            for start in range(0, len(x_init), chunk_size):
+                rows = x_init.index[start : start + chunk_size]
+                contrib_sorted = get_sorted_rows(data, "contrib_sorted", rows)
+                var_dict = get_sorted_rows(data, "var_dict", rows)
+                mask = self.state.compute_mask(
+                    contrib_sorted, var_dict, features_list, threshold, positive, max_contrib
+                )
+                yield rows, contrib_sorted, var_dict, mask
+
+        # First pass on the masks to write the same columns as to_pandas in all chunks
+        max_length = 0
+        for _, _, _, mask in iter_chunks():
+            for class_mask in mask if isinstance(mask, list) else [mask]:
+                max_length = max(max_length, int(class_mask.to_numpy().sum(axis=1).max(initial=0)))
+        columns = summary_columns(max_length)
+
+        with ChunkWriter(path, format) as writer:
+            for rows, contrib_sorted, var_dict, mask in iter_chunks():
+                summary = self.state.summarize(
+                    contrib_sorted,
+                    var_dict,
+                    get_sorted_rows(data, "x_sorted", rows),
+                    mask,
+                    columns_dict,
+                    self.features_dict,
+                )
+                if isinstance(summary, list):
+                    summary = [class_summary.reindex(columns=columns) for class_summary in summary]
+                else:
+                    summary = summary.reindex(columns=columns)
+                y_pred, summary = keep_right_contributions(
+                    self.y_pred.loc[rows],
+                    summary,
+                    self._case,
+                    self._classes,
+                    self.label_dict,
+                    self.proba_values.loc[rows] if proba else None,
+                )
+                writer.write(format_summary_dtypes(pd.concat([y_pred, summary], axis=1), numeric_values))
+
     def compute_features_import(self, force=False):
         """
         Compute a relative features importance, sum of absolute values
@@ -975,12 +1534,26 @@ class SmartExplainer:
         if (self._case == "classification") and (len(self._classes) > 2):
             raise AssertionError("Multi-class classification is not supported")
 
-        all_neighbors = find_neighbors(selection, self.x_encoded, self.model, self._case)
+        if self._neighbors_parameters is None or self._neighbors_parameters[0] is not self.x_encoded:
+            self._neighbors_parameters = (self.x_encoded,) + compute_neighbors_parameters(self.x_encoded)
+        _, mean_vector, radius = self._neighbors_parameters
+        all_neighbors, all_indices = find_neighbors(
+            selection,
+            self.x_encoded,
+            self.model,
+            self._case,
+            mean_vector=mean_vector,
+            radius=radius,
+            return_indices=True,
+            predictions=self._get_stored_outputs(),
+        )
 
         # Check if entry is a single instance or not
         if len(selection) == 1:
             # Compute explanations for instance and neighbors
-            norm_shap, _, _ = shap_neighbors(all_neighbors[0], self.x_encoded, self.contributions, self._case)
+            norm_shap, _, _ = shap_neighbors(
+                all_neighbors[0], self.x_encoded, self.contributions, self._case, indices=all_indices[0]
+            )
             self.local_neighbors = {"norm_shap": norm_shap}
         else:
             numb_expl = len(selection)
@@ -992,9 +1565,29 @@ class SmartExplainer:
                     _,
                     variability[i, :],
                     amplitude[i, :],
-                ) = shap_neighbors(all_neighbors[i], self.x_encoded, self.contributions, self._case)
+                ) = shap_neighbors(
+                    all_neighbors[i], self.x_encoded, self.contributions, self._case, indices=all_indices[i]
+                )
             self.features_stability = {"variability": variability, "amplitude": amplitude}
 
+    def _get_stored_outputs(self):
+        """
+        Model outputs of each row of x_encoded already stored in the explainer : predictions for
+        regression, probabilities of the second class for classification.
+        Returns None if they were not computed with the model by the explainer (values given by
+        the user may differ from the model outputs), or are not aligned with x_encoded.
+        """
+        if self._case == "regression":
+            outputs = self.y_pred if self._y_pred_from_model else None
+        else:
+            outputs = self.proba_values if self._proba_values_from_model else None
+        if outputs is None or not outputs.index.equals(self.x_encoded.index):
+            return None
+        outputs = outputs.iloc[:, 0 if self._case == "regression" else 1]
+        if not pd.api.types.is_numeric_dtype(outputs) or outputs.isna().any():
+            return None
+        return outputs.to_numpy()
+
     def compute_features_compacity(self, selection, distance, nb_features):
         """
         For a selection of instances, compute features compacity metrics used in method `compacity_plot`.
@@ -1297,3 +1890,27 @@ class SmartExplainer:
             if rm_working_dir:
                 shutil.rmtree(working_dir)
             raise e
+
+
+def _concat_rows(old, new):
+    """
+    Concatenate the rows of two objects of the same structure : pandas objects, numpy arrays,
+    or lists and dicts of them. Returns None if one of them is None.
+    """
+    if old is None or new is None:
+        return None
+    if isinstance(old, dict):
+        return {key: _concat_rows(old[key], new[key]) for key in old if key in new}
+    if isinstance(old, list):
+        return [_concat_rows(old_elem, new_elem) for old_elem, new_elem in zip(old, new)]
+    if isinstance(old, np.ndarray):
+        return np.concatenate([old, new])
+    return pd.concat([old, new])
+
+
+def _abs_sum(contributions):
+    """Sum of absolute contributions of each feature (for each label in classification)."""
+    if isinstance(contributions, list):
+        return [contrib.abs().sum() for contrib in contributions]
+    return contributions.abs().sum()
+
@@ -0,0 +1,239 @@
+"""
+Smart Multi State Module
+"""
+import numpy as np
+import pandas as pd
+
+from shapash.decomposition.contributions import SortedContributions, StackedFrames, sorted_indices, stacked_array
+from shapash.explainer.multi_decorator import MultiDecorator
+from shapash.explainer.smart_state import SmartState
+from shapash.manipulation.filters import compute_mask
+from shapash.manipulation.summarize import normalize_features_import
+
+
+class SmartMultiState(MultiDecorator):
+    """
+    State pattern attached to SmartExplainer for multi-class problems.
+
+    The contributions of all classes are stored once in a single contiguous (classes, n, f) array
+    (see prepare_contributions), the dataframes of each class being views of this array.
+    Ranking, filter mask, masked contributions, grouped contributions and features importance
+    are computed with one vectorized operation on this array instead of one SmartState call
+    per class, and their outputs are stacked the same way.
+    Inputs and outputs are still lists of pandas objects, one per class, identical to the
+    ones of MultiDecorator(SmartState()). Methods whose inputs cannot be stacked (matrices of
+    different shapes) are delegated to SmartState class by class.
+
+    Parameters
+    ----------
+    member : SmartState, optional
+        Single-class state used for the delegated methods.
+    """
+
+    def __init__(self, member=None):
+        super().__init__(member if member is not None else SmartState())
+
+    def prepare_contributions(self, contributions):
+        """
+        Override prepare_contributions from MultiDecorator. Stacks the contributions of all classes
+        in a single (classes, n, f) array, the returned dataframes being views of this array.
+
+        Parameters
+        ----------
+        contributions : list
+            List of local contributions (pandas.DataFrames).
+
+        Returns
+        -------
+        list
+            List of local contributions (StackedFrames), or the input list if it cannot be stacked.
+        """
+        if stacked_array(contributions) is not None:
+            return contributions
+        stacked = _stack(contributions)
+        if stacked is None:
+            return contributions
+        return _unstack(stacked, contributions)
+
+    def sort_contributions(self, contributions, x_init, dtype=None):
+        """
+        Override sort_contributions from MultiDecorator. The features indices of all classes
+        are sorted with a single argsort on the stacked contributions.
+
+        Parameters
+        ----------
+        contributions : list
+            Local contributions to sort for each class.
+        x_init : pandas.DataFrame
+            Prediction set.
+        dtype : str or numpy.dtype, optional
+            Float dtype of the sorted contributions.
+
+        Returns
+        -------
+        SortedContributions
+            Mapping with contrib_sorted, x_sorted and var_dict keys.
+        """
+        stacked = _stack(contributions)
+        if stacked is None:
+            return super().sort_contributions(contributions, x_init, dtype=dtype)
+        columns = ["feature_" + str(i) for i in range(stacked.shape[2])]
+        var_dicts = _unstack(sorted_indices(stacked, dtype), contributions, columns=columns)
+        return SortedContributions(contributions, x_init, var_dicts, dtype)
+
+    def compute_features_import(self, contributions):
+        """
+        Override compute_features_import from MultiDecorator. The sums of absolute contributions
+        of all classes are computed with a single operation on the stacked contributions.
+
+        Parameters
+        ----------
+        contributions : list
+             list of pandas.DataFrames containing contributions
+
+        Returns
+        -------
+        list
+            list of features importance pandas.series
+        """
+        stacked = _stack(contributions)
+        if stacked is None:
+            return self.delegate("compute_features_import", contributions)
+        abs_sums = np.nansum(np.abs(stacked), axis=1)
+        return [
+            normalize_features_import(pd.Series(abs_sum, index=contrib.columns))
+            for abs_sum, contrib in zip(abs_sums, contributions)
+        ]
+
+    def compute_mask(self, s_contribs, var_dicts, features_list=None, threshold=None, positive=None, max_contrib=None):
+        """
+        Override compute_mask from MultiDecorator. Compute in a single pass the mask of the filter
+        method for all classes, compute_mask being applied once on the stacked contributions.
+
+        Parameters
+        ----------
+        s_contribs : list
+            List of local contributions matrices sorted by decreasing absolute values.
+        var_dicts : list
+            List of dataframes with features indexes ordered by contribution (same order).
+        features_list : list, optional (default: None)
+            List of index, feature to hide.
+        threshold : float, optional (default: None)
+            Absolute threshold below which any contribution is hidden.
+        positive : bool, optional (default: None)
+            If True, hide negative values. False, hide positive values.
+            If None, hide nothing.
+        max_contrib : int, optional (default: None)
+            Maximum number of contributions to show.
+
+        Returns
+        -------
+        list
+            List of masks (pandas.DataFrames).
+        """
+        values = _stack(s_contribs)
+        stacked_var_dicts = _stack(var_dicts) if features_list is not None else None
+        if values is None or (features_list is not None and _shape(stacked_var_dicts) != values.shape):
+            return super().compute_mask(s_contribs, var_dicts, features_list, threshold, positive, max_contrib)
+        mask = compute_mask(values, stacked_var_dicts, features_list, threshold, positive, max_contrib)
+        columns = ["contrib_{}".format(i + 1) for i in range(mask.shape[2])]
+        return _unstack(mask, s_contribs, columns=columns)
+
+    def compute_masked_contributions(self, s_contribs, masks):
+        """
+        Override compute_masked_contributions from MultiDecorator. Compute for all classes the summed
+        contributions of hidden features.
+
+        Parameters
+        ----------
+        s_contribs : list
+            List of local contributions matrices (pandas.DataFrames).
+        masks : list
+            List of masks to apply to contributions matrices (pandas.DataFrames, same order).
+
+        Returns
+        -------
+        list
+            List of masked contributions (pandas.DataFrames).
+        """
+        stacked = _stack(s_contribs)
+        stacked_masks = _stack(masks)
+        if stacked is None or stacked_masks is None or stacked.shape != stacked_masks.shape:
+            return super().compute_masked_contributions(s_contribs, masks)
+        hidden = ~stacked_masks.astype(bool)
+        hidden_neg = np.where(hidden & ~(stacked > 0), stacked, 0).sum(axis=2)
+        hidden_pos = np.where(hidden & ~(stacked < 0), stacked, 0).sum(axis=2)
+        return [
+            pd.DataFrame(
+                np.column_stack([neg, pos]),
+                columns=["masked_neg", "masked_pos"],
+                index=s_contrib.index,
+            )
+            for neg, pos, s_contrib in zip(hidden_neg, hidden_pos, s_contribs)
+        ]
+
+    def compute_grouped_contributions(self, contributions, features_groups):
+        """
+        Override compute_grouped_contributions from MultiDecorator. Regroup contributions of all classes
+        according to features_groups parameter.
+
+        Parameters
+        ----------
+        contributions : list
+            List of contributions of each unique feature.
+        features_groups : dict
+            Python dict that inform which features to regroup.
+
+        Returns
+        -------
+        list
+            List of contributions with grouped features.
+        """
+        stacked = _stack(contributions)
+        columns = contributions[0].columns
+        groups_indices = [columns.get_indexer(features) for features in features_groups.values()]
+        if stacked is None or any((indices == -1).any() for indices in groups_indices):
+            return self.delegate("compute_grouped_contributions", contributions, features_groups)
+        grouped_features = {feature for features in features_groups.values() for feature in features}
+        kept = [i for i, col in enumerate(columns) if col not in grouped_features]
+        groups = [np.nansum(stacked[:, :, indices], axis=2) for indices in groups_indices]
+        grouped = np.concatenate([stacked[:, :, kept]] + [group[:, :, None] for group in groups], axis=2)
+        new_columns = [columns[i] for i in kept] + list(features_groups.keys())
+        return _unstack(grouped, contributions, columns=new_columns)
+
+
+def _stack_shape(frames):
+    """
+    Returns the common shape of a list of pandas objects, None if they have different shapes.
+    """
+    shapes = {frame.shape for frame in frames}
+    return shapes.pop() if len(shapes) == 1 else None
+
+
+def _shape(array):
+    return None if array is None else array.shape
+
+
+def _stack(frames):
+    """
+    Stacks a list of pandas.DataFrames of the same shape in a (classes, n, f) array, without copy
+    for StackedFrames. Returns None if the dataframes cannot be stacked.
+    """
+    stacked = stacked_array(frames)
+    if stacked is not None:
+        return stacked
+    if not frames or _stack_shape(frames) is None or not all(isinstance(frame, pd.DataFrame) for frame in frames):
+        return None
+    return np.stack([frame.values for frame in frames])
+
+
+def _unstack(array, frames, columns=None):
+    """
+    Splits a (classes, n, f) array into StackedFrames with the index
+    (and the columns, unless specified) of the given frames.
+    """
+    return StackedFrames(
+        array,
+        [frame.index for frame in frames],
+        [frame.columns if columns is None else columns for frame in frames],
+    )
@@ -15,6 +15,7 @@ from plotly import graph_objs as go
 from plotly.offline import plot
 from plotly.subplots import make_subplots
 
+from shapash.decomposition.contributions import get_sorted_rows
 from shapash.manipulation.select_lines import select_lines
 from shapash.manipulation.summarize import compute_corr, project_feature_values_1d
 from shapash.style.style_utils import colors_loading, define_style, select_palette
@@ -1063,12 +1064,12 @@ class SmartPlotter:
                 not hasattr(self.explainer, "mask_params")  # If the filter method has not been called yet
                 # Or if the already computed mask was not updated with current display_groups parameter
                 or (
-                    isinstance(data["contrib_sorted"], pd.DataFrame)
-                    and len(data["contrib_sorted"].columns) != len(self.explainer.mask.columns)
+                    isinstance(data["var_dict"], pd.DataFrame)
+                    and len(data["var_dict"].columns) != len(self.explainer.mask.columns)
                 )
                 or (
-                    isinstance(data["contrib_sorted"], list)
-                    and len(data["contrib_sorted"][0].columns) != len(self.explainer.mask[0].columns)
+                    isinstance(data["var_dict"], list)
+                    and len(data["var_dict"][0].columns) != len(self.explainer.mask[0].columns)
                 )
             ):
                 self.explainer.filter(max_contrib=20, display_groups=display_groups)
@@ -1079,9 +1080,9 @@ class SmartPlotter:
 
                 label_num, _, label_value = self.explainer.check_label_name(label)
 
-                contrib = data["contrib_sorted"][label_num]
-                x_val = data["x_sorted"][label_num]
-                var_dict = data["var_dict"][label_num]
+                contrib = get_sorted_rows(data, "contrib_sorted", line)[label_num]
+                x_val = get_sorted_rows(data, "x_sorted", line)[label_num]
+                var_dict = get_sorted_rows(data, "var_dict", line)[label_num]
 
                 if show_predict is True:
                     pred = self.local_pred(line[0], label_num)
@@ -1091,9 +1092,9 @@ class SmartPlotter:
                         subtitle = f"Response: <b>{label_value}</b> - Proba: <b>{pred:.4f}</b>"
 
             elif self.explainer._case == "regression":
-                contrib = data["contrib_sorted"]
-                x_val = data["x_sorted"]
-                var_dict = data["var_dict"]
+                contrib = get_sorted_rows(data, "contrib_sorted", line)
+                x_val = get_sorted_rows(data, "x_sorted", line)
+                var_dict = get_sorted_rows(data, "var_dict", line)
                 label_num = None
                 if show_predict is True:
                     pred_value = self.local_pred(line[0])
@@ -2116,6 +2117,8 @@ class SmartPlotter:
         height=600,
         file_name=None,
         auto_open=False,
+        n_jobs=1,
+        batch_size=None,
     ):
         """
         Displays a dynamic plot with the `nb_top_interactions` most important interactions existing
@@ -2144,6 +2147,11 @@ class SmartPlotter:
             File name to use to save the plotly bar chart. If None the bar chart will not be saved.
         auto_open: Boolean (optional)
             Indicate whether to open the bar plot or not.
+        n_jobs : int (default: 1)
+            Number of processes used to compute the interactions. -1 means using all processors.
+        batch_size : int (optional)
+            If given, the most important interactions are computed on the whole selection (all
+            the rows if selection is None) batch by batch, instead of the sample of max_points rows.
         Returns
         -------
         go.Figure
@@ -2154,9 +2162,13 @@ class SmartPlotter:
 
         list_ind, addnote = self._select_indices_interactions_plot(selection=selection, max_points=max_points)
 
-        interaction_values = self.explainer.get_interaction_values(selection=list_ind)
-
-        sorted_top_features_indices = compute_sorted_variables_interactions_list_indices(interaction_values)
+        if batch_size is not None:
+            sorted_top_features_indices = self.explainer.compute_interactions_summary(
+                selection=selection, top_k=1, n_jobs=n_jobs, batch_size=batch_size
+            )["sorted_indices"]
+        else:
+            interaction_values = self.explainer.get_interaction_values(selection=list_ind)
+            sorted_top_features_indices = compute_sorted_variables_interactions_list_indices(interaction_values)
 
         indices_to_plot = sorted_top_features_indices[:nb_top_interactions]
         interactions_indices_traces_mapping = []
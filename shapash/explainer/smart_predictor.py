@@ -7,16 +7,16 @@ import pandas as pd
 
 import shapash.explainer.smart_explainer
 from shapash.decomposition.contributions import assign_contributions, rank_contributions
-from shapash.manipulation.filters import (
-    cap_contributions,
-    combine_masks,
-    cutoff_contributions,
-    hide_contributions,
-    sign_contributions,
-)
-from shapash.manipulation.mask import compute_masked_contributions, init_mask
+from shapash.manipulation.filters import compute_mask
+from shapash.manipulation.mask import compute_masked_contributions
 from shapash.manipulation.select_lines import keep_right_contributions
-from shapash.manipulation.summarize import create_grouped_features_values, group_contributions, summarize
+from shapash.manipulation.summarize import (
+    create_grouped_features_values,
+    format_summary_dtypes,
+    group_contributions,
+    summarize,
+    summary_columns,
+)
 from shapash.utils.check import (
     check_consistency_model_features,
     check_consistency_model_label,
@@ -29,7 +29,7 @@ from shapash.utils.check import (
     check_y,
 )
 from shapash.utils.columntransformer_backend import columntransformer
-from shapash.utils.io import save_pickle
+from shapash.utils.io import ChunkWriter, save_pickle
 from shapash.utils.model import predict_proba
 from shapash.utils.transform import adapt_contributions, apply_postprocessing, apply_preprocessing, preprocessing_tolist
 
@@ -473,7 +473,7 @@ class SmartPredictor:
             self.predict()
 
         if contributions is None:
-            explain_data = self.backend.run_explainer(x=self.data["x_preprocessed"])
+            explain_data = self.backend.get_explain_data(x=self.data["x_preprocessed"])
             contributions = self.backend.get_local_contributions(
                 explain_data=explain_data, x=self.data["x_preprocessed"]
             )
@@ -550,23 +550,23 @@ class SmartPredictor:
         The filter method is an important method which allows to summarize the local explainability
         by using the user defined mask_params parameters which correspond to its use case.
         """
-        mask = [init_mask(self.summary["contrib_sorted"], True)]
-        if self.mask_params["features_to_hide"] is not None:
-            mask.append(
-                hide_contributions(
-                    self.summary["var_dict"],
-                    features_list=self.check_features_name(self.mask_params["features_to_hide"]),
-                )
-            )
-        if self.mask_params["threshold"] is not None:
-            mask.append(cap_contributions(self.summary["contrib_sorted"], threshold=self.mask_params["threshold"]))
-        if self.mask_params["positive"] is not None:
-            mask.append(sign_contributions(self.summary["contrib_sorted"], positive=self.mask_params["positive"]))
-        self.mask = combine_masks(mask)
-        if self.mask_params["max_contrib"] is not None:
-            self.mask = cutoff_contributions(mask=self.mask, k=self.mask_params["max_contrib"])
+        self.mask = self._compute_mask(self.summary["contrib_sorted"], self.summary["var_dict"])
         self.masked_contributions = compute_masked_contributions(self.summary["contrib_sorted"], self.mask)
 
+    def _compute_mask(self, contrib_sorted, var_dict):
+        """
+        Computes the mask defined by mask_params on sorted contributions.
+        """
+        features_to_hide = self.mask_params["features_to_hide"]
+        return compute_mask(
+            contrib_sorted,
+            var_dict,
+            features_list=self.check_features_name(features_to_hide) if features_to_hide is not None else None,
+            threshold=self.mask_params["threshold"],
+            positive=self.mask_params["positive"],
+            max_contrib=self.mask_params["max_contrib"],
+        )
+
     def summarize(self, use_groups=None):
         """
         The summarize method allows to display the summary of local explainability.
@@ -618,18 +618,7 @@ class SmartPredictor:
         else:
             data = self.data
 
-        if self._drop_option is not None:
-            columns_to_keep = [
-                x for x in self._drop_option["columns_dict_op"].values() if x in data["x_postprocessed"].columns
-            ]
-            if use_groups:
-                columns_to_keep += list(self.features_groups.keys())
-            x_preprocessed = data["x_postprocessed"][columns_to_keep]
-        else:
-            x_preprocessed = data["x_postprocessed"]
-
-        columns_dict = {i: col for i, col in enumerate(x_preprocessed.columns)}
-        features_dict = {k: v for k, v in self.features_dict.items() if k in x_preprocessed.columns}
+        x_preprocessed, columns_dict, features_dict = self._summary_inputs(data, use_groups)
 
         self.summary = assign_contributions(rank_contributions(data["contributions"], x_preprocessed))
         # Apply filter method with mask_params attributes parameters
@@ -648,6 +637,88 @@ class SmartPredictor:
         # Matching with y_pred
         return pd.concat([data["ypred"], data["summary"]], axis=1)
 
+    def _summary_inputs(self, data, use_groups):
+        """
+        Returns the feature values displayed in the summary, with their columns_dict and features_dict.
+        """
+        if self._drop_option is not None:
+            columns_to_keep = [
+                x for x in self._drop_option["columns_dict_op"].values() if x in data["x_postprocessed"].columns
+            ]
+            if use_groups:
+                columns_to_keep += list(self.features_groups.keys())
+            x_preprocessed = data["x_postprocessed"][columns_to_keep]
+        else:
+            x_preprocessed = data["x_postprocessed"]
+
+        columns_dict = {i: col for i, col in enumerate(x_preprocessed.columns)}
+        features_dict = {k: v for k, v in self.features_dict.items() if k in x_preprocessed.columns}
+        return x_preprocessed, columns_dict, features_dict
+
+    def export_summary(self, path, format="parquet", chunk_size=10000, use_groups=None):
+        """
+        The export_summary method writes the summary returned by the summarize method in a parquet
+        or csv file, chunk by chunk : the summary of the whole dataset is never built in memory.
+        Parquet files contain one row group per chunk.
+        The contributions are filtered with the mask_params parameters, which can be modified
+        with the modify_mask method.
+
+        Parameters
+        ----------
+        path : str
+            File path where the summary will be stored.
+        format : str, optional (default: 'parquet')
+            'parquet' (requires pyarrow) or 'csv'.
+        chunk_size : int, optional (default: 10000)
+            Number of rows summarized and written at once.
+        use_groups : bool (optional)
+            Whether or not to use groups of features contributions.
+
+        Example
+        --------
+        >>> predictor.add_input(x=xtest_df)
+        >>> predictor.modify_mask(max_contrib=3)
+        >>> predictor.export_summary('summary.parquet')
+        """
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        use_groups = True if (use_groups is not False and self.features_groups is not None) else False
+
+        if not hasattr(self, "data"):
+            raise ValueError("You have to specify dataset x and y_pred arguments. Please use add_input() method.")
+
+        data = self.data_groups if use_groups else self.data
+        x_preprocessed, columns_dict, features_dict = self._summary_inputs(data, use_groups)
+        numeric_values = all(dtype.kind in "biuf" for dtype in x_preprocessed.dtypes)
+
+        def iter_chunks():
+            for start in range(0, len(x_preprocessed), chunk_size):
+                rows = x_preprocessed.index[start : start + chunk_size]
+                sorted_chunk = assign_contributions(
+                    rank_contributions(data["contributions"].loc[rows], x_preprocessed.loc[rows])
+                )
+                yield rows, sorted_chunk, self._compute_mask(sorted_chunk["contrib_sorted"], sorted_chunk["var_dict"])
+
+        # First pass on the masks to write the same columns as summarize in all chunks
+        max_length = 0
+        for _, _, mask in iter_chunks():
+            max_length = max(max_length, int(mask.to_numpy().sum(axis=1).max(initial=0)))
+        columns = summary_columns(max_length)
+
+        with ChunkWriter(path, format) as writer:
+            for rows, sorted_chunk, mask in iter_chunks():
+                summary = summarize(
+                    sorted_chunk["contrib_sorted"],
+                    sorted_chunk["var_dict"],
+                    sorted_chunk["x_sorted"],
+                    mask,
+                    columns_dict,
+                    features_dict,
+                ).reindex(columns=columns)
+                writer.write(
+                    format_summary_dtypes(pd.concat([data["ypred"].loc[rows], summary], axis=1), numeric_values)
+                )
+
     def modify_mask(self, features_to_hide=None, threshold=None, positive=None, max_contrib=None):
         """
         This method allows the users to modify the mask_params values.
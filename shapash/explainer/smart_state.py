@@ -5,13 +5,16 @@ import numpy as np
 import pandas as pd
 
 from shapash.decomposition.contributions import (
+    SortedContributions,
     assign_contributions,
+    compute_sorted_indices,
     inverse_transform_contributions,
     rank_contributions,
 )
 from shapash.manipulation.filters import (
     cap_contributions,
     combine_masks,
+    compute_mask,
     cutoff_contributions,
     hide_contributions,
     sign_contributions,
@@ -49,6 +52,23 @@ class SmartState:
         else:
             return contributions
 
+    def prepare_contributions(self, contributions):
+        """
+        Returns the contributions in the layout used by the other methods of the state.
+        Local contributions of a single matrix are used as they are.
+
+        Parameters
+        ----------
+        contributions : pandas.DataFrame
+            Local contributions.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Local contributions.
+        """
+        return contributions
+
     def inverse_transform_contributions(self, contributions, preprocessing, agg_columns="sum"):
         """
         Compute local contributions in the original feature space, despite category encoding.
@@ -98,7 +118,7 @@ class SmartState:
                 return False
         return True
 
-    def rank_contributions(self, contributions, x_init):
+    def rank_contributions(self, contributions, x_init, dtype=None):
         """
         Rank contributions line by line and build a reference dictionary to the prediction set.
 
@@ -108,6 +128,8 @@ class SmartState:
             Local contributions to sort.
         x_init : pandas.DataFrame
             Prediction set.
+        dtype : str or numpy.dtype, optional
+            Float dtype of the sorted contributions.
 
         Returns
         -------
@@ -119,7 +141,28 @@ class SmartState:
             Input features names sorted for each observation
             by decreasing contributions absolute values.
         """
-        return rank_contributions(contributions, x_init)
+        return rank_contributions(contributions, x_init, dtype)
+
+    def sort_contributions(self, contributions, x_init, dtype=None):
+        """
+        Rank contributions line by line. Only the sorted features indices are computed :
+        the sorted contributions and input features are gathered when they are used.
+
+        Parameters
+        ----------
+        contributions : pandas.DataFrame
+            Local contributions to sort.
+        x_init : pandas.DataFrame
+            Prediction set.
+        dtype : str or numpy.dtype, optional
+            Float dtype of the sorted contributions.
+
+        Returns
+        -------
+        SortedContributions
+            Mapping with contrib_sorted, x_sorted and var_dict keys.
+        """
+        return SortedContributions(contributions, x_init, compute_sorted_indices(contributions, dtype), dtype)
 
     def assign_contributions(self, ranked):
         """
@@ -239,6 +282,33 @@ class SmartState:
         """
         return combine_masks(masks)
 
+    def compute_mask(self, s_contrib, var_dict, features_list=None, threshold=None, positive=None, max_contrib=None):
+        """
+        Compute in a single pass the mask of the filter method.
+
+        Parameters
+        ----------
+        s_contrib : pandas.DataFrame
+            Local contributions sorted by decreasing absolute values.
+        var_dict : pandas.DataFrame
+            Dataframe with features indexes ordered by contribution.
+        features_list : list, optional (default: None)
+            List of index, feature to hide.
+        threshold : float, optional (default: None)
+            Absolute threshold below which any contribution is hidden.
+        positive : bool, optional (default: None)
+            If True, hide negative values. False, hide positive values.
+            If None, hide nothing.
+        max_contrib : int, optional (default: None)
+            Maximum number of contributions to show.
+
+        Returns
+        -------
+        pd.Dataframe
+            Mask indicating where contributions should be shown.
+        """
+        return compute_mask(s_contrib, var_dict, features_list, threshold, positive, max_contrib)
+
     def compute_masked_contributions(self, s_contrib, masks):
         """
         Compute the summed contributions of hidden features.
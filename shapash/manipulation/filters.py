@@ -142,3 +142,47 @@ def combine_masks(masks_list):
     return pd.DataFrame(
         mask_final, columns=["contrib_{}".format(i + 1) for i in range(mask_final.shape[1])], index=masks_list[0].index
     )
+
+
+def compute_mask(s_contrib, var_dict, features_list=None, threshold=None, positive=None, max_contrib=None):
+    """
+    The function compute_mask computes in a single boolean array the mask of the filter method :
+    it is the combination of hide_contributions, cap_contributions, sign_contributions
+    and cutoff_contributions, the top-k being selected with a running count of the shown contributions.
+    The contributions are sorted along the last axis, so that the stacked (classes, n, f) arrays
+    of a multi-class problem are filtered in a single pass.
+
+    Parameters
+    ----------
+    s_contrib : pandas.DataFrame or numpy.ndarray
+        Local contributions sorted by decreasing absolute values.
+    var_dict : pandas.DataFrame or numpy.ndarray
+        Features indexes ordered by contribution.
+    features_list : list, optional (default: None)
+        List of index, feature to hide.
+    threshold : float, optional (default: None)
+        Absolute threshold below which any contribution is hidden.
+    positive : bool, optional (default: None)
+        If True, hide negative values. False, hide positive values.
+        If None, hide nothing.
+    max_contrib : int, optional (default: None)
+        Maximum number of contributions to show.
+
+    Returns
+    -------
+    pd.Dataframe or numpy.ndarray of boolean
+        Mask indicating where contributions should be shown, same type as s_contrib.
+    """
+    values = np.asarray(s_contrib)
+    mask = np.ones(values.shape, dtype=bool)
+    if features_list is not None:
+        mask &= ~np.isin(np.asarray(var_dict), features_list)
+    if threshold is not None:
+        mask &= np.abs(values) >= threshold
+    if positive is not None:
+        mask &= values >= 0 if positive else values < 0
+    if max_contrib is not None:
+        mask &= np.cumsum(mask, axis=-1) <= max_contrib
+    if not isinstance(s_contrib, pd.DataFrame):
+        return mask
+    return pd.DataFrame(mask, columns=["contrib_{}".format(i + 1) for i in range(mask.shape[1])], index=s_contrib.index)
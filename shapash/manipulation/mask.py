@@ -51,3 +51,42 @@ def init_mask(s_contrib, value=True):
         mask = np.zeros(s_contrib.shape, dtype=bool)
 
     return pd.DataFrame(mask, columns=s_contrib.columns, index=s_contrib.index)
+
+
+def pack_mask(mask):
+    """
+    Pack a boolean mask into bits, row by row.
+
+    Parameters
+    ----------
+    mask: pd.DataFrame
+        Matrix with only True or False elements.
+
+    Returns
+    -------
+    np.ndarray
+        Array of uint8 with 8 elements of the mask in each byte.
+    """
+    return np.packbits(mask.to_numpy(dtype=bool), axis=1)
+
+
+def unpack_mask(packed, n_columns, index):
+    """
+    Unpack a mask packed with the pack_mask function.
+
+    Parameters
+    ----------
+    packed: np.ndarray
+        Packed mask.
+    n_columns: int
+        Number of columns of the mask.
+    index: pd.Index
+        Index of the mask.
+
+    Returns
+    -------
+    pd.DataFrame
+        Mask with columns contrib_1, ..., contrib_n.
+    """
+    mask = np.unpackbits(packed, axis=1, count=n_columns).astype(bool)
+    return pd.DataFrame(mask, columns=["contrib_{}".format(i + 1) for i in range(n_columns)], index=index)
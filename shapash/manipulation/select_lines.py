@@ -1,8 +1,8 @@
 """
 Select Lines Module
 """
+import numpy as np
 import pandas as pd
-from pandas.core.common import flatten
 
 
 def select_lines(dataframe, condition=None):
@@ -48,10 +48,19 @@ def keep_right_contributions(y_pred, contributions, _case, _classes, label_dict,
 
     """
     if _case == "classification":
-        complete_sum = [list(x) for x in list(zip(*[df.values.tolist() for df in contributions]))]
-        indexclas = [_classes.index(x) for x in list(flatten(y_pred.values))]
+        indexclas = pd.Index(_classes).get_indexer(np.ravel(y_pred.values))
+        if (indexclas == -1).any():
+            raise ValueError("y_pred contains values which are not in the classes of the model.")
+        if len({df.shape for df in contributions}) == 1:
+            # Same shape for all classes : gather the rows in an (n, classes, f) array
+            stacked = np.stack([df.values for df in contributions], axis=1)
+            values = np.take_along_axis(stacked, indexclas[:, None, None], axis=1)[:, 0, :]
+        else:
+            # Summaries of each class may have a different number of columns
+            complete_sum = [list(x) for x in list(zip(*[df.values.tolist() for df in contributions]))]
+            values = [summar[ind] for ind, summar in zip(indexclas, complete_sum)]
         summary = pd.DataFrame(
-            [summar[ind] for ind, summar in zip(indexclas, complete_sum)],
+            values,
             columns=contributions[0].columns,
             index=contributions[0].index,
             dtype=object,
@@ -60,7 +69,7 @@ def keep_right_contributions(y_pred, contributions, _case, _classes, label_dict,
             y_pred = y_pred.applymap(lambda x: label_dict[x])
         if proba_values is not None:
             y_proba = pd.DataFrame(
-                [proba[ind] for ind, proba in zip(indexclas, proba_values.values)],
+                proba_values.values[np.arange(len(indexclas)), indexclas],
                 columns=["proba"],
                 index=y_pred.index,
             )
@@ -31,12 +31,17 @@ def summarize_el(dataframe, mask, prefix):
     pd.DataFrame
         Result of the summarize step
     """
-    matrix = dataframe.where(mask.to_numpy()).values.tolist()
-    summarized_matrix = [[x for x in ll if str(x) != "nan"] for ll in matrix]
+    keep = mask.to_numpy(dtype=bool, copy=True)
+    values = dataframe.where(keep).to_numpy()
+    # Masked values are NaN : only the values kept by the mask are checked
+    keep[keep] = ~_is_nan(values[keep])
+    # Position of each kept value in its summarized row
+    rows, cols = np.nonzero(keep)
+    positions = np.cumsum(keep, axis=1)[rows, cols] - 1
     # Padding to create pd.DataFrame
-    max_length = max(len(ll) for ll in summarized_matrix)
-    for elem in summarized_matrix:
-        elem.extend([np.nan] * (max_length - len(elem)))
+    max_length = int(keep.sum(axis=1).max(initial=0))
+    summarized_matrix = np.full((values.shape[0], max_length), np.nan, dtype=object)
+    summarized_matrix[rows, positions] = values[rows, cols]
     # Create DataFrame
     col_list = [prefix + str(x + 1) for x in list(range(max_length))]
     df_summarized_matrix = pd.DataFrame(summarized_matrix, index=list(dataframe.index), columns=col_list, dtype=object)
@@ -44,6 +49,20 @@ def summarize_el(dataframe, mask, prefix):
     return df_summarized_matrix
 
 
+def _is_nan(values):
+    """
+    Vectorized equivalent of str(x) == "nan" on each element of a 1d numpy array.
+    """
+    if values.dtype.kind == "f":
+        return np.isnan(values)
+    if values.dtype != object:
+        return np.zeros(values.shape, dtype=bool)
+    is_nan = pd.isna(values) | (values == "nan")
+    # pd.isna also detects None, NaT and pd.NA whose string is not "nan"
+    is_nan[is_nan] = [isinstance(x, (float, np.floating, str)) for x in values[is_nan]]
+    return is_nan
+
+
 def compute_features_import(dataframe):
     """
     Compute a relative features importance, sum of absolute values
@@ -60,7 +79,25 @@ def compute_features_import(dataframe):
         feature importance One row by feature,
         index of the serie = dataframe.columns
     """
-    feat_imp = dataframe.abs().sum().sort_values(ascending=True)
+    return normalize_features_import(dataframe.abs().sum())
+
+
+def normalize_features_import(abs_sum):
+    """
+    Compute the relative features importance from the sum of absolute
+    contributions of each feature.
+
+    Parameters
+    ----------
+    abs_sum: pd.Series
+        Sum of absolute contributions, one row by feature.
+
+    Returns
+    -------
+    pd.Series
+        feature importance in base 1, sorted by increasing values
+    """
+    feat_imp = abs_sum.sort_values(ascending=True)
     tot = feat_imp.sum()
     return feat_imp / tot
 
@@ -104,6 +141,52 @@ def summarize(s_contrib, var_dict, x_sorted, mask, columns_dict, features_dict):
     return summary
 
 
+def summary_columns(max_contrib):
+    """
+    Columns of a summary showing at most max_contrib contributions, in the order of the summarize function.
+
+    Parameters
+    ----------
+    max_contrib: int
+        Number of contributions of the summary
+
+    Returns
+    -------
+    list
+        Names of the columns
+    """
+    return [f"{prefix}_{i}" for i in range(1, max_contrib + 1) for prefix in ["feature", "value", "contribution"]]
+
+
+def format_summary_dtypes(summary, numeric_values):
+    """
+    Gives fixed dtypes to the columns of a summary, so that all the chunks of a summary
+    written in a file have the same schema, whatever the missing values of each chunk.
+
+    Parameters
+    ----------
+    summary: pd.DataFrame
+        Summary, possibly concatenated with the prediction and the probability columns
+    numeric_values: bool
+        Whether the value columns contain only numeric values
+
+    Returns
+    -------
+    pd.DataFrame
+        Summary with float contributions and probabilities, string features names, and float
+        or string values
+    """
+    dtypes = {}
+    for col in summary.columns:
+        if col == "proba" or col.startswith("contribution_"):
+            dtypes[col] = float
+        elif col.startswith("feature_") or (col.startswith("value_") and not numeric_values):
+            dtypes[col] = "string"
+        elif col.startswith("value_"):
+            dtypes[col] = float
+    return summary.astype(dtypes)
+
+
 def group_contributions(contributions, features_groups):
     """
     Regroup contributions according to features_groups parameter
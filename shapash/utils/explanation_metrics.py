@@ -1,5 +1,7 @@
 import numpy as np
 import pandas as pd
+from sklearn.metrics import pairwise_distances_chunked
+from sklearn.neighbors import NearestNeighbors
 from sklearn.preprocessing import normalize
 
 
@@ -25,56 +27,77 @@ def _df_to_array(instances):
         return instances
 
 
-def _compute_distance(x1, x2, mean_vector, epsilon=0.0000001):
+def _get_mean_vector(dataset):
     """
-    Compute distances between data points by using L1 on normalized data : sum(abs(x1-x2)/(mean_vector+epsilon))
+    Compute the normalization vector of the distance between data points
 
     Parameters
     ----------
-    x1 : array
-        First vector
-    x2 : array
-        Second vector
+    dataset : 2D array
+        Entire dataset used to identify neighbors
+
+    Returns
+    -------
+    mean_vector : array
+        Each value of this vector is the std.dev for each feature in dataset
+    """
+    return np.array(dataset, dtype=np.float32).std(axis=0)
+
+
+def _scale_features(values, mean_vector, epsilon=0.0000001):
+    """
+    Normalize data points by the std.dev of each feature, so that the L1 distance between
+    scaled points is :math:`\\sum(\\frac{|x1-x2|}{mean\\_vector+epsilon})`
+
+    Parameters
+    ----------
+    values : 2D array
+        Data points
     mean_vector : array
         Each value of this vector is the std.dev for each feature in dataset
 
     Returns
     -------
-    diff : float
-        Returns :math:`\\sum(\\frac{|x1-x2|}{mean\\_vector+epsilon})`
+    scaled : 2D array
+        Scaled data points
     """
-    diff = np.sum(np.abs(x1 - x2) / (mean_vector + epsilon))
-    return diff
+    return np.asarray(values, dtype=float) / (mean_vector + epsilon)
 
 
-def _compute_similarities(instance, dataset):
+def _nearest_neighbors(instances, dataset, n_neighbors, mean_vector=None, epsilon=0.0000001):
     """
-    Compute pairwise distances between an instance and all other data points
+    Find the closest data points of each instance, with the L1 distance on data normalized
+    by the std.dev of each feature (see _scale_features).
+    Features are scaled once, and all the instances are searched in one batched call of a
+    KD-tree (or brute force when the number of features is high).
 
     Parameters
     ----------
-    instance : 1D array
-        Reference data point
+    instances : 2D array
+        Reference data points
     dataset : 2D array
         Entire dataset used to identify neighbors
+    n_neighbors : int
+        Number of closest data points returned for each instance (the instance itself included)
+    mean_vector : array, optional
+        Std.dev of each feature in dataset, computed if not given
 
     Returns
     -------
-    similarity_distance : array
-        V[j] == distance between actual instance and instance j
+    indices : 2D array
+        indices[i, j] == position in dataset of the j-th closest data point of instance i
+    distances : 2D array
+        distances[i, j] == distance between instance i and this data point
     """
-    mean_vector = np.array(dataset, dtype=np.float32).std(axis=0)
-    similarity_distance = np.zeros(dataset.shape[0])
-
-    for j in range(0, dataset.shape[0]):
-        # Calculate distance between point and instance j
-        dist = _compute_distance(instance, dataset[j], mean_vector)
-        similarity_distance[j] = dist
+    if mean_vector is None:
+        mean_vector = _get_mean_vector(dataset)
+    engine = NearestNeighbors(n_neighbors=min(n_neighbors, dataset.shape[0]), metric="manhattan")
+    engine.fit(_scale_features(dataset, mean_vector, epsilon))
+    distances, indices = engine.kneighbors(_scale_features(instances, mean_vector, epsilon))
+    return indices, distances
 
-    return similarity_distance
 
-
-def _get_radius(dataset, n_neighbors, sample_size=500, percentile=95):
+def _get_radius(dataset, n_neighbors, sample_size=500, percentile=95, mean_vector=None, random_state=0):
     """
     Calculate the maximum allowed distance between points to be considered as neighbors
 
@@ -88,6 +111,10 @@ def _get_radius(dataset, n_neighbors, sample_size=500, percentile=95):
         Number of data points to sample from dataset, by default 500
     percentile : int, optional
         Percentile used to calculate the distance threshold, by default 95
+    mean_vector : array, optional
+        Std.dev of each feature in dataset, computed if not given
+    random_state : int, optional
+        Seed of the sampling, by default 0 so that the radius of a dataset is always the same
 
     Returns
     -------
@@ -97,24 +124,60 @@ def _get_radius(dataset, n_neighbors, sample_size=500, percentile=95):
     # Select 500 points max to sample
     size = min([dataset.shape[0], sample_size])
     # Randomly sample points from dataset
-    sampled_instances = dataset[np.random.randint(0, dataset.shape[0], size), :]
+    sampled_instances = dataset[np.random.RandomState(random_state).randint(0, dataset.shape[0], size), :]
     # Define normalization vector
-    mean_vector = np.array(dataset, dtype=np.float32).std(axis=0)
-    # Initialize the similarity matrix
-    similarity_distance = np.zeros((size, size))
-    # Calculate pairwise distance between instances
-    for i in range(size):
-        for j in range(i, size):
-            dist = _compute_distance(sampled_instances[i], sampled_instances[j], mean_vector)
-            similarity_distance[i, j] = dist
-            similarity_distance[j, i] = dist
-    # Select top n_neighbors
-    ordered_X = np.sort(similarity_distance)[:, 1 : n_neighbors + 1]
+    if mean_vector is None:
+        mean_vector = _get_mean_vector(dataset)
+    sampled_instances = _scale_features(sampled_instances, mean_vector)
+    # Calculate pairwise distances between instances by chunks, and select top n_neighbors
+    ordered_X = np.concatenate(
+        list(
+            pairwise_distances_chunked(
+                sampled_instances,
+                metric="manhattan",
+                reduce_func=lambda chunk, start: np.sort(chunk)[:, 1 : n_neighbors + 1],
+            )
+        )
+    )
     # Select the value of the distance that captures XX% of all distances (percentile)
     return np.percentile(ordered_X.flatten(), percentile)
 
 
-def find_neighbors(selection, dataset, model, mode, n_neighbors=10):
+def compute_neighbors_parameters(dataset, n_neighbors=10):
+    """
+    Compute the parameters of find_neighbors that only depend on the dataset, so that they can
+    be reused by several calls on the same dataset.
+
+    Parameters
+    ----------
+    dataset : DataFrame
+        Entire dataset used to identify neighbors
+    n_neighbors : int, optional
+        Top N neighbors initially allowed, by default 10
+
+    Returns
+    -------
+    mean_vector : array
+        Std.dev of each feature in dataset
+    radius : float
+        Distance threshold
+    """
+    mean_vector = _get_mean_vector(dataset.values)
+    radius = _get_radius(dataset.values, n_neighbors, mean_vector=mean_vector)
+    return mean_vector, radius
+
+
+def find_neighbors(
+    selection,
+    dataset,
+    model,
+    mode,
+    n_neighbors=10,
+    mean_vector=None,
+    radius=None,
+    return_indices=False,
+    predictions=None,
+):
     """
     For each instance, select neighbors based on 3 criteria:
 
@@ -134,29 +197,42 @@ def find_neighbors(selection, dataset, model, mode, n_neighbors=10):
         "classification" or "regression"
     n_neighbors : int, optional
         Top N neighbors initially allowed, by default 10
+    mean_vector : array, optional
+        Std.dev of each feature in dataset, computed if not given
+    radius : float, optional
+        Distance threshold, computed if not given
+    return_indices : bool, optional
+        Also return the positions of the neighbors in dataset, by default False
+    predictions : 1D array, optional
+        Model output for each row of dataset (prediction for regression, probability of the second
+        class for classification). The model is only called if it is not given.
 
     Returns
     -------
     all_neighbors : list of 2D arrays
         Wrap all instances with corresponding neighbors in a list with length (#instances).
         Each array has shape (#neighbors, #features) where #neighbors includes the instance itself.
+    all_indices : list of 1D arrays
+        Only if return_indices is True : positions in dataset of the rows of each array of all_neighbors.
     """
-    instances = dataset.loc[selection].values
+    positions = dataset.index.get_indexer(selection)
+    values = dataset.values
+    instances = values[positions]
 
-    all_neighbors = np.empty((0, instances.shape[1] + 1), float)
     """Filter 1 : Pick top N closest neighbors"""
-    for instance in instances:
-        c = _compute_similarities(instance, dataset.values)
-        # Pick indices of the closest neighbors (and include instance itself)
-        neighbors_indices = np.argsort(c)[: n_neighbors + 1]
-        # Return instance with its neighbors
-        neighbors = dataset.values[neighbors_indices]
-        # Add distance column
-        neighbors = np.append(neighbors, c[neighbors_indices].reshape(n_neighbors + 1, 1), axis=1)
-        all_neighbors = np.append(all_neighbors, neighbors, axis=0)
+    # Indices of the closest neighbors of all instances (instance itself included)
+    if mean_vector is None:
+        mean_vector = _get_mean_vector(values)
+    neighbors_indices, distances = _nearest_neighbors(instances, values, n_neighbors + 1, mean_vector=mean_vector)
+    neighbors_indices, distances = _put_instances_first(positions, neighbors_indices, distances)
+    # Return instances with their neighbors, and add distance column
+    all_neighbors = np.append(values[neighbors_indices.ravel()], distances.reshape(-1, 1), axis=1)
 
     # Calculate predictions for all instances and corresponding neighbors
-    if mode == "regression":
+    if predictions is not None:
+        # Neighbors are rows of dataset : their outputs are already known
+        predictions = np.asarray(predictions, dtype=float)[neighbors_indices.ravel()]
+    elif mode == "regression":
         # For XGB it is necessary to add columns in df, otherwise columns mismatch
         predictions = model.predict(pd.DataFrame(all_neighbors[:, :-1], columns=dataset.columns))
     elif mode == "classification":
@@ -166,28 +242,63 @@ def find_neighbors(selection, dataset, model, mode, n_neighbors=10):
     all_neighbors = np.append(all_neighbors, predictions.reshape(all_neighbors.shape[0], 1), axis=1)
     # Split back into original chunks (1 chunck = instance + neighbors)
     all_neighbors = np.split(all_neighbors, instances.shape[0])
+    all_indices = np.split(neighbors_indices.ravel(), instances.shape[0])
 
     """Filter 2 : neighbors with similar blackbox output"""
     # Remove points if prediction is far away from instance prediction
-    if mode == "regression":
-        # Trick : use enumerate to allow the modifcation directly on the iterator
-        for i, neighbors in enumerate(all_neighbors):
-            all_neighbors[i] = neighbors[abs(neighbors[:, -1] - neighbors[0, -1]) < 0.1 * abs(neighbors[0, -1])]
-    elif mode == "classification":
-        for i, neighbors in enumerate(all_neighbors):
-            all_neighbors[i] = neighbors[abs(neighbors[:, -1] - neighbors[0, -1]) < 0.1]
+    for i, neighbors in enumerate(all_neighbors):
+        if mode == "regression":
+            keep = abs(neighbors[:, -1] - neighbors[0, -1]) < 0.1 * abs(neighbors[0, -1])
+        elif mode == "classification":
+            keep = abs(neighbors[:, -1] - neighbors[0, -1]) < 0.1
+        all_neighbors[i], all_indices[i] = neighbors[keep], all_indices[i][keep]
 
     """Filter 3 : neighbors below a distance threshold"""
     # Remove points if distance is bigger than radius
-    radius = _get_radius(dataset.values, n_neighbors)
+    if radius is None:
+        radius = _get_radius(values, n_neighbors, mean_vector=mean_vector)
 
     for i, neighbors in enumerate(all_neighbors):
         # -2 indicates the distance column
-        all_neighbors[i] = neighbors[neighbors[:, -2] < radius]
+        keep = neighbors[:, -2] < radius
+        all_neighbors[i], all_indices[i] = neighbors[keep], all_indices[i][keep]
+    if return_indices:
+        return all_neighbors, all_indices
     return all_neighbors
 
 
-def shap_neighbors(instance, x_encoded, contributions, mode):
+def _put_instances_first(positions, neighbors_indices, distances):
+    """
+    Make sure that the first neighbor of each instance is the instance itself : with duplicated
+    rows, the search can return a duplicate of the instance first, or not return the instance.
+
+    Parameters
+    ----------
+    positions : 1D array
+        Position in dataset of each instance
+    neighbors_indices : 2D array
+        Positions in dataset of the closest data points of each instance
+    distances : 2D array
+        Distances between each instance and these data points
+
+    Returns
+    -------
+    neighbors_indices : 2D array
+        Same positions, the instance being first
+    distances : 2D array
+        Corresponding distances
+    """
+    missing = ~(neighbors_indices == positions[:, None]).any(axis=1)
+    # The instance replaces the farthest neighbor when it is not returned
+    neighbors_indices[missing, 1:] = neighbors_indices[missing, :-1]
+    neighbors_indices[missing, 0] = positions[missing]
+    distances[missing, 1:] = distances[missing, :-1]
+    distances[missing, 0] = 0
+    order = np.argsort(neighbors_indices != positions[:, None], axis=1, kind="stable")
+    return np.take_along_axis(neighbors_indices, order, axis=1), np.take_along_axis(distances, order, axis=1)
+
+
+def shap_neighbors(instance, x_encoded, contributions, mode, indices=None):
     """
     For an instance and corresponding neighbors, calculate various
     metrics (described below) that are useful to evaluate local stability
@@ -200,6 +311,11 @@ def shap_neighbors(instance, x_encoded, contributions, mode):
         Entire dataset used to identify neighbors
     contributions : DataFrame
         Calculated contribution values for the dataset
+    mode : str
+        "classification" or "regression"
+    indices : 1D array, optional
+        Positions in x_encoded of the rows of instance, as returned by find_neighbors.
+        If not given, rows are found by matching their feature values in x_encoded.
 
     Returns
     -------
@@ -211,12 +327,17 @@ def shap_neighbors(instance, x_encoded, contributions, mode):
         Normalized absolute SHAP value of the instance
     """
     # Extract SHAP values for instance and neighbors
-    # :-2 indicates that two columns are disregarded : distance to instance and model output
-    ind = (
-        pd.merge(x_encoded.reset_index(), pd.DataFrame(instance[:, :-2], columns=x_encoded.columns), how="inner")
-        .set_index(x_encoded.index.name if x_encoded.index.name is not None else "index")
-        .index
-    )
+    if indices is not None:
+        ind = x_encoded.index[indices]
+    else:
+        # :-2 indicates that two columns are disregarded : distance to instance and model output
+        ind = (
+            pd.merge(
+                x_encoded.reset_index(), pd.DataFrame(instance[:, :-2], columns=x_encoded.columns), how="inner"
+            )
+            .set_index(x_encoded.index.name if x_encoded.index.name is not None else "index")
+            .index
+        )
     # If classification, select contrbutions of one class only
     if mode == "classification" and len(contributions) == 2:
         contributions = contributions[1]
@@ -278,26 +399,21 @@ def get_min_nb_features(selection, contributions, mode, distance):
     if mode == "classification" and len(contributions) == 2:
         contributions = contributions[1]
     contributions = contributions.loc[selection].values
-    features_needed = []
     # For each instance, add features one by one (ordered by SHAP) until we get close enough
-    for i in range(contributions.shape[0]):
-        ids = np.flip(np.argsort(np.abs(contributions[i, :])))
-        output_value = np.sum(contributions[i, :])
-
-        score = 0
-        for j, idx in enumerate(ids):  # noqa: B007
-            # j : number of features needed
-            # idx : positions of the j top shap values
-            score += contributions[i, idx]
-            # CLOSE_ENOUGH
-            if mode == "regression":
-                if abs(score - output_value) < distance * abs(output_value):
-                    break
-            elif mode == "classification":
-                if abs(score - output_value) < distance:
-                    break
-        features_needed.append(j + 1)
-    return features_needed
+    ids = np.flip(np.argsort(np.abs(contributions), axis=1), axis=1)
+    output_value = np.sum(contributions, axis=1)
+    # score[i, j] : output of instance i with its j + 1 top features
+    score = np.cumsum(np.take_along_axis(contributions, ids, axis=1), axis=1)
+    # CLOSE_ENOUGH
+    if mode == "regression":
+        close_enough = np.abs(score - output_value[:, None]) < distance * np.abs(output_value[:, None])
+    elif mode == "classification":
+        close_enough = np.abs(score - output_value[:, None]) < distance
+    else:
+        close_enough = np.zeros(score.shape, dtype=bool)
+    # Number of features needed : first close enough score, all features if none is
+    features_needed = np.where(close_enough.any(axis=1), close_enough.argmax(axis=1) + 1, contributions.shape[1])
+    return features_needed.tolist()
 
 
 def get_distance(selection, contributions, mode, nb_features):
@@ -333,7 +449,9 @@ def get_distance(selection, contributions, mode, nb_features):
     assert nb_features <= contributions.shape[1]
 
     contributions = contributions.loc[selection].values
-    top_features = np.array([sorted(row, key=abs, reverse=True) for row in contributions])[:, :nb_features]
+    # Stable sort by decreasing absolute value, like sorted(row, key=abs, reverse=True)
+    order = np.argsort(-np.abs(contributions), axis=1, kind="stable")
+    top_features = np.take_along_axis(contributions, order, axis=1)[:, :nb_features]
     output_top_features = np.sum(top_features[:, :], axis=1)
     output_all_features = np.sum(contributions[:, :], axis=1)
 
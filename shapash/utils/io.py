@@ -1,7 +1,14 @@
 """
 IO module
 """
+import importlib
+import json
+import os
 import pickle
+import shutil
+
+import numpy as np
+import pandas as pd
 
 try:
     import yaml
@@ -10,6 +17,16 @@ try:
 except ImportError:
     _is_yaml_available = False
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _is_pyarrow_available = True
+except ImportError:
+    _is_pyarrow_available = False
+
+from shapash.decomposition.contributions import StackedFrames, stacked_array
+
 
 def save_pickle(obj, path, protocol=pickle.HIGHEST_PROTOCOL):
     """
@@ -93,3 +110,407 @@ def load_yml(path):
         d = yaml.full_load(f)
 
     return d
+
+
+class ChunkWriter:
+    """
+    Writes the chunks of a DataFrame one after the other in a parquet file
+    (one row group per chunk) or a csv file.
+
+    Parameters
+    ----------
+    path : str
+        File path where the DataFrame will be stored.
+    format : str, optional (default: 'parquet')
+        'parquet' or 'csv'. Parquet files require pyarrow.
+
+    Example
+    --------
+    >>> with ChunkWriter('summary.parquet') as writer:
+    ...     for chunk in chunks:
+    ...         writer.write(chunk)
+    """
+
+    formats = ["parquet", "csv"]
+
+    def __init__(self, path, format="parquet"):
+        if not isinstance(path, str):
+            raise ValueError(
+                """
+                path parameter must be a string
+                """
+            )
+        if format not in self.formats:
+            raise ValueError(f"format must be one of {self.formats}")
+        if format == "parquet" and _is_pyarrow_available is False:
+            raise ModuleNotFoundError('Please install pyarrow using "pip install pyarrow" command.')
+        self.path = path
+        self.format = format
+        self._parquet_writer = None
+        self._n_chunks = 0
+
+    def write(self, chunk):
+        """
+        Appends a chunk to the file. All chunks must have the same columns and dtypes.
+
+        Parameters
+        ----------
+        chunk : pd.DataFrame
+            Chunk to write, with its index.
+        """
+        if self.format == "csv":
+            chunk.to_csv(self.path, mode="a" if self._n_chunks else "w", header=not self._n_chunks)
+        else:
+            schema = None if self._parquet_writer is None else self._parquet_writer.schema
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=True)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        self._n_chunks += 1
+
+    def close(self):
+        """
+        Closes the file.
+        """
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+COLUMNAR_FORMAT_VERSION = 1
+
+
+def save_columnar(attributes, path, separate=None, object_classes=()):
+    """
+    Save a dict of attributes in a directory, with a columnar layout :
+        - numeric DataFrames, Series and arrays in .npy files, that can be memory-mapped
+        - other DataFrames in parquet files (if pyarrow is installed and the dtypes are kept)
+        - JSON-compatible values (metadata, dicts) in metadata.json
+        - the other objects in pickle files
+
+    An object referenced several times (for example contributions used by sorted data) is only
+    stored once.
+
+    Parameters
+    ----------
+    attributes : dict
+        Attributes to save, with string keys.
+    path : str
+        Directory where the attributes are stored. It is created if needed; if it contains
+        a previous save, it is replaced.
+    separate : dict, optional
+        Objects (like a model) stored in their own pickle file, named after their key.
+        The other pickled objects only keep a reference to them.
+    object_classes : tuple, optional
+        Classes whose instances are saved attribute by attribute, so that their DataFrames
+        are stored in a columnar way.
+    """
+    if not isinstance(path, str):
+        raise ValueError(
+            """
+            path parameter must be a string
+            """
+        )
+    if os.path.isdir(path) and os.listdir(path):
+        if not os.path.isfile(os.path.join(path, "metadata.json")):
+            raise ValueError(f"{path} is not empty and does not contain a previous save")
+        shutil.rmtree(path)
+    os.makedirs(path, exist_ok=True)
+
+    writer = _ColumnarWriter(path, separate or dict(), object_classes)
+    encoded = {name: writer.encode(value) for name, value in attributes.items()}
+    for name, obj in writer.separate.items():
+        with open(os.path.join(path, f"{name}.pkl"), "wb") as file:
+            pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(path, "objects.pkl"), "wb") as file:
+        writer.pickler(file).dump(writer.pickled)
+    metadata = {"format_version": COLUMNAR_FORMAT_VERSION, "separate": list(writer.separate), "attributes": encoded}
+    with open(os.path.join(path, "metadata.json"), "w") as file:
+        json.dump(metadata, file)
+
+
+def load_columnar(path, mmap=False, include=None):
+    """
+    Load a dict of attributes saved with save_columnar.
+
+    Parameters
+    ----------
+    path : str
+        Directory where the attributes are stored.
+    mmap : bool, optional (default: False)
+        If True, the .npy files are memory-mapped (read-only) instead of being read : loading
+        is almost instant, data is read from disk when it is used, and the pages are shared
+        between the processes which load the same directory.
+    include : list, optional
+        Names of the attributes to load. By default, all the attributes are loaded.
+
+    Returns
+    -------
+    dict
+        Attributes saved.
+    """
+    reader = ColumnarReader(path, mmap=mmap)
+    return {name: reader.read(name) for name in (reader.names if include is None else include)}
+
+
+class _ColumnarWriter:
+    """
+    Encodes values into JSON descriptions, writing their data in the save directory.
+    """
+
+    def __init__(self, path, separate, object_classes):
+        self.path = path
+        self.separate = separate
+        self.separate_ids = {id(obj): name for name, obj in separate.items()}
+        self.object_classes = tuple(object_classes)
+        self.pickled = dict()
+        self.memo = dict()
+        self.n_files = 0
+
+    def pickler(self, file):
+        pickler = pickle.Pickler(file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = lambda obj: self.separate_ids.get(id(obj))
+        return pickler
+
+    def new_file(self, extension):
+        self.n_files += 1
+        return f"{self.n_files}.{extension}"
+
+    def pickle_key(self, obj):
+        key = str(len(self.pickled))
+        self.pickled[key] = obj
+        return key
+
+    def encode(self, value):
+        if id(value) in self.separate_ids:
+            return {"kind": "separate", "name": self.separate_ids[id(value)]}
+        if _is_json(value):
+            return {"kind": "json", "value": value}
+        if not isinstance(value, (pd.DataFrame, pd.Series, np.ndarray, list, tuple, dict) + self.object_classes):
+            return {"kind": "pickle", "key": self.pickle_key(value)}
+        if isinstance(value, dict) and not all(isinstance(key, str) for key in value):
+            return {"kind": "pickle", "key": self.pickle_key(value)}
+        # Shared objects (like the list of contributions of the sorted data) are stored once
+        if id(value) in self.memo:
+            return {"kind": "ref", "uid": self.memo[id(value)]}
+        uid = len(self.memo)
+        self.memo[id(value)] = uid
+        if stacked_array(value) is not None:
+            # Stacked contributions of a multi-class problem are stored as a single (classes, n, f) array
+            axes = self.pickle_key(([frame.index for frame in value], [frame.columns for frame in value]))
+            encoded = {"kind": "stacked", "file": self.save_npy(value.array), "axes": axes}
+        elif isinstance(value, (list, tuple)):
+            encoded = {"kind": type(value).__name__, "items": [self.encode(item) for item in value]}
+        elif isinstance(value, dict):
+            encoded = {"kind": "dict", "items": {key: self.encode(item) for key, item in value.items()}}
+        else:
+            encoded = self.encode_data(value)
+        return dict(encoded, uid=uid)
+
+    def encode_data(self, value):
+        if isinstance(value, self.object_classes):
+            cls = type(value)
+            state = {key: self.encode(item) for key, item in vars(value).items()}
+            return {"kind": "object", "class": f"{cls.__module__}:{cls.__qualname__}", "state": state}
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind in "biufc":
+                return {"kind": "array", "file": self.save_npy(value)}
+        elif isinstance(value, pd.Series):
+            if _is_numeric_dtype(value.dtype):
+                axes = self.pickle_key((value.index, value.name))
+                return {"kind": "series", "file": self.save_npy(value.to_numpy()), "axes": axes}
+        elif len(set(value.dtypes)) == 1 and _is_numeric_dtype(value.dtypes.iloc[0]):
+            axes = self.pickle_key((value.index, value.columns))
+            return {"kind": "frame", "file": self.save_npy(value.to_numpy()), "axes": axes}
+        elif _is_pyarrow_available and _is_parquet_compatible(value):
+            file = self.new_file("parquet")
+            value.to_parquet(os.path.join(self.path, file))
+            return {"kind": "parquet", "file": file}
+        file = self.new_file("pkl")
+        with open(os.path.join(self.path, file), "wb") as f:
+            self.pickler(f).dump(value)
+        return {"kind": "pickle_file", "file": file}
+
+    def save_npy(self, array):
+        file = self.new_file("npy")
+        np.save(os.path.join(self.path, file), np.ascontiguousarray(array), allow_pickle=False)
+        return file
+
+
+class ColumnarReader:
+    """
+    Reads the attributes saved with save_columnar one by one, so that only the files of the
+    attributes used are read.
+    The metadata, the separate objects and the small pickled objects are read when the
+    reader is created.
+
+    Parameters
+    ----------
+    path : str
+        Directory where the attributes are stored.
+    mmap : bool, optional (default: False)
+        If True, the .npy files are memory-mapped (read-only) instead of being read.
+    """
+
+    def __init__(self, path, mmap=False):
+        if not isinstance(path, str):
+            raise ValueError(
+                """
+                path parameter must be a string
+                """
+            )
+        with open(os.path.join(path, "metadata.json")) as file:
+            metadata = json.load(file)
+        if metadata.get("format_version") != COLUMNAR_FORMAT_VERSION:
+            raise ValueError(f"Unsupported format version : {metadata.get('format_version')}")
+        self.path = path
+        self.mmap_mode = "r" if mmap else None
+        self.attributes = metadata["attributes"]
+        self.separate = {name: load_pickle(os.path.join(path, f"{name}.pkl")) for name in metadata["separate"]}
+        with open(os.path.join(path, "objects.pkl"), "rb") as file:
+            unpickler = pickle.Unpickler(file)
+            unpickler.persistent_load = lambda pid: self.separate[pid]
+            self.pickled = unpickler.load()
+        # Descriptions of the shared objects, to decode a reference to an object not read yet
+        self.shared = dict()
+        self._index_shared(list(self.attributes.values()))
+        self.memo = dict()
+
+    @property
+    def names(self):
+        """
+        Names of the saved attributes.
+        """
+        return list(self.attributes)
+
+    def is_in_memory(self, name):
+        """
+        Returns True if the attribute is already in memory (JSON value or small pickled object),
+        False if reading it requires reading its own files.
+        """
+        return self.attributes[name]["kind"] in ["json", "pickle", "separate"]
+
+    def read(self, name):
+        """
+        Read a saved attribute.
+
+        Parameters
+        ----------
+        name : str
+            Name of the attribute.
+
+        Returns
+        -------
+        object
+            Attribute saved.
+        """
+        if name not in self.attributes:
+            raise KeyError(f"No saved attribute named {name}")
+        return self.decode(self.attributes[name])
+
+    def _index_shared(self, values):
+        while values:
+            value = values.pop()
+            if "uid" in value and value["kind"] != "ref":
+                self.shared[value["uid"]] = value
+            if value["kind"] in ["list", "tuple"]:
+                values.extend(value["items"])
+            elif value["kind"] == "dict":
+                values.extend(value["items"].values())
+            elif value["kind"] == "object":
+                values.extend(value["state"].values())
+
+    def decode(self, value):
+        kind = value["kind"]
+        if kind == "json":
+            return value["value"]
+        if kind == "separate":
+            return self.separate[value["name"]]
+        if kind == "pickle":
+            return self.pickled[value["key"]]
+        if value.get("uid") in self.memo:
+            return self.memo[value["uid"]]
+        if kind == "ref":
+            return self.decode(self.shared[value["uid"]])
+        if kind in ["list", "tuple"]:
+            items = [self.decode(item) for item in value["items"]]
+            decoded = items if kind == "list" else tuple(items)
+        elif kind == "dict":
+            decoded = {key: self.decode(item) for key, item in value["items"].items()}
+        else:
+            decoded = self.decode_data(value)
+        self.memo[value["uid"]] = decoded
+        return decoded
+
+    def decode_data(self, value):
+        kind = value["kind"]
+        if kind == "object":
+            module, qualname = value["class"].split(":")
+            cls = importlib.import_module(module)
+            for name in qualname.split("."):
+                cls = getattr(cls, name)
+            obj = cls.__new__(cls)
+            obj.__dict__.update({key: self.decode(item) for key, item in value["state"].items()})
+            return obj
+        if kind == "parquet":
+            return pd.read_parquet(os.path.join(self.path, value["file"]))
+        if kind == "pickle_file":
+            with open(os.path.join(self.path, value["file"]), "rb") as file:
+                unpickler = pickle.Unpickler(file)
+                unpickler.persistent_load = lambda pid: self.separate[pid]
+                return unpickler.load()
+        array = np.load(os.path.join(self.path, value["file"]), mmap_mode=self.mmap_mode, allow_pickle=False)
+        if kind == "array":
+            return array
+        if kind == "stacked":
+            indexes, columns = self.pickled[value["axes"]]
+            return StackedFrames(array, indexes, columns)
+        if kind == "series":
+            index, name = self.pickled[value["axes"]]
+            return pd.Series(array, index=index, name=name, copy=False)
+        index, columns = self.pickled[value["axes"]]
+        return pd.DataFrame(array, index=index, columns=columns, copy=False)
+
+
+def _is_json(value):
+    """
+    Returns True if value is kept identical by a JSON round trip.
+    """
+    try:
+        return _same_json_value(json.loads(json.dumps(value)), value)
+    except (TypeError, ValueError):
+        return False
+
+
+def _same_json_value(loaded, value):
+    if type(loaded) is not type(value):
+        return False
+    if isinstance(value, dict):
+        return list(loaded) == list(value) and all(_same_json_value(loaded[k], value[k]) for k in value)
+    if isinstance(value, list):
+        return len(loaded) == len(value) and all(_same_json_value(a, b) for a, b in zip(loaded, value))
+    return loaded == value
+
+
+def _is_numeric_dtype(dtype):
+    return isinstance(dtype, np.dtype) and dtype.kind in "biufc"
+
+
+def _is_parquet_compatible(df):
+    """
+    Returns True if the DataFrame keeps its columns and dtypes when it is written in a parquet file.
+    """
+    if not all(isinstance(col, str) for col in df.columns) or not df.columns.is_unique:
+        return False
+    if isinstance(df.index, pd.MultiIndex) or not (df.index.name is None or isinstance(df.index.name, str)):
+        return False
+    for dtype, col in zip(df.dtypes, df.columns):
+        if dtype == object and pd.api.types.infer_dtype(df[col], skipna=False) not in ["string", "empty"]:
+            return False
+    return True
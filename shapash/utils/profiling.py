@@ -0,0 +1,88 @@
+"""
+Profiling module
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+
+    is_resource_available = True
+except ImportError:
+    is_resource_available = False
+
+
+def _get_peak_rss():
+    """
+    Returns the peak resident set size of the process in MB, or None if it is not available.
+    """
+    if not is_resource_available:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak_rss / 1024**2 if sys.platform == "darwin" else peak_rss / 1024
+
+
+class StageProfiler:
+    """
+    Records the wall time, the peak RSS delta and the number of rows and columns
+    processed by each stage of a computation.
+
+    Parameters
+    ----------
+    hook : callable, optional
+        Function called with the record (dict) of each stage once it is done,
+        for example to push the numbers to a metrics system.
+
+    Example
+    --------
+    >>> profiler = StageProfiler()
+    >>> with profiler.stage("predict", x):
+    ...     model.predict(x)
+    >>> profiler.to_frame()
+    """
+
+    columns = ["stage", "wall_time", "peak_rss_delta", "n_rows", "n_cols"]
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, data=None):
+        """
+        Context manager recording a stage.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage.
+        data : pd.DataFrame or np.ndarray, optional
+            Data processed by the stage, used to record its number of rows and columns.
+        """
+        peak_rss = _get_peak_rss()
+        start = time.perf_counter()
+        yield
+        wall_time = time.perf_counter() - start
+        shape = getattr(data, "shape", (None, None))
+        record = {
+            "stage": name,
+            "wall_time": wall_time,
+            "peak_rss_delta": None if peak_rss is None else _get_peak_rss() - peak_rss,
+            "n_rows": shape[0],
+            "n_cols": shape[1] if len(shape) > 1 else None,
+        }
+        self.records.append(record)
+        if self.hook is not None:
+            self.hook(record)
+
+    def to_frame(self):
+        """
+        Returns the records as a DataFrame with one row per stage : wall time (seconds),
+        peak RSS delta (MB), number of rows and columns.
+        """
+        profile = pd.DataFrame(self.records, columns=self.columns).set_index("stage")
+        return profile.astype({"n_rows": "Int64", "n_cols": "Int64"})
@@ -7,7 +7,7 @@ import socket
 import numpy as np
 import pandas as pd
 
-from shapash.explainer.multi_decorator import MultiDecorator
+from shapash.explainer.smart_multi_state import SmartMultiState
 from shapash.explainer.smart_state import SmartState
 
 
@@ -228,7 +228,9 @@ def compute_sorted_variables_interactions_list_indices(interaction_values):
     Parameters
     ----------
     interaction_values : np.ndarray
-        Numpy array of shape (# samples x # features x # features) containing all interactions for each sample.
+        Numpy array of shape (# samples x # features x # features) containing all interactions for each sample,
+        or of shape (# features x # features) containing the sum of absolute interactions (computed batch by
+        batch for instance).
 
 
     Returns
@@ -236,7 +238,10 @@ def compute_sorted_variables_interactions_list_indices(interaction_values):
     interaction_contrib_sorted_indices : list
         List containing all pairs of indices in descending order of most important interactions.
     """
-    tmp = np.abs(interaction_values).sum(0)
+    if interaction_values.ndim == 2:
+        tmp = interaction_values.copy()
+    else:
+        tmp = np.abs(interaction_values).sum(0)
     for i in range(tmp.shape[0]):
         tmp[i, i:] = 0
 
@@ -300,7 +305,7 @@ def choose_state(contributions):
         SmartState or SmartMultiState, depending on the nature of the input.
     """
     if isinstance(contributions, list):
-        return MultiDecorator(SmartState())
+        return SmartMultiState()
     else:
         return SmartState()
 
@@ -318,3 +323,24 @@ def convert_string_to_int_keys(input_dict: dict) -> dict:
     dict
     """
     return {int(k): v for k, v in input_dict.items()}
+
+
+def cast_float_columns(df, dtype):
+    """
+    Cast the float columns of a dataframe to the given dtype. Other columns are kept.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Dataframe to cast.
+    dtype : str or numpy.dtype
+        Float dtype of the float columns (e.g. 'float32').
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    float_cols = df.select_dtypes(include="float").columns
+    if len(float_cols) == 0:
+        return df
+    return df.astype({col: dtype for col in float_cols})
@@ -6,6 +6,8 @@ import numpy as np
 import pandas as pd
 from dash import dcc, html
 
+from shapash.decomposition.contributions import get_sorted_rows
+
 
 def select_data_from_prediction_picking(round_dataframe: pd.DataFrame, selected_data: dict) -> pd.DataFrame:
     """Create a subset dataframe from the prediction picking graph selection.
@@ -436,10 +438,10 @@ def get_id_card_contrib(
         Dataframe of the contributions
     """
     if label_num is not None:
-        contrib = data["contrib_sorted"][label_num].loc[index, :].values
+        contrib = get_sorted_rows(data, "contrib_sorted", [index])[label_num].values[0]
         var_dict = data["var_dict"][label_num].loc[index, :].values
     else:
-        contrib = data["contrib_sorted"].loc[index, :].values
+        contrib = get_sorted_rows(data, "contrib_sorted", [index]).values[0]
         var_dict = data["var_dict"].loc[index, :].values
 
     var_dict = [features_dict[columns_dict[x]] for x in var_dict]
@@ -0,0 +1,59 @@
+"""
+Unit tests backend registry.
+"""
+
+import subprocess
+import sys
+import unittest
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+import shapash.backend
+from shapash.backend import BaseBackend, get_backend_cls_from_name, register_backend
+from shapash.backend.lime_backend import LimeBackend
+from shapash.backend.native_backend import NativeBackend
+from shapash.backend.shap_backend import ShapBackend
+
+
+class CustomBackend(BaseBackend):
+    name = "custom"
+
+    def run_explainer(self, x):
+        return dict(contributions=x)
+
+
+class TestBackendRegistry(unittest.TestCase):
+    def test_get_backend_cls_from_name(self):
+        assert get_backend_cls_from_name("shap") is ShapBackend
+        assert get_backend_cls_from_name("Lime") is LimeBackend
+        assert get_backend_cls_from_name("native") is NativeBackend
+        with self.assertRaises(ValueError):
+            get_backend_cls_from_name("base")
+        with self.assertRaises(ValueError):
+            get_backend_cls_from_name("unknown")
+
+    def test_lazy_attributes(self):
+        assert shapash.backend.ShapBackend is ShapBackend
+        with self.assertRaises(AttributeError):
+            shapash.backend.UnknownBackend
+
+    @patch.dict(shapash.backend._BACKENDS)
+    def test_register_backend(self):
+        register_backend("Custom", CustomBackend)
+        assert get_backend_cls_from_name("custom") is CustomBackend
+        register_backend("custom_path", f"{__name__}:CustomBackend")
+        assert get_backend_cls_from_name("custom_path") is CustomBackend
+        with self.assertRaises(ValueError):
+            register_backend("wrong", int)
+
+    @patch.dict(shapash.backend._BACKENDS)
+    @patch("shapash.backend._entry_points_loaded", False)
+    def test_entry_points(self):
+        entry_point = EntryPoint(name="plugin", value=f"{__name__}:CustomBackend", group="shapash.backends")
+        with patch("shapash.backend.entry_points", return_value={"shapash.backends": [entry_point]}):
+            assert get_backend_cls_from_name("plugin") is CustomBackend
+
+    def test_backends_not_imported_with_shapash(self):
+        code = "import sys, shapash; print('shap' in sys.modules or 'lime' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert output.stdout.strip() == "False"
@@ -0,0 +1,88 @@
+"""
+Unit tests contributions cache.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import sklearn.ensemble as ske
+
+from shapash.backend import ContributionsCache
+from shapash.backend.lime_backend import LimeBackend
+from shapash.backend.shap_backend import ShapBackend
+
+
+class TestContributionsCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.tmp_dir.name
+        rng = np.random.RandomState(0)
+        self.x_df = pd.DataFrame(rng.rand(30, 3), columns=["x1", "x2", "x3"])
+        self.y = (self.x_df["x1"] > 0.5).astype(int) + (self.x_df["x2"] > 0.5).astype(int)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_init(self):
+        backend = ShapBackend(ske.RandomForestRegressor(n_estimators=3).fit(self.x_df, self.y), cache=self.directory)
+        assert isinstance(backend.cache, ContributionsCache)
+        assert backend.cache.directory == self.directory
+        with self.assertRaises(ValueError):
+            ContributionsCache(1)
+
+    def test_get_explain_data_computes_missing_rows_only(self):
+        model = ske.RandomForestRegressor(n_estimators=3).fit(self.x_df, self.y)
+        backend = ShapBackend(model, cache=self.directory)
+        expected = ShapBackend(model).run_explainer(self.x_df)["contributions"]
+
+        with patch.object(ShapBackend, "run_explainer", autospec=True, side_effect=ShapBackend.run_explainer) as run:
+            first = backend.get_explain_data(self.x_df.iloc[:20])["contributions"]
+            assert len(run.call_args[0][1]) == 20
+            result = backend.get_explain_data(self.x_df)["contributions"]
+            assert len(run.call_args[0][1]) == 10
+            again = backend.get_explain_data(self.x_df.iloc[::-1])["contributions"]
+            assert run.call_count == 2
+
+        np.testing.assert_allclose(first, expected[:20])
+        np.testing.assert_allclose(result, expected)
+        np.testing.assert_allclose(again, expected[::-1])
+
+    def test_get_explain_data_multiclass(self):
+        model = ske.RandomForestClassifier(n_estimators=3).fit(self.x_df, self.y)
+        backend = LimeBackend(model, data=self.x_df, cache=self.directory)
+        expected = backend.get_explain_data(self.x_df)["contributions"]
+        result = backend.get_explain_data(self.x_df)["contributions"]
+        assert isinstance(result, list) and len(result) == 3
+        for contrib, exp in zip(result, expected):
+            pd.testing.assert_frame_equal(contrib, exp)
+
+    def test_key(self):
+        cache = ContributionsCache(self.directory)
+        model = ske.RandomForestRegressor(n_estimators=3, random_state=0).fit(self.x_df, self.y)
+        key = cache.get_key(ShapBackend(model), self.x_df)
+        assert key == cache.get_key(ShapBackend(model, n_jobs=2), self.x_df)
+        assert key != cache.get_key(ShapBackend(model), self.x_df.rename(columns={"x1": "x4"}))
+        model_2 = ske.RandomForestRegressor(n_estimators=3, random_state=1).fit(self.x_df, self.y)
+        assert key != cache.get_key(ShapBackend(model_2), self.x_df)
+
+    def test_evict(self):
+        model = ske.RandomForestRegressor(n_estimators=3).fit(self.x_df, self.y)
+        cache = ContributionsCache(self.directory)
+        backend = ShapBackend(model, cache=cache)
+        key_dir = os.path.join(self.directory, cache.get_key(backend, self.x_df))
+        backend.get_explain_data(self.x_df.iloc[:10])
+        first_entry = set(os.listdir(key_dir))
+        entry_size = cache.size()
+        backend.get_explain_data(self.x_df.iloc[10:20])
+        cache.max_size = int(entry_size * 2.5)
+        # Rows 10 to 20 are read from the cache, the first entry is the least recently used
+        backend.get_explain_data(self.x_df.iloc[10:])
+        assert cache.size() <= cache.max_size
+        assert len(os.listdir(key_dir)) == 6
+        assert not first_entry & set(os.listdir(key_dir))
+        cache.clear()
+        assert cache.size() == 0
@@ -3,12 +3,14 @@ Unit tests lime backend.
 """
 
 import unittest
+from unittest.mock import patch
 
 import category_encoders as ce
 import numpy as np
 import pandas as pd
 import sklearn.ensemble as ske
 import xgboost as xgb
+from lime import lime_tabular
 
 from shapash.backend.lime_backend import LimeBackend
 
@@ -67,3 +69,53 @@ class TestLimeBackend(unittest.TestCase):
                 assert len(features_imp[0]) == len(self.x_df.columns)
             else:
                 assert len(features_imp) == len(self.x_df.columns)
+
+    def test_run_explainer_multiclass(self):
+        x_df = pd.DataFrame(np.random.randint(1, 123, size=(6, 3)), columns=["x1", "x2", "x3"])
+        y_df = pd.Series([0, 1, 2, 0, 1, 2])
+        model = ske.RandomForestClassifier(n_estimators=3).fit(x_df, y_df)
+        backend_xpl = LimeBackend(model, data=x_df)
+        explain_instance = lime_tabular.LimeTabularExplainer.explain_instance
+        with patch.object(
+            lime_tabular.LimeTabularExplainer, "explain_instance", autospec=True, side_effect=explain_instance
+        ) as mock_explain:
+            explain_data = backend_xpl.run_explainer(x_df)
+        # A single lime explanation is computed for each row
+        assert mock_explain.call_count == len(x_df)
+
+        contributions = backend_xpl.get_local_contributions(x_df, explain_data)
+        assert len(contributions) == 3
+        for contrib in contributions:
+            assert contrib.shape == x_df.shape
+            assert list(contrib.columns) == list(x_df.columns)
+
+    def test_run_explainer_parallel(self):
+        """
+        Contributions do not depend on the number of jobs used.
+        """
+        model = self.model_list[1].fit(self.x_df, self.y_df)
+        expected = LimeBackend(model, data=self.x_df).run_explainer(self.x_df)["contributions"]
+        contributions = LimeBackend(model, data=self.x_df, n_jobs=2).run_explainer(self.x_df)["contributions"]
+        pd.testing.assert_frame_equal(contributions, expected)
+
+    def test_run_explainer_batch(self):
+        """
+        Contributions of a row do not depend on the other rows explained with it.
+        """
+        x_df = pd.DataFrame(np.random.randint(1, 123, size=(12, 3)), columns=["x1", "x2", "x3"])
+        y_df = pd.Series(np.random.randint(0, 2, 12))
+        model = ske.RandomForestClassifier(n_estimators=3).fit(x_df, y_df)
+        backend_xpl = LimeBackend(model, data=x_df)
+        expected = backend_xpl.run_explainer(x_df)["contributions"]
+        alone = backend_xpl.run_explainer(x_df.iloc[[7]])["contributions"]
+        pd.testing.assert_frame_equal(alone, expected.iloc[[7]])
+        subset = backend_xpl.run_explainer(x_df.iloc[5:])["contributions"]
+        pd.testing.assert_frame_equal(subset, expected.iloc[5:])
+        # random_state still changes the contributions
+        other = LimeBackend(model, data=x_df, random_state=1).run_explainer(x_df)["contributions"]
+        assert not other.equals(expected)
+        # Chunks explained one by one give the contributions of the whole dataset
+        chunks = list(backend_xpl.iter_local_contributions(x_df, chunk_size=5))
+        full = backend_xpl.get_local_contributions(x_df, dict(contributions=expected))
+        for i, contrib in enumerate(full):
+            pd.testing.assert_frame_equal(pd.concat([chunk[i] for chunk in chunks]), contrib)
@@ -0,0 +1,91 @@
+"""
+Unit tests native backend.
+"""
+
+import unittest
+
+import catboost as cb
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import sklearn.ensemble as ske
+import xgboost as xgb
+
+from shapash.backend import get_backend_cls_from_name
+from shapash.backend.native_backend import NativeBackend
+from shapash.backend.shap_backend import ShapBackend
+
+
+class TestNativeBackend(unittest.TestCase):
+    def setUp(self):
+        self.model_list = [
+            lgb.LGBMRegressor(n_estimators=3),
+            lgb.LGBMClassifier(n_estimators=3),
+            xgb.XGBRegressor(n_estimators=3),
+            xgb.XGBClassifier(n_estimators=3),
+            cb.CatBoostRegressor(n_estimators=3, verbose=0, allow_writing_files=False),
+            cb.CatBoostClassifier(n_estimators=3, verbose=0, allow_writing_files=False),
+        ]
+
+        df = pd.DataFrame(range(0, 21), columns=["id"])
+        df["y"] = df["id"].apply(lambda x: 1 if x < 10 else 0)
+        df["x1"] = np.random.randint(1, 123, df.shape[0])
+        df["x2"] = np.random.randint(1, 3, df.shape[0])
+        df["x3"] = np.random.rand(df.shape[0])
+        df = df.set_index("id")
+        self.x_df = df[["x1", "x2", "x3"]]
+        self.y_df = df["y"].to_frame()
+
+    def test_get_backend_cls_from_name(self):
+        assert get_backend_cls_from_name("native") is NativeBackend
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            NativeBackend(ske.RandomForestRegressor(n_estimators=1).fit(self.x_df, self.y_df.values.ravel()))
+
+    def test_parity_with_shap_backend(self):
+        for model in self.model_list:
+            model.fit(self.x_df, self.y_df.values.ravel())
+            native_backend = NativeBackend(model)
+            contributions = native_backend.get_local_contributions(self.x_df, native_backend.run_explainer(self.x_df))
+            shap_backend = ShapBackend(model)
+            expected = shap_backend.get_local_contributions(self.x_df, shap_backend.run_explainer(self.x_df))
+            if isinstance(expected, list):
+                assert len(contributions) == len(expected)
+                for contrib, exp in zip(contributions, expected):
+                    pd.testing.assert_frame_equal(contrib, exp, check_dtype=False, atol=1e-5)
+            else:
+                pd.testing.assert_frame_equal(contributions, expected, check_dtype=False, atol=1e-5)
+
+    def test_multiclass(self):
+        y = np.arange(len(self.x_df)) % 3
+        for model in [
+            lgb.LGBMClassifier(n_estimators=3),
+            xgb.XGBClassifier(n_estimators=3),
+            cb.CatBoostClassifier(n_estimators=3, verbose=0, allow_writing_files=False),
+        ]:
+            model.fit(self.x_df, y)
+            native_backend = NativeBackend(model)
+            contributions = native_backend.get_local_contributions(self.x_df, native_backend.run_explainer(self.x_df))
+            shap_backend = ShapBackend(model)
+            expected = shap_backend.get_local_contributions(self.x_df, shap_backend.run_explainer(self.x_df))
+            assert len(contributions) == 3
+            for contrib, exp in zip(contributions, expected):
+                pd.testing.assert_frame_equal(contrib, exp, check_dtype=False, atol=1e-5)
+
+    def test_catboost_categorical_features(self):
+        x_df = self.x_df.assign(x4=np.where(self.x_df["x2"] == 1, "A", "B"))
+        for model in [
+            cb.CatBoostRegressor(n_estimators=3, verbose=0, allow_writing_files=False),
+            cb.CatBoostClassifier(n_estimators=3, verbose=0, allow_writing_files=False),
+        ]:
+            model.fit(x_df, self.y_df.values.ravel(), cat_features=["x4"])
+            native_backend = NativeBackend(model)
+            contributions = native_backend.get_local_contributions(x_df, native_backend.run_explainer(x_df))
+            shap_backend = ShapBackend(model)
+            expected = shap_backend.get_local_contributions(x_df, shap_backend.run_explainer(x_df))
+            if isinstance(expected, list):
+                for contrib, exp in zip(contributions, expected):
+                    pd.testing.assert_frame_equal(contrib, exp, check_dtype=False, atol=1e-5)
+            else:
+                pd.testing.assert_frame_equal(contributions, expected, check_dtype=False, atol=1e-5)
@@ -6,8 +6,15 @@ import numpy as np
 import pandas as pd
 import sklearn.ensemble as ske
 import xgboost as xgb
+from sklearn.svm import SVC, SVR
 
-from shapash.backend.shap_backend import ShapBackend
+from shapash.backend.shap_backend import (
+    ShapBackend,
+    _split_rows,
+    _summarize_background,
+    get_shap_interaction_values,
+    get_shap_interactions_summary,
+)
 
 
 class TestShapBackend(unittest.TestCase):
@@ -68,6 +75,22 @@ class TestShapBackend(unittest.TestCase):
             else:
                 assert len(contributions) == len(self.x_df)
 
+    def test_iter_local_contributions(self):
+        for model in self.model_list:
+            model.fit(self.x_df, self.y_df)
+            backend_xpl = ShapBackend(model)
+            expected = backend_xpl.get_local_contributions(self.x_df, backend_xpl.run_explainer(self.x_df))
+            x_iter = (self.x_df.iloc[i : i + 8] for i in range(0, len(self.x_df), 8))
+            chunks = list(backend_xpl.iter_local_contributions(x_iter, chunk_size=5))
+            assert [len(c[0]) if isinstance(c, list) else len(c) for c in chunks] == [5, 3, 5, 3, 5]
+            if isinstance(expected, list):
+                for i, exp in enumerate(expected):
+                    pd.testing.assert_frame_equal(pd.concat([c[i] for c in chunks]), exp)
+            else:
+                pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+        with self.assertRaises(ValueError):
+            next(backend_xpl.iter_local_contributions(self.x_df, chunk_size=0))
+
     def test_get_global_contributions(self):
         for model in self.model_list:
             print(type(model))
@@ -82,3 +105,74 @@ class TestShapBackend(unittest.TestCase):
                 assert len(features_imp[0]) == len(self.x_df.columns)
             else:
                 assert len(features_imp) == len(self.x_df.columns)
+
+    def test_run_explainer_chunks(self):
+        """
+        Contributions computed by chunks of rows (in parallel or not) are identical
+        to the contributions computed in a single call.
+        """
+        for model in [self.model_list[1], self.model_list[3], self.model_list[11]]:
+            model.fit(self.x_df, self.y_df)
+            expected = ShapBackend(model).run_explainer(self.x_df)["contributions"]
+            for n_jobs, batch_size in [(1, 4), (2, None), (2, 5)]:
+                backend_xpl = ShapBackend(model, n_jobs=n_jobs, batch_size=batch_size)
+                contributions = backend_xpl.run_explainer(self.x_df)["contributions"]
+                np.testing.assert_array_equal(contributions, expected)
+
+    def test_get_shap_interaction_values_chunks(self):
+        model = ske.RandomForestClassifier(n_estimators=3).fit(self.x_df, self.y_df.values.ravel())
+        explainer = ShapBackend(model).explainer
+        expected = get_shap_interaction_values(self.x_df, explainer)
+        np.testing.assert_allclose(get_shap_interaction_values(self.x_df, explainer, n_jobs=2, batch_size=4), expected)
+        summary = get_shap_interactions_summary(self.x_df, explainer, top_k=3, n_jobs=2, batch_size=4)
+        np.testing.assert_allclose(summary["abs_sum"], np.abs(expected).sum(0))
+        # Only one pair of features (x2, x1) exists
+        assert summary["top_pairs"].shape == (len(self.x_df), 1, 2)
+        np.testing.assert_array_equal(summary["top_pairs"][:, 0], np.tile([1, 0], (len(self.x_df), 1)))
+        np.testing.assert_allclose(summary["top_values"][:, 0], expected[:, 1, 0])
+
+    def test_split_rows(self):
+        chunks = _split_rows(self.x_df, batch_size=8)
+        assert [len(c) for c in chunks] == [8, 8, 5]
+        pd.testing.assert_frame_equal(pd.concat(chunks), self.x_df)
+        assert [len(c) for c in _split_rows(self.x_df, n_jobs=2)] == [11, 10]
+        assert len(_split_rows(self.x_df)) == 1
+        with self.assertRaises(ValueError):
+            _split_rows(self.x_df, batch_size=0)
+
+    def test_background(self):
+        x = pd.DataFrame(np.random.rand(120, 3), columns=["x1", "x2", "x3"])
+        model = SVR().fit(x, x["x1"])
+        for background, strategy, size in [("sample", "sample", 30), ("kmeans", "kmeans", 30), (None, "full", 120)]:
+            backend_xpl = ShapBackend(model, masker=x, background=background, background_size=30)
+            assert backend_xpl.background_strategy == strategy
+            assert backend_xpl.masker.shape == (size, 3)
+            contributions = backend_xpl.run_explainer(x.iloc[:2])["contributions"]
+            assert contributions.shape == (2, 3)
+
+        backend_xpl = ShapBackend(model, masker=x, background=x.iloc[:10])
+        assert backend_xpl.background_strategy == "user"
+        assert backend_xpl.masker.shape == (10, 3)
+
+        # Background strategies only apply to model agnostic explainers
+        tree_model = ske.RandomForestRegressor(n_estimators=1).fit(x, x["x1"])
+        backend_xpl = ShapBackend(tree_model, masker=x, background_size=30)
+        assert backend_xpl.background_strategy is None
+
+    def test_summarize_background_stratified(self):
+        x = pd.DataFrame(np.random.rand(200, 2), columns=["x1", "x2"])
+        y = (np.arange(200) < 40).astype(int)
+        x["x1"] = y
+        model = SVC().fit(x, y)
+        background, strategy = _summarize_background(model, "classification", x, "sample", 50)
+        assert strategy == "sample"
+        assert len(background) == 50
+        # The proportion of predicted classes is kept in the sample
+        assert (background["x1"] == 1).sum() == 10
+
+        background, strategy = _summarize_background(model, "classification", x, "sample", 500)
+        assert strategy == "full"
+        assert len(background) == 200
+
+        with self.assertRaises(ValueError):
+            _summarize_background(model, "classification", x, "unknown", 50)
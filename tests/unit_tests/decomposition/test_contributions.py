@@ -6,7 +6,12 @@ import unittest
 import numpy as np
 import pandas as pd
 
-from shapash.decomposition.contributions import rank_contributions
+from shapash.decomposition.contributions import (
+    SortedContributions,
+    compute_sorted_indices,
+    get_sorted_rows,
+    rank_contributions,
+)
 
 
 class TestContributions(unittest.TestCase):
@@ -62,3 +67,37 @@ class TestContributions(unittest.TestCase):
         assert pd.Index.equals(s_ord.index, expected_s_ord.index)
         assert pd.Index.equals(x_ord.index, expected_x_ord.index)
         assert pd.Index.equals(s_dict.index, expected_s_dict.index)
+
+    def test_sorted_contributions(self):
+        """
+        Unit test SortedContributions gives the same values as rank_contributions
+        """
+        dataframe_s = pd.DataFrame(
+            [[3.4, 1, -9, 4], [-45, 3, 43, -9], [0.5, -2, 1, 0]],
+            columns=["Phi_" + str(i) for i in range(4)],
+            index=["raw_1", "raw_2", "raw_3"],
+        )
+        dataframe_x = pd.DataFrame(
+            [["Male", 1, 2.5, "PhD"], ["Female", 2, 3.5, "Master"], ["Male", 3, 0.5, "PhD"]],
+            columns=["X" + str(i) for i in range(4)],
+            index=["raw_1", "raw_2", "raw_3"],
+        )
+        expected = dict(zip(["contrib_sorted", "x_sorted", "var_dict"], rank_contributions(dataframe_s, dataframe_x)))
+
+        data = SortedContributions(dataframe_s, dataframe_x, compute_sorted_indices(dataframe_s))
+        assert list(data.keys()) == ["contrib_sorted", "x_sorted", "var_dict"]
+        for key, value in expected.items():
+            pd.testing.assert_frame_equal(data[key], value)
+            pd.testing.assert_frame_equal(data.select(key, ["raw_3", "raw_1"]), value.loc[["raw_3", "raw_1"]])
+            pd.testing.assert_frame_equal(get_sorted_rows(data, key, ["raw_2"]), value.loc[["raw_2"]])
+            pd.testing.assert_frame_equal(get_sorted_rows(expected, key, ["raw_2"]), value.loc[["raw_2"]])
+        with self.assertRaises(KeyError):
+            data["summary"]
+
+        multi_data = SortedContributions(
+            [dataframe_s, -dataframe_s], dataframe_x, [compute_sorted_indices(dataframe_s, dtype="float32")] * 2
+        )
+        assert multi_data["var_dict"][0].dtypes.iloc[0] == np.uint8
+        contrib_sorted = multi_data.select("contrib_sorted", ["raw_1"])
+        assert isinstance(contrib_sorted, list) and len(contrib_sorted) == 2
+        pd.testing.assert_frame_equal(contrib_sorted[1], -expected["contrib_sorted"].loc[["raw_1"]])
@@ -3,7 +3,9 @@ Unit test for smart explainer
 """
 
 import os
+import shutil
 import sys
+import tempfile
 import types
 import unittest
 from os import path
@@ -22,9 +24,12 @@ from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
 
 from shapash import SmartExplainer
 from shapash.backend import ShapBackend
+from shapash.decomposition.contributions import SortedContributions, rank_contributions
 from shapash.explainer.multi_decorator import MultiDecorator
 from shapash.explainer.smart_state import SmartState
 from shapash.utils.check import check_model
+from shapash.utils.explanation_metrics import find_neighbors
+from shapash.utils.utils import compute_sorted_variables_interactions_list_indices
 
 
 def init_sme_to_pickle_test():
@@ -313,6 +318,172 @@ class TestSmartExplainer(unittest.TestCase):
         xpl.compile(x=df[["x1", "x2"]], additional_data=df[["x3"]])
         assert len(xpl.additional_features_dict) == 1
 
+    def test_compile_dtype(self):
+        """
+        Unit test compile dtype
+        checking compile method with float32 dtype
+        """
+        df = pd.DataFrame(range(0, 21), columns=["id"])
+        df["y"] = df["id"].apply(lambda x: x % 3)
+        df["x1"] = np.random.rand(df.shape[0])
+        df["x2"] = np.random.randint(1, 3, df.shape[0])
+        df = df.set_index("id")
+        clf = RandomForestClassifier(n_estimators=2).fit(df[["x1", "x2"]], df["y"])
+        xpl = SmartExplainer(clf, dtype="float32")
+        xpl.compile(x=df[["x1", "x2"]])
+        xpl_64 = SmartExplainer(clf)
+        xpl_64.compile(x=df[["x1", "x2"]])
+        assert len(xpl.contributions) == 3
+        for i in range(3):
+            assert (xpl.contributions[i].dtypes == np.float32).all()
+            assert (xpl.data["contrib_sorted"][i].dtypes == np.float32).all()
+            assert (xpl.data["var_dict"][i].dtypes == np.uint8).all()
+            assert_frame_equal(xpl.data["var_dict"][i], xpl_64.data["var_dict"][i], check_dtype=False)
+            assert_frame_equal(xpl.contributions[i], xpl_64.contributions[i], check_dtype=False, atol=1e-6)
+        assert xpl.x_init["x1"].dtype == np.float32
+        assert xpl.x_encoded["x1"].dtype == np.float32
+        assert xpl.x_init["x2"].dtype == df["x2"].dtype
+        with self.assertRaises(ValueError):
+            SmartExplainer(clf, dtype="int32")
+
+    def test_compile_sorted_contributions(self):
+        """
+        Unit test compile sorted contributions
+        checking that only var_dict is stored and sorted values are gathered from x_init
+        """
+        df = pd.DataFrame(range(0, 21), columns=["id"])
+        df["y"] = df["id"].apply(lambda x: x % 3)
+        df["x1"] = np.random.rand(df.shape[0])
+        df["x2"] = np.random.randint(1, 3, df.shape[0])
+        df = df.set_index("id")
+        clf = RandomForestClassifier(n_estimators=2).fit(df[["x1", "x2"]], df["y"])
+        xpl = SmartExplainer(clf)
+        xpl.compile(x=df[["x1", "x2"]])
+        assert isinstance(xpl.data, SortedContributions)
+        assert xpl.data.x_init is xpl.x_init
+        for i in range(3):
+            contrib_sorted, x_sorted, var_dict = rank_contributions(xpl.contributions[i], xpl.x_init)
+            assert_frame_equal(xpl.data["contrib_sorted"][i], contrib_sorted)
+            assert_frame_equal(xpl.data["x_sorted"][i], x_sorted)
+            assert_frame_equal(xpl.data["var_dict"][i], var_dict)
+
+    def test_compile_profile(self):
+        """
+        Unit test compile profile
+        checking that each stage of compile is recorded and sent to the hook
+        """
+        df = pd.DataFrame(range(0, 21), columns=["id"])
+        df["y"] = df["id"].apply(lambda x: 1 if x < 10 else 0)
+        df["x1"] = np.random.randint(1, 123, df.shape[0])
+        df["x2"] = np.random.randint(1, 3, df.shape[0])
+        df = df.set_index("id")
+        clf = cb.CatBoostClassifier(n_estimators=1, allow_writing_files=False).fit(df[["x1", "x2"]], df["y"])
+        xpl = SmartExplainer(clf)
+        records = []
+        xpl.compile(x=df[["x1", "x2"]], profile_hook=records.append)
+        stages = ["backend", "handle_categorical_missing", "inverse_transform", "predict", "predict_proba"]
+        stages += ["contributions", "postprocessing", "rank_contributions", "features_desc", "additional_data"]
+        self.assertListEqual(list(xpl.compile_profile.index), stages)
+        self.assertListEqual([record["stage"] for record in records], stages)
+        assert xpl.compile_profile.loc["contributions", "n_rows"] == 21
+        assert xpl.compile_profile.loc["contributions", "n_cols"] == 2
+
+    def test_compile_lazy(self):
+        """
+        Unit test compile lazy
+        checking that lazy attributes are computed on first use
+        """
+        df = pd.DataFrame(range(0, 21), columns=["id"])
+        df["y"] = df["id"].apply(lambda x: 1 if x < 10 else 0)
+        df["x1"] = np.random.randint(1, 123, df.shape[0])
+        df["x2"] = np.random.randint(1, 3, df.shape[0])
+        df["x3"] = np.random.rand(df.shape[0])
+        df = df.set_index("id")
+        x = df[["x1", "x2", "x3"]]
+        clf = RandomForestClassifier(n_estimators=2).fit(x, df["y"])
+        features_groups = {"group": ["x1", "x2"]}
+        xpl_eager = SmartExplainer(clf, features_groups=features_groups)
+        xpl_eager.compile(x=x)
+        xpl = SmartExplainer(clf, features_groups=features_groups)
+        xpl.compile(x=x, lazy=True)
+
+        for name in ["data", "features_desc", "x_init_groups", "columns_dict_groups", "data_groups"]:
+            assert name not in xpl.__dict__
+        assert "rank_contributions" not in xpl.compile_profile.index
+        xpl.compute_features_import()
+        assert "data" not in xpl.__dict__
+
+        assert xpl.features_desc == xpl_eager.features_desc
+        assert xpl.columns_dict_groups == xpl_eager.columns_dict_groups
+        assert_frame_equal(xpl.x_init_groups, xpl_eager.x_init_groups)
+        for key in ["contrib_sorted", "x_sorted", "var_dict"]:
+            for i in range(2):
+                assert_frame_equal(xpl.data[key][i], xpl_eager.data[key][i])
+                assert_frame_equal(xpl.data_groups[key][i], xpl_eager.data_groups[key][i])
+        assert not xpl._lazy_attributes
+        with self.assertRaises(AttributeError):
+            xpl.unknown_attribute
+
+        xpl.compile(x=x, lazy=True)
+        assert "data" not in xpl.__dict__
+        assert_frame_equal(xpl.to_pandas(max_contrib=2), xpl_eager.to_pandas(max_contrib=2))
+
+        # Explainer without instance set of lazy attributes (saved before lazy compile)
+        del xpl_eager.__dict__["_lazy_attributes"]
+        for name in ["data", "features_desc", "x_init_groups", "data_groups"]:
+            xpl_eager._compute_lazy_attribute(name)
+        assert xpl_eager._lazy_attributes == frozenset()
+
+    def test_append(self):
+        """
+        Unit test append
+        checking that appending rows gives the same result as compiling all the rows
+        """
+        df = pd.DataFrame(range(0, 30), columns=["id"])
+        df["y"] = df["id"].apply(lambda x: x % 3)
+        df["x1"] = np.random.rand(df.shape[0])
+        df["x2"] = np.random.randint(1, 3, df.shape[0])
+        df["x3"] = np.random.rand(df.shape[0])
+        df = df.set_index("id")
+        x = df[["x1", "x2", "x3"]]
+        clf = RandomForestClassifier(n_estimators=2).fit(x, df["y"])
+        features_groups = {"group": ["x1", "x2"]}
+
+        xpl_full = SmartExplainer(clf, features_groups=features_groups)
+        xpl_full.compile(x=x, y_target=df["y"])
+        xpl_full.compute_features_import()
+        xpl_full.filter(max_contrib=1, display_groups=False)
+
+        xpl = SmartExplainer(clf, features_groups=features_groups)
+        xpl.compile(x=x.iloc[:20], y_target=df["y"].iloc[:20])
+        xpl.compute_features_import()
+        xpl.filter(max_contrib=1, display_groups=False)
+        xpl.append(x=x.iloc[20:], y_target=df["y"].iloc[20:])
+
+        assert_frame_equal(xpl.x_init, xpl_full.x_init)
+        assert_frame_equal(xpl.y_pred, xpl_full.y_pred)
+        assert_frame_equal(xpl.proba_values, xpl_full.proba_values)
+        assert_frame_equal(xpl.y_target, xpl_full.y_target)
+        assert_frame_equal(xpl.x_init_groups, xpl_full.x_init_groups)
+        assert "features_desc" not in xpl.__dict__
+        assert xpl.features_desc == xpl_full.features_desc
+        for i in range(3):
+            assert_frame_equal(xpl.contributions[i], xpl_full.contributions[i])
+            assert_frame_equal(xpl.contributions_groups[i], xpl_full.contributions_groups[i])
+            assert_frame_equal(xpl.mask[i], xpl_full.mask[i])
+            pd.testing.assert_series_equal(xpl.features_imp[i], xpl_full.features_imp[i])
+            pd.testing.assert_series_equal(xpl.features_imp_groups[i], xpl_full.features_imp_groups[i])
+            for key in ["contrib_sorted", "x_sorted", "var_dict"]:
+                assert_frame_equal(xpl.data[key][i], xpl_full.data[key][i])
+                assert_frame_equal(xpl.data_groups[key][i], xpl_full.data_groups[key][i])
+
+        with self.assertRaises(ValueError):
+            xpl.append(x=x.iloc[25:], y_target=df["y"].iloc[25:])
+        with self.assertRaises(ValueError):
+            xpl.append(x=x.iloc[20:].set_axis(range(30, 40)))
+        with self.assertRaises(ValueError):
+            SmartExplainer(clf).append(x=x)
+
     def test_filter_0(self):
         """
         Unit test filter 0
@@ -323,12 +494,7 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter()
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_not_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_not_called()
+        mockstate.compute_mask.assert_called_once_with(2, 1, None, None, None, None)
         assert hasattr(xpl, "mask")
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, "masked_contributions")
@@ -349,12 +515,7 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter(features_to_hide=["X1", "X2"])
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_not_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_not_called()
+        mockstate.compute_mask.assert_called_once_with(2, 1, [1, 2], None, None, None)
         assert hasattr(xpl, "mask")
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, "masked_contributions")
@@ -369,12 +530,7 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter(threshold=0.1)
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_called()
-        mockstate.sign_contributions.assert_not_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_not_called()
+        mockstate.compute_mask.assert_called_once_with(2, 1, None, 0.1, None, None)
         assert hasattr(xpl, "mask")
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, "masked_contributions")
@@ -389,12 +545,7 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter(positive=True)
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_not_called()
+        mockstate.compute_mask.assert_called_once_with(2, 1, None, None, True, None)
         assert hasattr(xpl, "mask")
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, "masked_contributions")
@@ -409,12 +560,7 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter(max_contrib=10)
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_not_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_called()
+        mockstate.compute_mask.assert_called_once_with(2, 1, None, None, None, 10)
         assert hasattr(xpl, "mask")
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, "masked_contributions")
@@ -429,12 +575,7 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter(positive=True, max_contrib=10)
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_called()
+        mockstate.compute_mask.assert_called_once_with(2, 1, None, None, True, 10)
         assert hasattr(xpl, "mask")
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, "masked_contributions")
@@ -449,12 +590,7 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter()
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_not_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_not_called()
+        mockstate.compute_mask.assert_called_once_with(2, 1, None, None, None, None)
         assert hasattr(xpl, "mask")
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, "masked_contributions")
@@ -494,6 +630,33 @@ class TestSmartExplainer(unittest.TestCase):
         expected_param_dict = {"features_to_hide": None, "threshold": 0.5, "positive": None, "max_contrib": 2}
         self.assertDictEqual(expected_param_dict, xpl.mask_params)
 
+    def test_filter_cache(self):
+        """
+        Unit test filter cache
+        checking that filtering again with the same parameters reuses the cached mask
+        """
+        df = pd.DataFrame(range(0, 21), columns=["id"])
+        df["y"] = df["id"].apply(lambda x: x % 3)
+        df["x1"] = np.random.rand(df.shape[0])
+        df["x2"] = np.random.randint(1, 3, df.shape[0])
+        df["x3"] = np.random.rand(df.shape[0])
+        df = df.set_index("id")
+        clf = RandomForestClassifier(n_estimators=2).fit(df[["x1", "x2", "x3"]], df["y"])
+        xpl = SmartExplainer(clf)
+        xpl.compile(x=df[["x1", "x2", "x3"]])
+        xpl.filter(features_to_hide=["x1"], max_contrib=1)
+        mask, masked_contributions = xpl.mask, xpl.masked_contributions
+        xpl.filter(threshold=0.01)
+        with patch.object(xpl.state, "compute_mask", side_effect=AssertionError):
+            xpl.filter(features_to_hide=["x1"], max_contrib=1)
+        for expected, output in zip(mask, xpl.mask):
+            assert_frame_equal(expected, output)
+        assert xpl.masked_contributions is masked_contributions
+        assert xpl.mask_params["features_to_hide"] == ["x1"]
+        assert len(xpl._mask_cache) == 2
+        xpl.compile(x=df[["x1", "x2", "x3"]])
+        assert xpl._mask_cache is None
+
     def test_check_label_name_1(self):
         """
         Unit test check label name 1
@@ -670,6 +833,95 @@ class TestSmartExplainer(unittest.TestCase):
         assert all(attrib2 in attrib_xpl for attrib2 in attrib_xpl2)
         os.remove(pkl_file)
 
+    def test_save_load_columnar(self):
+        """
+        Test save + load methods with the columnar format, with and without memory-mapping
+        """
+        df = pd.DataFrame(range(0, 21), columns=["id"])
+        df["y"] = df["id"].apply(lambda x: x % 3)
+        df["x1"] = np.random.rand(df.shape[0])
+        df["x2"] = np.random.randint(1, 3, df.shape[0])
+        df["x3"] = np.random.choice(["A", "B"], df.shape[0])
+        df = df.set_index("id")
+        encoder = ce.OrdinalEncoder(cols=["x3"]).fit(df[["x1", "x2", "x3"]])
+        x_encoded = encoder.transform(df[["x1", "x2", "x3"]])
+        clf = RandomForestClassifier(n_estimators=2).fit(x_encoded, df["y"])
+        xpl = SmartExplainer(clf, preprocessing=encoder, features_dict={"x1": "feature 1"})
+        xpl.compile(x=x_encoded)
+        xpl.filter(max_contrib=2)
+        expected = xpl.to_pandas(proba=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_dir = os.path.join(tmp_dir, "xpl")
+            xpl.save(save_dir, format="columnar")
+            assert path.exists(path.join(save_dir, "metadata.json"))
+            assert path.exists(path.join(save_dir, "model.pkl"))
+            # A second save replaces the first one
+            xpl.save(save_dir, format="columnar")
+            for mmap in [False, True]:
+                xpl2 = SmartExplainer.load(save_dir, mmap=mmap)
+                assert set(xpl2.__dict__) == set(xpl.__dict__) - {"_mask_cache", "_neighbors_parameters"}
+                assert xpl2.plot.explainer is xpl2
+                assert xpl2.features_dict == xpl.features_dict
+                for contrib, contrib2 in zip(xpl.contributions, xpl2.contributions):
+                    pd.testing.assert_frame_equal(contrib, contrib2)
+                pd.testing.assert_frame_equal(xpl.x_init, xpl2.x_init)
+                # Sorted data keeps a reference to the contributions, stored once
+                assert xpl2.data.contributions is xpl2.contributions
+                pd.testing.assert_frame_equal(xpl2.to_pandas(proba=True), expected)
+                xpl2.filter(max_contrib=1)
+                assert xpl2.to_pandas().shape[1] == 4
+            # Memory-mapped matrices are read-only
+            assert not xpl2.contributions[0].values.flags.writeable
+        with self.assertRaises(ValueError):
+            xpl.save("xpl", format="json")
+
+    def test_load_columnar_include(self):
+        """
+        Test load method of a columnar save with the include parameter
+        """
+        df = pd.DataFrame(range(0, 21), columns=["id"])
+        df["y"] = df["id"].apply(lambda x: x % 2)
+        df["x1"] = np.random.rand(df.shape[0])
+        df["x2"] = np.random.rand(df.shape[0])
+        df = df.set_index("id")
+        clf = RandomForestClassifier(n_estimators=2).fit(df[["x1", "x2"]], df["y"])
+        xpl = SmartExplainer(clf, features_dict={"x1": "feature 1"})
+        xpl.compile(x=df[["x1", "x2"]])
+        xpl.compute_features_import()
+        expected = xpl.to_pandas(max_contrib=1)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_dir = os.path.join(tmp_dir, "xpl")
+            xpl.save(save_dir, format="columnar")
+            xpl2 = SmartExplainer.load(save_dir, include=["features_imp", "contributions", "x_init"])
+            assert "x_init" in xpl2.__dict__
+            assert "x_encoded" not in xpl2.__dict__
+            assert "data" not in xpl2.__dict__
+            assert xpl2.features_dict == xpl.features_dict
+            for features_imp, features_imp2 in zip(xpl.features_imp, xpl2.features_imp):
+                pd.testing.assert_series_equal(features_imp, features_imp2)
+            # The other attributes are read on first use
+            pd.testing.assert_frame_equal(xpl2.x_encoded, xpl.x_encoded)
+            assert "x_encoded" in xpl2.__dict__
+            pd.testing.assert_frame_equal(xpl2.to_pandas(max_contrib=1), expected)
+            assert xpl2.data.contributions is xpl2.contributions
+            with self.assertRaises(ValueError):
+                SmartExplainer.load(save_dir, include=["unknown"])
+            # A partially loaded explainer can be saved again, without the reader of the save directory
+            pkl_file = os.path.join(tmp_dir, "xpl.pkl")
+            xpl2 = SmartExplainer.load(save_dir, include=[])
+            assert "_columnar_reader" in xpl2.__dict__
+            assert xpl2.contributions is not None
+            xpl2.save(pkl_file)
+            assert "_columnar_reader" not in xpl2.__dict__
+            assert "_unloaded_attributes" not in xpl2.__dict__
+            shutil.rmtree(save_dir)
+            xpl3 = SmartExplainer.load(pkl_file)
+            assert "_columnar_reader" not in xpl3.__dict__
+            pd.testing.assert_frame_equal(xpl3.y_pred, xpl.y_pred)
+            pd.testing.assert_frame_equal(xpl3.to_pandas(max_contrib=1), expected)
+            with self.assertRaises(ValueError):
+                SmartExplainer.load(pkl_file, include=["x_init"])
+
     def test_predict_1(self):
         """
         Test predict method 1
@@ -942,6 +1194,42 @@ class TestSmartExplainer(unittest.TestCase):
         expected["pred"] = expected["pred"].astype(int)
         pd.testing.assert_frame_equal(expected, output)
 
+    def test_export_summary(self):
+        """
+        Unit test export summary
+        checking that the file written chunk by chunk contains the summary returned by to_pandas
+        """
+        df = pd.DataFrame(range(0, 21), columns=["id"])
+        df["y"] = df["id"].apply(lambda x: x % 3)
+        df["x1"] = np.random.rand(df.shape[0])
+        df["x2"] = np.random.randint(1, 3, df.shape[0])
+        df["x3"] = np.random.rand(df.shape[0])
+        df = df.set_index("id")
+        clf = RandomForestClassifier(n_estimators=2).fit(df[["x1", "x2", "x3"]], df["y"])
+        xpl = SmartExplainer(clf)
+        xpl.compile(x=df[["x1", "x2", "x3"]])
+        xpl.filter(max_contrib=2)
+        mask = xpl.mask
+        expected = xpl.to_pandas(proba=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for format in ["parquet", "csv"]:
+                file = os.path.join(tmp_dir, f"summary.{format}")
+                xpl.export_summary(file, format=format, chunk_size=4, proba=True)
+                if format == "parquet":
+                    output = pd.read_parquet(file)
+                else:
+                    output = pd.read_csv(file, index_col=0)
+                assert list(output.columns) == list(expected.columns)
+                assert list(output.index) == list(expected.index)
+                assert list(output["feature_1"]) == list(expected["feature_1"])
+                np.testing.assert_allclose(output["contribution_2"], expected["contribution_2"].astype(float))
+                np.testing.assert_allclose(output["proba"], expected["proba"])
+        assert xpl.mask is mask
+        with self.assertRaises(ValueError):
+            xpl.export_summary("summary.parquet", chunk_size=0)
+        with self.assertRaises(ValueError):
+            xpl.export_summary("summary.json", format="json")
+
     def test_compute_features_import_1(self):
         """
         Unit test compute_features_import 1
@@ -1074,6 +1362,44 @@ class TestSmartExplainer(unittest.TestCase):
         shap_interaction_values = xpl.get_interaction_values()
         assert shap_interaction_values.shape[0] == df.shape[0]
 
+    def test_get_interaction_values_2(self):
+        """
+        Interaction values computed batch by batch, in a memory-mapped file and summarized
+        """
+        df = pd.DataFrame(
+            {
+                "y": np.random.randint(2, size=30),
+                "a": np.random.rand(30) * 10,
+                "b": np.random.rand(30),
+                "c": np.random.rand(30),
+            }
+        )
+        clf = RandomForestClassifier(n_estimators=5).fit(df[["a", "b", "c"]], df["y"])
+        xpl = SmartExplainer(clf)
+        xpl.compile(x=df.drop("y", axis=1))
+        expected = xpl.get_interaction_values()
+
+        del xpl.x_interaction
+        np.testing.assert_allclose(xpl.get_interaction_values(batch_size=7), expected)
+
+        del xpl.x_interaction
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            memmap_path = os.path.join(tmp_dir, "interactions.npy")
+            interaction_values = xpl.get_interaction_values(batch_size=7, memmap_path=memmap_path)
+            assert isinstance(interaction_values, np.memmap)
+            np.testing.assert_allclose(interaction_values, expected)
+            np.testing.assert_allclose(np.load(memmap_path), expected)
+            del interaction_values, xpl.interaction_values
+
+        summary = xpl.compute_interactions_summary(top_k=2, batch_size=7)
+        np.testing.assert_array_equal(
+            summary["sorted_indices"], compute_sorted_variables_interactions_list_indices(expected)
+        )
+        assert summary["top_pairs"].shape == (30, 2, 2)
+        row_pairs = summary["top_pairs"][0]
+        np.testing.assert_allclose(summary["top_values"][0], expected[0, row_pairs[:, 0], row_pairs[:, 1]])
+        assert np.abs(summary["top_values"][0, 0]) == np.abs(expected[0][np.tril_indices(3, k=-1)]).max()
+
     @patch("shapash.explainer.smart_explainer.SmartApp")
     @patch("shapash.explainer.smart_explainer.CustomThread")
     @patch("shapash.explainer.smart_explainer.get_host_name")
@@ -1156,6 +1482,74 @@ class TestSmartExplainer(unittest.TestCase):
 
         assert xpl.local_neighbors["norm_shap"].shape[1] == expected
 
+    def test_compute_features_stability_3(self):
+        """
+        Unit test compute features stability reusing the std.dev vector and the radius
+        """
+        df = pd.DataFrame(np.random.randint(1, 100, size=(15, 4)), columns=list("ABCD"))
+        X = df.iloc[:, :-1]
+        y = df.iloc[:, -1]
+        model = DecisionTreeRegressor().fit(X, y)
+
+        xpl = SmartExplainer(model)
+        xpl.compile(x=X)
+
+        xpl.compute_features_stability([1, 3])
+        neighbors_parameters = xpl._neighbors_parameters
+        expected = xpl.features_stability
+        with patch("shapash.explainer.smart_explainer.compute_neighbors_parameters") as mock_parameters:
+            xpl.compute_features_stability([1, 3])
+            mock_parameters.assert_not_called()
+        assert xpl._neighbors_parameters is neighbors_parameters
+        np.testing.assert_array_equal(xpl.features_stability["variability"], expected["variability"])
+        xpl.compile(x=X)
+        assert xpl._neighbors_parameters is None
+
+    def test_compute_features_stability_4(self):
+        """
+        Unit test compute features stability using the stored probabilities instead of the model
+        """
+        df = pd.DataFrame(np.random.randint(1, 100, size=(15, 4)), columns=list("ABCD"))
+        X = df.iloc[:, :-1]
+        y = (df.iloc[:, -1] > 50).astype(int)
+        model = DecisionTreeClassifier().fit(X, y)
+
+        xpl = SmartExplainer(model)
+        xpl.compile(x=X)
+        xpl.compute_features_stability([1, 3])
+        expected = xpl.features_stability
+
+        xpl.model = Mock(wraps=model)
+        xpl.compute_features_stability([1, 3])
+        xpl.model.predict_proba.assert_not_called()
+        np.testing.assert_array_equal(xpl.features_stability["variability"], expected["variability"])
+
+        xpl.proba_values = None
+        assert xpl._get_stored_outputs() is None
+        xpl.compute_features_stability([1, 3])
+        xpl.model.predict_proba.assert_called_once()
+
+    def test_compute_features_stability_5(self):
+        """
+        Unit test compute features stability calling the model when y_pred is given by the user
+        """
+        df = pd.DataFrame(np.random.randint(1, 100, size=(15, 4)), columns=list("ABCD"))
+        X = df.iloc[:, :-1]
+        y = df.iloc[:, -1]
+        model = DecisionTreeRegressor().fit(X, y)
+
+        xpl = SmartExplainer(model)
+        xpl.compile(x=X, y_pred=pd.DataFrame({"pred": y + 1000}, index=X.index))
+        assert xpl._get_stored_outputs() is None
+        with patch("shapash.explainer.smart_explainer.find_neighbors", wraps=find_neighbors) as mock_find:
+            xpl.compute_features_stability([1, 3])
+            assert mock_find.call_args.kwargs["predictions"] is None
+
+        xpl.predict()
+        np.testing.assert_array_equal(xpl._get_stored_outputs(), model.predict(X))
+        xpl.add(y_pred=pd.DataFrame({"pred": y + 1000}, index=X.index))
+        assert xpl._get_stored_outputs() is None
+
     def test_compute_features_compacity(self):
         df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list("ABCD"))
         selection = [1, 3]
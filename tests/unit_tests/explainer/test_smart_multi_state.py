@@ -0,0 +1,134 @@
+"""
+Unit test for smart multi state
+"""
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal, assert_series_equal
+
+from shapash.decomposition.contributions import stacked_array
+from shapash.explainer.multi_decorator import MultiDecorator
+from shapash.explainer.smart_multi_state import SmartMultiState
+from shapash.explainer.smart_state import SmartState
+from shapash.utils.utils import choose_state
+
+
+class TestSmartMultiState(unittest.TestCase):
+    """
+    Unit test smart multi state class
+    checking that the vectorized methods give the same results as the per-class delegation
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        index = [3, 5, 7, 9]
+        columns = ["x1", "x2", "x3", "x4"]
+        self.contributions = [
+            pd.DataFrame(rng.normal(size=(4, 4)), columns=columns, index=index),
+            pd.DataFrame(rng.normal(size=(4, 4)), columns=columns, index=index),
+            pd.DataFrame(rng.normal(size=(4, 4)), columns=columns, index=index),
+        ]
+        self.contributions[1].iloc[0, 1] = 0.0
+        self.state = SmartMultiState()
+        self.multi_decorator = MultiDecorator(SmartState())
+
+    def assert_frames_list_equal(self, output, expected):
+        assert len(output) == len(expected)
+        for output_df, expected_df in zip(output, expected):
+            assert_frame_equal(output_df, expected_df)
+
+    def test_choose_state(self):
+        """
+        Unit test choose state
+        """
+        assert isinstance(choose_state(self.contributions), SmartMultiState)
+        assert isinstance(choose_state(self.contributions[0]), SmartState)
+
+    def test_prepare_contributions(self):
+        """
+        Unit test prepare contributions
+        """
+        output = self.state.prepare_contributions(self.contributions)
+        self.assert_frames_list_equal(output, self.contributions)
+        stacked = stacked_array(output)
+        assert stacked.shape == (3, 4, 4)
+        assert stacked.flags["C_CONTIGUOUS"]
+        assert all(np.shares_memory(contrib.values, stacked) for contrib in output)
+        assert self.state.prepare_contributions(output) is output
+        # the stacked array is pickled once and the frames are views of it again
+        loaded = pickle.loads(pickle.dumps(output))
+        self.assert_frames_list_equal(loaded, self.contributions)
+        assert all(np.shares_memory(contrib.values, stacked_array(loaded)) for contrib in loaded)
+        # a modified list is not used as stacked anymore
+        output[0] = self.contributions[0]
+        assert stacked_array(output) is None
+
+    def test_sort_contributions(self):
+        """
+        Unit test sort contributions on stacked contributions
+        """
+        contributions = self.state.prepare_contributions(self.contributions)
+        for dtype in [None, "float32"]:
+            output = self.state.sort_contributions(contributions, self.contributions[0], dtype=dtype)
+            expected = self.multi_decorator.sort_contributions(self.contributions, self.contributions[0], dtype=dtype)
+            for key in ["contrib_sorted", "x_sorted", "var_dict"]:
+                self.assert_frames_list_equal(output[key], expected[key])
+                self.assert_frames_list_equal(output.select(key, [9, 3]), expected.select(key, [9, 3]))
+            assert stacked_array(output["var_dict"]) is not None
+            assert stacked_array(output.select("contrib_sorted", [9, 3])) is not None
+
+    def test_compute_features_import(self):
+        """
+        Unit test compute features import
+        """
+        output = self.state.compute_features_import(self.state.prepare_contributions(self.contributions))
+        expected = self.multi_decorator.compute_features_import(self.contributions)
+        assert len(output) == len(expected)
+        for output_imp, expected_imp in zip(output, expected):
+            assert_series_equal(output_imp, expected_imp)
+
+    def test_compute_mask(self):
+        """
+        Unit test compute mask and compute_masked_contributions
+        """
+        var_dicts = [
+            pd.DataFrame(np.argsort(-contrib.abs().values, axis=1), index=contrib.index)
+            for contrib in self.contributions
+        ]
+        parameters = [
+            dict(),
+            dict(features_list=[1], threshold=0.3, positive=True, max_contrib=1),
+            dict(threshold=0.1, max_contrib=2),
+            dict(features_list=[0, 3], positive=False),
+        ]
+        for params in parameters:
+            output = self.state.compute_mask(self.state.prepare_contributions(self.contributions), var_dicts, **params)
+            assert stacked_array(output) is not None
+            expected = self.multi_decorator.compute_mask(self.contributions, var_dicts, **params)
+            self.assert_frames_list_equal(output, expected)
+            self.assert_frames_list_equal(
+                self.state.compute_masked_contributions(self.contributions, output),
+                self.multi_decorator.compute_masked_contributions(self.contributions, expected),
+            )
+
+    def test_compute_mask_not_stackable(self):
+        """
+        Unit test compute mask with contributions of different shapes
+        """
+        contributions = [self.contributions[0], self.contributions[1].iloc[:2]]
+        output = self.state.compute_mask(contributions, None, max_contrib=2)
+        expected = self.multi_decorator.compute_mask(contributions, None, max_contrib=2)
+        self.assert_frames_list_equal(output, expected)
+
+    def test_compute_grouped_contributions(self):
+        """
+        Unit test compute grouped contributions
+        """
+        features_groups = {"group1": ["x3", "x1"], "group2": ["x4"]}
+        output = self.state.compute_grouped_contributions(self.contributions, features_groups)
+        expected = self.multi_decorator.compute_grouped_contributions(self.contributions, features_groups)
+        self.assert_frames_list_equal(output, expected)
+        with self.assertRaises(KeyError):
+            self.state.compute_grouped_contributions(self.contributions, {"group1": ["x5"]})
@@ -1721,6 +1721,21 @@ class TestSmartPlotter(unittest.TestCase):
 
         self.setUp()
 
+    def test_top_interactions_plot_3(self):
+        """
+        Test top interactions plot with pairs of features ranked on all the rows batch by batch
+        """
+        x = pd.DataFrame(np.random.rand(50, 3), columns=["X1", "X2", "X3"])
+        model = DecisionTreeRegressor(max_depth=3).fit(x, x["X1"] * x["X2"])
+        smart_explainer = SmartExplainer(model)
+        smart_explainer.compile(x=x)
+
+        output = smart_explainer.plot.top_interactions_plot(nb_top_interactions=2, max_points=10, batch_size=20)
+
+        expected = smart_explainer.compute_interactions_summary(batch_size=50)["sorted_indices"][:2]
+        labels = [button.label for button in output.layout.updatemenus[0].buttons]
+        assert labels == [f"X{i + 1} - X{j + 1}" for i, j in expected]
+
     def test_correlations_1(self):
         """
         Test correlations plot 1
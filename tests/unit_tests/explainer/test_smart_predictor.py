@@ -3,6 +3,7 @@ Unit test smart predictor
 """
 
 import os
+import tempfile
 import types
 import unittest
 from os import path
@@ -1089,6 +1090,28 @@ class TestSmartPredictor(unittest.TestCase):
         assert len(contribution_expected) == len(contribution_output)
         assert all(output.columns == expected_output.columns)
 
+    def test_export_summary(self):
+        """
+        Unit test export_summary method
+        checking that the file written chunk by chunk contains the summary returned by summarize
+        """
+        predictor_1 = self.predictor_1
+        predictor_1.add_input(x=self.df_1[["x1", "x2"]])
+        predictor_1.modify_mask(max_contrib=1)
+        expected = predictor_1.summarize()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for format in ["parquet", "csv"]:
+                file = os.path.join(tmp_dir, f"summary.{format}")
+                predictor_1.export_summary(file, format=format, chunk_size=2)
+                if format == "parquet":
+                    output = pd.read_parquet(file)
+                else:
+                    output = pd.read_csv(file, index_col=0)
+                assert list(output.columns) == list(expected.columns)
+                assert list(output.index) == list(expected.index)
+                assert list(output["feature_1"]) == list(expected["feature_1"])
+                np.testing.assert_allclose(output["contribution_1"], expected["contribution_1"].astype(float))
+
     def test_modfiy_mask(self):
         """
         Unit test modify_mask method
@@ -9,6 +9,7 @@ import pandas as pd
 from shapash.manipulation.filters import (
     cap_contributions,
     combine_masks,
+    compute_mask,
     cutoff_contributions,
     cutoff_contributions_old,
     hide_contributions,
@@ -220,3 +221,55 @@ class TestFilter(unittest.TestCase):
             columns=["contrib_1", "contrib_2", "contrib_3"],
         )
         pd.testing.assert_frame_equal(output, expected_output)
+
+    def test_compute_mask_1(self):
+        """
+        Unit test compute mask 1
+        """
+        s_contrib = pd.DataFrame([[0.5, -0.4, 0.3, 0.05], [-0.9, 0.8, -0.7, 0.2], [0.6, 0.1, -0.02, 0.01]])
+        var_dict = pd.DataFrame([[1, 0, 2, 3], [2, 3, 0, 1], [0, 1, 3, 2]])
+        output = compute_mask(s_contrib, var_dict, features_list=[0], threshold=0.1, positive=True, max_contrib=1)
+        expected = combine_masks(
+            [
+                hide_contributions(var_dict, [0]),
+                cap_contributions(s_contrib, threshold=0.1),
+                sign_contributions(s_contrib, positive=True),
+            ]
+        )
+        expected = cutoff_contributions(expected, k=1)
+        pd.testing.assert_frame_equal(output, expected)
+        expected = pd.DataFrame(
+            [[True, False, False, False], [False, True, False, False], [False, True, False, False]],
+            columns=["contrib_1", "contrib_2", "contrib_3", "contrib_4"],
+        )
+        pd.testing.assert_frame_equal(output, expected)
+
+    def test_compute_mask_2(self):
+        """
+        Unit test compute mask 2 without filter
+        """
+        s_contrib = pd.DataFrame([[0.5, -0.4], [-0.9, 0.8]], index=[4, 7])
+        output = compute_mask(s_contrib, None)
+        expected = pd.DataFrame([[True, True], [True, True]], columns=["contrib_1", "contrib_2"], index=[4, 7])
+        pd.testing.assert_frame_equal(output, expected)
+
+    def test_compute_mask_3(self):
+        """
+        Unit test compute mask 3 on stacked arrays
+        """
+        s_contrib = pd.DataFrame([[0.5, -0.4, 0.3, 0.05], [-0.9, 0.8, -0.7, 0.2], [0.6, 0.1, -0.02, 0.01]])
+        var_dict = pd.DataFrame([[1, 0, 2, 3], [2, 3, 0, 1], [0, 1, 3, 2]])
+        s_contribs = np.stack([s_contrib.values, -s_contrib.values])
+        var_dicts = np.stack([var_dict.values, var_dict.values[:, ::-1]])
+        output = compute_mask(s_contribs, var_dicts, features_list=[0], threshold=0.1, positive=True, max_contrib=2)
+        assert isinstance(output, np.ndarray)
+        for i in range(2):
+            expected = compute_mask(
+                pd.DataFrame(s_contribs[i]),
+                pd.DataFrame(var_dicts[i]),
+                features_list=[0],
+                threshold=0.1,
+                positive=True,
+                max_contrib=2,
+            )
+            np.testing.assert_array_equal(output[i], expected.values)
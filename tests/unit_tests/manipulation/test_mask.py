@@ -3,9 +3,10 @@ Unit test of mask
 """
 import unittest
 
+import numpy as np
 import pandas as pd
 
-from shapash.manipulation.mask import compute_masked_contributions, init_mask
+from shapash.manipulation.mask import compute_masked_contributions, init_mask, pack_mask, unpack_mask
 
 
 class TestMask(unittest.TestCase):
@@ -61,3 +62,17 @@ class TestMask(unittest.TestCase):
         expected = pd.DataFrame([[True, True], [True, True], [True, True]], columns=column_name)
         output = init_mask(s_ord)
         assert output.equals(expected)
+
+    def test_pack_mask(self):
+        """
+        test of packing and unpacking a mask
+        """
+        mask = pd.DataFrame(
+            np.random.default_rng(0).random((5, 11)) > 0.5,
+            columns=["contrib_{}".format(i + 1) for i in range(11)],
+            index=[3, 4, 5, 6, 8],
+        )
+        packed = pack_mask(mask)
+        assert packed.shape == (5, 2)
+        output = unpack_mask(packed, 11, mask.index)
+        pd.testing.assert_frame_equal(output, mask)
@@ -4,8 +4,9 @@ Unit test for select lines
 import unittest
 
 import pandas as pd
+from pandas.testing import assert_frame_equal
 
-from shapash.manipulation.select_lines import select_lines
+from shapash.manipulation.select_lines import keep_right_contributions, select_lines
 
 DF = pd.DataFrame(
     [["A", "A", -16.4, 12], ["C", "A", 3.4, 0], ["C", "B", 8.4, 9], ["C", "B", -9, -5]],
@@ -42,3 +43,46 @@ class TestSelectLines(unittest.TestCase):
         output = select_lines(dataframe, "col3 < 0")
         expected = [("A", "A"), ("C", "B")]
         assert output == expected
+
+    def test_keep_right_contributions_1(self):
+        """
+        test of keep right contributions with proba values and label dict
+        """
+        contributions = [
+            pd.DataFrame([[0.1, -0.2], [0.3, 0.4], [-0.5, 0.6]], columns=["x1", "x2"], index=[10, 11, 12]),
+            pd.DataFrame([[-0.1, 0.2], [-0.3, -0.4], [0.5, -0.6]], columns=["x1", "x2"], index=[10, 11, 12]),
+        ]
+        y_pred = pd.DataFrame([1, 0, 1], columns=["pred"], index=[10, 11, 12])
+        proba_values = pd.DataFrame([[0.3, 0.7], [0.8, 0.2], [0.1, 0.9]], index=[10, 11, 12])
+        output_pred, output = keep_right_contributions(
+            y_pred, contributions, "classification", [0, 1], {0: "No", 1: "Yes"}, proba_values
+        )
+        expected = pd.DataFrame(
+            [[-0.1, 0.2], [0.3, 0.4], [0.5, -0.6]], columns=["x1", "x2"], index=[10, 11, 12], dtype=object
+        )
+        expected_pred = pd.DataFrame(
+            {"pred": ["Yes", "No", "Yes"], "proba": [0.7, 0.8, 0.9]},
+            index=[10, 11, 12],
+        )
+        assert_frame_equal(output, expected)
+        assert_frame_equal(output_pred, expected_pred)
+
+    def test_keep_right_contributions_2(self):
+        """
+        test of keep right contributions with summaries of different lengths
+        """
+        summaries = [
+            pd.DataFrame([["x1", 0.1], ["x2", 0.3]], columns=["feature_1", "contribution_1"]),
+            pd.DataFrame([["x2", 0.2, "x1", 0.1], ["x1", 0.3, "x2", 0.2]], columns=["a", "b", "c", "d"]),
+        ]
+        y_pred = pd.DataFrame([0, 0], columns=["pred"])
+        _, output = keep_right_contributions(y_pred, summaries, "classification", [0, 1], None)
+        assert_frame_equal(output, summaries[0].astype(object))
+
+    def test_keep_right_contributions_3(self):
+        """
+        test of keep right contributions with a prediction which is not a class
+        """
+        contributions = [pd.DataFrame([[0.1]]), pd.DataFrame([[0.2]])]
+        with self.assertRaises(ValueError):
+            keep_right_contributions(pd.DataFrame([2]), contributions, "classification", [0, 1], None)
@@ -7,7 +7,13 @@ import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
 
-from shapash.manipulation.summarize import compute_features_import, group_contributions, summarize_el
+from shapash.manipulation.summarize import (
+    compute_features_import,
+    format_summary_dtypes,
+    group_contributions,
+    summarize_el,
+    summary_columns,
+)
 
 
 class TestSummarize(unittest.TestCase):
@@ -76,6 +82,17 @@ class TestSummarize(unittest.TestCase):
         assert xmatr.shape[0] == output.shape[0]
         assert output.equals(expected)
 
+    def test_summarize_el_5(self):
+        """
+        Test summarize el 5 : missing values kept by the mask are removed, except None
+        """
+        column_name = ["col1", "col2", "col3"]
+        xmatr = pd.DataFrame([["a", np.nan, 2], [None, "b", np.nan], [1.5, "nan", "c"]], columns=column_name)
+        masktest = pd.DataFrame([[True, True, True], [True, True, False], [False, True, True]], columns=column_name)
+        output = summarize_el(xmatr, masktest, "feat")
+        expected = pd.DataFrame([["a", 2], [None, "b"], ["c", np.nan]], columns=["feat1", "feat2"], dtype=object)
+        assert output.equals(expected)
+
     def test_compute_features_import_1(self):
         """
         Test compute features import 1
@@ -124,3 +141,28 @@ class TestSummarize(unittest.TestCase):
             [[0.5, -0.02], [0.1, -0.03], [-0.6, 0.4]], columns=["group1", "group2"], index=index_list
         )
         assert_frame_equal(output, expected)
+
+    def test_summary_columns_1(self):
+        """
+        Test summary columns
+        """
+        output = summary_columns(2)
+        expected = ["feature_1", "value_1", "contribution_1", "feature_2", "value_2", "contribution_2"]
+        assert output == expected
+
+    def test_format_summary_dtypes_1(self):
+        """
+        Test format summary dtypes with a chunk without any feature in the last columns
+        """
+        summary = pd.DataFrame(
+            [[1, 0.8, "Age", 22, 0.1, None, None, None], [0, 0.6, "Sex", 1, -0.2, None, None, None]],
+            columns=["pred", "proba"] + summary_columns(2),
+        )
+        output = format_summary_dtypes(summary, numeric_values=True)
+        assert output["pred"].dtype == summary["pred"].dtype
+        assert output["proba"].dtype == float
+        assert output["feature_2"].dtype == "string"
+        assert output["value_2"].dtype == float
+        assert output["contribution_2"].dtype == float
+        output = format_summary_dtypes(summary, numeric_values=False)
+        assert output["value_1"].dtype == "string"
@@ -1,14 +1,15 @@
 import unittest
+from unittest.mock import Mock
 
 import numpy as np
 import pandas as pd
 from sklearn.linear_model import LinearRegression
 
 from shapash.utils.explanation_metrics import (
-    _compute_distance,
-    _compute_similarities,
     _df_to_array,
     _get_radius,
+    _nearest_neighbors,
+    compute_neighbors_parameters,
     find_neighbors,
     get_distance,
     get_min_nb_features,
@@ -23,29 +24,63 @@ class TestExplanationMetrics(unittest.TestCase):
         t = _df_to_array(df)
         assert np.array_equal(t, expected)
 
-    def test_compute_distance(self):
-        x1 = np.array([1, 0, 1])
-        x2 = np.array([0, 0, 1])
+    def test_nearest_neighbors(self):
+        dataset = np.array([[1, 0, 1], [0, 0, 1], [4, 3, 1]])
         mean_vector = np.array([2, 1, 3])
-        epsilon = 0
-        expected = 0.5
-        t = _compute_distance(x1, x2, mean_vector, epsilon)
-        assert t == expected
+        indices, distances = _nearest_neighbors(dataset[[0]], dataset, 3, mean_vector=mean_vector, epsilon=0)
+        np.testing.assert_array_equal(indices, [[0, 1, 2]])
+        np.testing.assert_allclose(distances, [[0, 0.5, 4.5]])
 
-    def test_compute_similarities(self):
-        df = pd.DataFrame(np.random.randint(0, 100, size=(5, 4)), columns=list("ABCD")).values
-        instance = df[0, :]
-        expected_len = 5
-        expected_dist = 0
-        t = _compute_similarities(instance, df)
-        assert len(t) == expected_len
-        assert t[0] == expected_dist
+    def test_nearest_neighbors_2(self):
+        df = pd.DataFrame(np.random.rand(50, 4), columns=list("ABCD")).values
+        instances = df[[1, 3, 7], :]
+        indices, distances = _nearest_neighbors(instances, df, n_neighbors=5)
+        assert indices.shape == distances.shape == (3, 5)
+        assert list(indices[:, 0]) == [1, 3, 7]
+        mean_vector = np.array(df, dtype=np.float32).std(axis=0)
+        for instance, instance_indices, instance_distances in zip(instances, indices, distances):
+            expected = np.sum(np.abs(df - instance) / (mean_vector + 0.0000001), axis=1)
+            np.testing.assert_allclose(instance_distances, np.sort(expected)[:5])
+            np.testing.assert_allclose(instance_distances, expected[instance_indices])
 
     def test_get_radius(self):
         df = pd.DataFrame(np.random.randint(0, 100, size=(5, 4)), columns=list("ABCD")).values
         t = _get_radius(df, n_neighbors=3)
         assert t > 0
 
+    def test_get_radius_seed(self):
+        df = pd.DataFrame(np.random.rand(600, 4), columns=list("ABCD")).values
+        assert _get_radius(df, n_neighbors=3) == _get_radius(df, n_neighbors=3)
+        mean_vector = np.array(df, dtype=np.float32).std(axis=0)
+        assert _get_radius(df, n_neighbors=3, mean_vector=mean_vector) == _get_radius(df, n_neighbors=3)
+
+    def test_find_neighbors_duplicates(self):
+        df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list("ABCD"), index=range(10, 25))
+        X = df.iloc[:, :-1].copy()
+        X.iloc[[0, 5, 9]] = X.iloc[7].values
+        model = LinearRegression().fit(X, df.iloc[:, -1])
+        predictions = model.predict(X)
+        t, indices = find_neighbors(
+            [17, 10], X, model, "regression", n_neighbors=2, return_indices=True, predictions=predictions
+        )
+        assert indices[0][0] == 7
+        assert indices[1][0] == 0
+        for neighbors, instance_indices in zip(t, indices):
+            assert neighbors[0, -2] == 0
+            np.testing.assert_array_equal(neighbors[:, :-2], X.values[instance_indices])
+
+    def test_compute_neighbors_parameters(self):
+        df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list("ABCD"))
+        X = df.iloc[:, :-1]
+        model = LinearRegression().fit(X, df.iloc[:, -1])
+        mean_vector, radius = compute_neighbors_parameters(X)
+        assert mean_vector.shape == (X.shape[1],)
+        assert radius == _get_radius(X.values, n_neighbors=10)
+        t = find_neighbors([1, 3], X, model, "regression", mean_vector=mean_vector, radius=radius)
+        expected = find_neighbors([1, 3], X, model, "regression")
+        for neighbors, expected_neighbors in zip(t, expected):
+            np.testing.assert_array_equal(neighbors, expected_neighbors)
+
     def test_find_neighbors(self):
         df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list("ABCD"))
         selection = [1, 3]
@@ -69,6 +104,42 @@ class TestExplanationMetrics(unittest.TestCase):
         assert t[1].shape == (len(df.columns),)
         assert t[2].shape == (len(df.columns),)
 
+    def test_find_neighbors_indices(self):
+        df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list("ABCD"), index=range(100, 115))
+        selection = [101, 103]
+        X = df.iloc[:, :-1]
+        model = LinearRegression().fit(X, df.iloc[:, -1])
+        t, indices = find_neighbors(selection, X, model, "regression", return_indices=True)
+        assert len(indices) == len(selection)
+        for neighbors, neighbors_indices, instance in zip(t, indices, selection):
+            assert len(neighbors_indices) == neighbors.shape[0]
+            assert X.index[neighbors_indices[0]] == instance
+            np.testing.assert_array_equal(neighbors[:, :-2], X.values[neighbors_indices])
+
+    def test_find_neighbors_predictions(self):
+        df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list("ABCD"))
+        X = df.iloc[:, :-1]
+        model = LinearRegression().fit(X, df.iloc[:, -1])
+        expected = find_neighbors([1, 3], X, model, "regression")
+        predictions = model.predict(X)
+        model = Mock(wraps=model)
+        t = find_neighbors([1, 3], X, model, "regression", predictions=predictions)
+        model.predict.assert_not_called()
+        for neighbors, expected_neighbors in zip(t, expected):
+            np.testing.assert_allclose(neighbors, expected_neighbors)
+
+    def test_shap_neighbors_indices(self):
+        df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list("ABCD"))
+        # Duplicated row : only the rows given by the indices are used
+        df.iloc[5] = df.iloc[2]
+        contrib = pd.DataFrame(np.random.randint(1, 10, size=(15, 4)), columns=list("EFGH"))
+        indices = np.array([2, 0, 7])
+        instance = np.append(df.values[indices], np.zeros((3, 2)), axis=1)
+        t = shap_neighbors(instance, df, contrib, "regression", indices=indices)
+        expected = contrib.values[indices] / contrib.values[indices].sum(axis=1, keepdims=True)
+        np.testing.assert_allclose(t[0], expected)
+        np.testing.assert_allclose(t[2], expected[0])
+
     def test_get_min_nb_features(self):
         contrib = pd.DataFrame(np.random.randint(10, size=(15, 4)), columns=list("ABCD"))
         selection = [1, 3]
@@ -88,3 +159,19 @@ class TestExplanationMetrics(unittest.TestCase):
         assert type(t) == np.ndarray
         assert all(isinstance(x, float) for x in t)
         assert len(t) == len(selection)
+
+    def test_get_min_nb_features_values(self):
+        contrib = pd.DataFrame([[0.5, -0.2, 0.05], [0.1, 0.1, 0.1], [1.0, -1.0, 0.2]])
+        t = get_min_nb_features([0, 1, 2], contrib, "regression", 0.2)
+        # Rows 1 and 2 are never close enough before using all their features
+        assert t == [2, 3, 3]
+        t = get_min_nb_features([0, 1, 2], contrib, "classification", 0.5)
+        assert t == [1, 1, 2]
+
+    def test_get_distance_values(self):
+        contrib = pd.DataFrame([[0.5, -0.1, 0.05], [-0.2, 0.2, 0.1], [0.3, 0.0, 0.0]])
+        t = get_distance([0, 1, 2], contrib, "classification", 2)
+        # Ties keep the order of the features, like a stable sort
+        np.testing.assert_allclose(t, [0.05, 0.1, 0.0], atol=1e-12)
+        t = get_distance([0, 1, 2], contrib, "regression", 1)
+        np.testing.assert_allclose(t, [0.05 / 0.45, 0.3 / 0.1, 0.0], atol=1e-12)
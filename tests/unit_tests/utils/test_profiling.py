@@ -0,0 +1,28 @@
+"""
+Unit tests profiling
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from shapash.utils.profiling import StageProfiler
+
+
+class TestStageProfiler(unittest.TestCase):
+    def test_stage(self):
+        records = []
+        profiler = StageProfiler(hook=records.append)
+        x = pd.DataFrame(np.zeros((10, 3)))
+        with profiler.stage("first", x):
+            np.ones(1000)
+        with profiler.stage("second"):
+            pass
+        assert [record["stage"] for record in records] == ["first", "second"]
+        profile = profiler.to_frame()
+        self.assertListEqual(list(profile.index), ["first", "second"])
+        self.assertListEqual(list(profile.columns), ["wall_time", "peak_rss_delta", "n_rows", "n_cols"])
+        assert profile.loc["first", "n_rows"] == 10
+        assert profile.loc["first", "n_cols"] == 3
+        assert pd.isna(profile.loc["second", "n_rows"])
+        assert (profile["wall_time"] >= 0).all()